@@ -1,33 +1,112 @@
 import abc
-import asyncio
+import math
+import time
+from collections import deque
 from collections.abc import Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from lymphocyte.actions.action_trigger_event import ActionTriggerEvent
-from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.actions.scheduler import ActionScheduler
+from lymphocyte.events.bus import Event, Subscription, SyncEventHandler
+from lymphocyte.services.executors import Executors
 
 
 @dataclass
-class Action(EventHandler, abc.ABC):
+class Action(SyncEventHandler, abc.ABC):
     """Action parent class. Just like Events, Actions can be put on the eventbus.
 
+    Triggered actions are performed by an ActionScheduler, shared by all actions of a container.
+    At most `max_concurrency` executions of an action run at once, and with `collapse` set,
+    triggering an action while it is in flight does not start another execution.
+
+    Triggers are suppressed within `cooldown_seconds` after the action was last performed, and
+    beyond `max_per_minute` performed in the last minute. With `debounce_seconds` set, the action
+    is performed once triggers stop for that long, and the triggers before are suppressed.
+
     Args:
-        EventHandler (EventHandler): Base EventHandler class
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
         abc (ABC):
     """
 
     name: str
 
-    async def handle(self, event: Event) -> Iterable[Event]:
+    max_concurrency: int | None = field(default=None, kw_only=True)
+    collapse: bool = field(default=False, kw_only=True)
+    cooldown_seconds: float | None = field(default=None, kw_only=True)
+    debounce_seconds: float | None = field(default=None, kw_only=True)
+    max_per_minute: int | None = field(default=None, kw_only=True)
+    scheduler: ActionScheduler = field(
+        default_factory=ActionScheduler, kw_only=True, repr=False, compare=False
+    )
+
+    _last_performed: float = field(
+        default=-math.inf, init=False, repr=False, compare=False
+    )
+    _performed_last_minute: deque[float] = field(
+        default_factory=deque, init=False, repr=False, compare=False
+    )
+
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(ActionTriggerEvent, self.name)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
         if not isinstance(event, ActionTriggerEvent):
             return []
 
         if event.name != self.name:
             return []
 
-        asyncio.create_task(self.perform())
+        if self.debounce_seconds:
+            self.scheduler.debounce(self, self.debounce_seconds)
+        else:
+            self.trigger()
         return []
 
+    def trigger(self) -> bool:
+        """Perform the action, unless its cooldown or rate limit suppresses it.
+
+        Returns:
+            bool: Whether the action is performed.
+        """
+        now = time.monotonic()
+        if self.cooldown_seconds and now - self._last_performed < self.cooldown_seconds:
+            self.scheduler.suppressed(self, "cooldown")
+            return False
+
+        if self.max_per_minute is not None:
+            performed = self._performed_last_minute
+            while performed and performed[0] <= now - 60:
+                performed.popleft()
+            if len(performed) >= self.max_per_minute:
+                self.scheduler.suppressed(self, "rate_limit")
+                return False
+            performed.append(now)
+
+        self._last_performed = now
+        self.scheduler.submit(self)
+        return True
+
     @abc.abstractmethod
     async def perform(self) -> None:
         """Abstract method for Action sub-classes"""
+
+
+@dataclass
+class BlockingAction(Action):
+    """Parent class of Actions doing blocking work, which is performed on a worker thread of the
+    Executors instead of on the event loop.
+
+    Args:
+        Action (Action): Base Action class
+    """
+
+    executors: Executors = field(
+        default_factory=Executors, kw_only=True, repr=False, compare=False
+    )
+
+    async def perform(self) -> None:
+        await self.executors.run(self.perform_blocking, name=self.name)
+
+    @abc.abstractmethod
+    def perform_blocking(self) -> None:
+        """Abstract method for BlockingAction sub-classes, called on a worker thread"""
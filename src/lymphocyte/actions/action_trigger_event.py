@@ -6,3 +6,7 @@ from lymphocyte.events.bus import Event
 @dataclass
 class ActionTriggerEvent(Event):
     name: str
+
+    @property
+    def routing_name(self) -> str | None:
+        return self.name
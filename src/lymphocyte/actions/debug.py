@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Mapping
 from dataclasses import dataclass
 from typing import Any
 
@@ -14,37 +15,44 @@ log = logging.getLogger(__name__)
 class DebugAction(Action):
     """Debug Action that can be triggered. Gives the context of action.
 
+    Templates are rendered on the event loop, as the rule context reads the managers, which are
+    not thread-safe. Nothing is rendered when debug logging is disabled.
+
     Args:
         Action (Action): Base action class
     """
 
-    context: dict[str, Any]
+    context: Mapping[str, Any]
 
     template: jinja2.Template
 
     def __init__(
         self,
         name: str,
-        context: dict[str, Any],
+        context: Mapping[str, Any],
         message: str,
         environment: jinja2.Environment = jinja2.sandbox.ImmutableSandboxedEnvironment(
             extensions=["jinja2.ext.debug"]
         ),
+        **kwargs: Any,
     ) -> None:
         """Constructs a DebugAction object.
 
         Args:
             name (str): Name of the action
-            context (dict[str, Any]): Context variables.
+            context (Mapping[str, Any]): Context variables.
             message (str): Template string passed to jinja. Jinja evaluates the template with the given context.
             environment (jinja2.Environment, optional): Current environment of the pod. Defaults to jinja2.sandbox.ImmutableSandboxedEnvironment( extensions=["jinja2.ext.debug"] ).
+            **kwargs: Options of the Action base class.
         """
-        super().__init__(name)
+        super().__init__(name, **kwargs)
         self.context = context
         self.template = environment.from_string(message)
 
     async def perform(self) -> None:
         """Perform the debugging action by logging."""
+        if not log.isEnabledFor(logging.DEBUG):
+            return
         if self.template.environment.is_async:  # type: ignore[attr-defined]
             log.debug(
                 "%s",
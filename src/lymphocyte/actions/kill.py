@@ -1,34 +1,66 @@
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import psutil
 
-from lymphocyte.actions.action import Action
+from lymphocyte.actions.action import BlockingAction
+from lymphocyte.services.process_index import ProcessIndex, read_process
 
 log = logging.getLogger(__name__)
 
 
 @dataclass
-class KillAction(Action):
-    """Action to kill a process given a uid.
+class KillAction(BlockingAction):
+    """Action to kill the processes of a uid, and/or with an executable or command line matching
+    a regular expression. All given matchers have to match.
+
+    Processes are looked up in a ProcessIndex, refreshed and searched on a worker thread, so
+    killing never blocks the event loop. The index is refreshed incrementally, which also reads
+    the processes that called exec or setuid since they were indexed. Only the processes found
+    are read again, and killed if they still match and were not replaced by another process with
+    the same process id.
 
     Args:
-        Action (Action): Base Action class
+        BlockingAction (BlockingAction): Base class of blocking actions
     """
 
-    uid: int
+    uid: int | None = None
+    exe: str | None = None
+    cmdline: str | None = None
+    processes: ProcessIndex = field(
+        default_factory=ProcessIndex, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        if self.uid is None and self.exe is None and self.cmdline is None:
+            raise ValueError(
+                f"KillAction {self.name} needs a uid, exe or cmdline to match processes by"
+            )
+        if self.exe is not None:
+            self.processes.watch("exe", self.exe)
+        if self.cmdline is not None:
+            self.processes.watch("cmdline", self.cmdline)
 
-    async def perform(self) -> None:
-        """Perform the killaction by killing the process. Logs if this successful or insuccesful."""
-        procs = [p for p in psutil.process_iter() if p.uids().real == self.uid]
-        for proc in procs:
+    def perform_blocking(self) -> None:
+        """Perform the killaction by killing the processes. Logs if this successful or insuccesful."""
+        self.processes.refresh()
+        for info in self.processes.find(self.uid, self.exe, self.cmdline):
+            current = read_process(info.pid)
+            if (
+                current is None
+                or current.create_time != info.create_time
+                or not self.processes.matches(current, self.uid, self.exe, self.cmdline)
+            ):
+                log.debug("Process %d no longer matches", info.pid)
+                continue
             try:
+                proc = psutil.Process(info.pid)
                 proc.kill()
                 log.info("Killed %s", str(proc))
             except psutil.NoSuchProcess:
-                log.debug("No such process %s", str(proc))
+                log.debug("No such process %d", info.pid)
             except psutil.AccessDenied:
-                log.exception("Access denied killing process %s", str(proc))
+                log.exception("Access denied killing process %d", info.pid)
             except:
                 log.exception("Error while killing")
                 raise
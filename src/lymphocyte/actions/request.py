@@ -2,9 +2,8 @@ import logging
 from dataclasses import dataclass
 from typing import Any
 
-import httpx
-
 from lymphocyte.actions.action import Action
+from lymphocyte.services.http_client import HTTPClientPool
 
 log = logging.getLogger(__name__)
 
@@ -25,15 +24,25 @@ class SendRestRequestAction(Action):
     data: dict[str, Any] | None = None
     json: Any = None
     headers: dict[str, Any] | None = None
+    timeout_seconds: float | None = None
+    http_client: HTTPClientPool | None = None
+
+    async def _send(self, http_client: HTTPClientPool) -> None:
+        await http_client.request(
+            self.name,
+            method=self.method,
+            url=self.url,
+            timeout_seconds=self.timeout_seconds,
+            params=self.params,
+            data=self.data,
+            json=self.json,
+            headers=self.headers,
+        )
 
     async def perform(self) -> None:
-        """Perform the Rest Request Action."""
-        async with httpx.AsyncClient() as client:
-            await client.request(
-                method=self.method,
-                url=self.url,
-                params=self.params,
-                data=self.data,
-                json=self.json,
-                headers=self.headers,
-            )
+        """Perform the Rest Request Action, on the shared HTTPClientPool when there is one."""
+        if self.http_client is not None:
+            await self._send(self.http_client)
+            return
+        async with HTTPClientPool() as http_client:
+            await self._send(http_client)
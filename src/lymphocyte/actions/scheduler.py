@@ -0,0 +1,280 @@
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Iterator
+from typing import TYPE_CHECKING
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+
+if TYPE_CHECKING:
+    from lymphocyte.actions.action import Action
+
+log = logging.getLogger(__name__)
+
+
+class ActionMetrics:
+    """Prometheus metrics of the actions performed through an ActionScheduler, per action name."""
+
+    queued: Gauge
+    running: Gauge
+    duration: Histogram
+    collapsed: Counter
+    suppressed: Counter
+    failed: Counter
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY) -> None:
+        """Constructs and registers the action metrics.
+
+        Args:
+            registry (CollectorRegistry, optional): Registry to register the metrics with. Defaults to REGISTRY.
+        """
+        self.queued = Gauge(
+            "lymphocyte_actions_queued",
+            "Triggered actions waiting for a free slot",
+            registry=registry,
+        )
+        self.running = Gauge(
+            "lymphocyte_actions_running",
+            "Actions being performed",
+            registry=registry,
+        )
+        self.duration = Histogram(
+            "lymphocyte_action_duration_seconds",
+            "Time spent performing an action",
+            ["action"],
+            registry=registry,
+        )
+        self.collapsed = Counter(
+            "lymphocyte_actions_collapsed",
+            "Triggered actions collapsed into an execution of the action already in flight",
+            ["action"],
+            registry=registry,
+        )
+        self.suppressed = Counter(
+            "lymphocyte_actions_suppressed",
+            "Triggered actions suppressed by their cooldown, debounce or rate limit",
+            ["action", "reason"],
+            registry=registry,
+        )
+        self.failed = Counter(
+            "lymphocyte_actions_failed",
+            "Actions that raised an exception",
+            ["action"],
+            registry=registry,
+        )
+
+    def watch_scheduler(self, scheduler: "ActionScheduler") -> None:
+        """Report the queued and running actions of a scheduler whenever the metrics are collected.
+
+        Args:
+            scheduler (ActionScheduler): The scheduler.
+        """
+        self.queued.set_function(lambda: scheduler.queued)
+        self.running.set_function(lambda: scheduler.running)
+
+    def action_finished(self, action: str, seconds: float) -> None:
+        self.duration.labels(action).observe(seconds)
+
+    def action_collapsed(self, action: str) -> None:
+        self.collapsed.labels(action).inc()
+
+    def action_suppressed(self, action: str, reason: str) -> None:
+        self.suppressed.labels(action, reason).inc()
+
+    def action_failed(self, action: str) -> None:
+        self.failed.labels(action).inc()
+
+
+class ActionScheduler:
+    """Performs triggered actions as tracked tasks, at most `max_concurrency` at once, and at most
+    `Action.max_concurrency` at once per action. Actions beyond these limits wait for a slot in
+    the order they were triggered.
+
+    Actions with `collapse` set are performed at most once at a time: triggering one while it is
+    queued or running returns the execution in flight instead of starting another one.
+    Exceptions of actions are logged.
+
+    Debounced triggers of all actions share a heap of deadlines, driven by a single timer of the
+    event loop set for the earliest deadline. Postponing an action pushes a new deadline, and
+    outdated deadlines are skipped when they are due. A debounced action is triggered in the
+    context of its latest trigger, so it sees the rule context snapshot of that cycle.
+    """
+
+    max_concurrency: int
+    metrics: ActionMetrics | None
+    queued: int
+    running: int
+
+    _slots: asyncio.Semaphore
+    _action_slots: dict[str, asyncio.Semaphore]
+    _in_flight: dict[str, asyncio.Task[None]]
+    _tasks: set[asyncio.Task[None]]
+    _debounced: dict[str, tuple[float, "Action", contextvars.Context]]
+    _deadlines: list[tuple[float, int, str]]
+    _sequence: Iterator[int]
+    _timer: asyncio.TimerHandle | None
+
+    def __init__(
+        self, max_concurrency: int = 64, metrics: ActionMetrics | None = None
+    ) -> None:
+        """Constructs an ActionScheduler object.
+
+        Args:
+            max_concurrency (int, optional): Actions performed at once. Defaults to 64.
+            metrics (ActionMetrics | None, optional): Metrics to record the actions in. Defaults to None.
+        """
+        self.max_concurrency = max_concurrency
+        self.metrics = metrics
+        self.queued = 0
+        self.running = 0
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._action_slots = {}
+        self._in_flight = {}
+        self._tasks = set()
+        self._debounced = {}
+        self._deadlines = []
+        self._sequence = itertools.count()
+        self._timer = None
+        if metrics is not None:
+            metrics.watch_scheduler(self)
+
+    @property
+    def tasks(self) -> frozenset[asyncio.Task[None]]:
+        """The tasks of the actions queued or running."""
+        return frozenset(self._tasks)
+
+    def submit(self, action: "Action") -> asyncio.Task[None]:
+        """Perform an action once there is a slot for it.
+
+        Args:
+            action (Action): The action.
+
+        Returns:
+            asyncio.Task[None]: The task performing the action, or the task already in flight when the action collapses.
+        """
+        if action.collapse and (task := self._in_flight.get(action.name)) is not None:
+            if self.metrics is not None:
+                self.metrics.action_collapsed(action.name)
+            return task
+
+        task = asyncio.create_task(self._perform(action), name=f"action {action.name}")
+        self._tasks.add(task)
+        task.add_done_callback(lambda task: self._done(action, task))
+        if action.collapse:
+            self._in_flight[action.name] = task
+        return task
+
+    def suppressed(self, action: "Action", reason: str) -> None:
+        """Record that a trigger of an action was suppressed.
+
+        Args:
+            action (Action): The action.
+            reason (str): What suppressed it: cooldown, debounce or rate_limit.
+        """
+        if self.metrics is not None:
+            self.metrics.action_suppressed(action.name, reason)
+
+    def debounce(self, action: "Action", seconds: float) -> None:
+        """Trigger an action after the given time, unless it is debounced again meanwhile, which
+        suppresses this trigger and postpones the action.
+
+        Args:
+            action (Action): The action.
+            seconds (float): Seconds to wait for another trigger.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        if action.name in self._debounced:
+            self.suppressed(action, "debounce")
+        self._debounced[action.name] = (deadline, action, contextvars.copy_context())
+        heapq.heappush(self._deadlines, (deadline, next(self._sequence), action.name))
+        self._set_timer(loop)
+
+    def _set_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        if not self._deadlines:
+            return
+        deadline = self._deadlines[0][0]
+        if self._timer is not None:
+            if self._timer.when() <= deadline:
+                return
+            self._timer.cancel()
+        self._timer = loop.call_at(
+            deadline, self._deadlines_due, loop, context=contextvars.Context()
+        )
+
+    def _deadlines_due(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._timer = None
+        now = loop.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            deadline, _, name = heapq.heappop(self._deadlines)
+            entry = self._debounced.get(name)
+            if entry is not None and entry[0] == deadline:
+                del self._debounced[name]
+                _, action, context = entry
+                context.run(action.trigger)
+        self._set_timer(loop)
+
+    def _action_limit(
+        self, action: "Action"
+    ) -> contextlib.AbstractAsyncContextManager[object]:
+        if action.max_concurrency is None:
+            return contextlib.nullcontext()
+        if (slots := self._action_slots.get(action.name)) is None:
+            slots = self._action_slots[action.name] = asyncio.Semaphore(
+                action.max_concurrency
+            )
+        return slots
+
+    async def _perform(self, action: "Action") -> None:
+        self.queued += 1
+        started = False
+        try:
+            # Wait for a slot of the action first, so it holds no global slot meanwhile
+            async with self._action_limit(action), self._slots:
+                self.queued -= 1
+                started = True
+                self.running += 1
+                start = time.perf_counter()
+                try:
+                    await action.perform()
+                finally:
+                    self.running -= 1
+                    if self.metrics is not None:
+                        self.metrics.action_finished(
+                            action.name, time.perf_counter() - start
+                        )
+        finally:
+            if not started:
+                self.queued -= 1
+
+    def _done(self, action: "Action", task: asyncio.Task[None]) -> None:
+        self._tasks.discard(task)
+        if self._in_flight.get(action.name) is task:
+            del self._in_flight[action.name]
+        if task.cancelled():
+            return
+        if (exception := task.exception()) is not None:
+            log.error("Action %s failed", action.name, exc_info=exception)
+            if self.metrics is not None:
+                self.metrics.action_failed(action.name)
+
+    async def join(self) -> None:
+        """Wait until all actions queued or running are done."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Cancel all actions debounced, queued or running, and wait for them to stop."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._debounced.clear()
+        self._deadlines.clear()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
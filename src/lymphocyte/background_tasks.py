@@ -1,19 +1,30 @@
 import asyncio
-import itertools
+import contextlib
+import datetime
 import json
 import logging
+import math
 import socket
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from typing import NoReturn, Protocol
 
 import httpx
 import websockets
 import websockets.uri
+from prometheus_client import Gauge
 
 from lymphocyte.events.bus import Event, EventBus, EventHandlerService
+from lymphocyte.events.handlers.tick import TickEventHandler
+from lymphocyte.events.journal import derived_events
+from lymphocyte.events.metrics import EventMetrics
+from lymphocyte.events.queue import EventQueue
 from lymphocyte.events.tick import TickEvent
 from lymphocyte.managers.outgoing_probes import OutgoingProbesManager
+from lymphocyte.managers.snapshot import RuleContext
 from lymphocyte.managers.threat_level import OtherThreatLevelsManager
+from lymphocyte.services.executors import ExecutorMetrics, Executors
+from lymphocyte.services.timers import Timer, TimerService
 from lymphocyte.settings import SingleOutgoingProbeSettings
 
 log = logging.getLogger(__name__)
@@ -34,48 +45,223 @@ class BackgroundTask(Protocol):
 class EventConsumerTask(BackgroundTask):
     """Background task which reads events from the given event bus and passes them to the given event handler.
 
+    Events are drained in batches of up to batch_size events per wakeup, lingering up to
+    batch_linger_seconds for a batch to fill up. The events derived from a batch are dispatched at once.
+    All handlers of a batch share a snapshot of the rule context, see RuleContext.cycle.
+
     Args:
         BackgroundTask (BackgroundTask): __
     """
 
-    from_queue: asyncio.Queue[Event]
+    from_queue: EventQueue
     event_handler_service: EventHandlerService
     to_queue: EventBus
+    batch_size: int = 64
+    batch_linger_seconds: float = 0
+    metrics: EventMetrics | None = None
+    context: RuleContext | None = None
+
+    async def handle_batch(self, events: list[Event]) -> list[Event]:
+        with self.context.cycle() if self.context else contextlib.nullcontext():
+            return await self._handle_batch(events)
+
+    async def _handle_batch(self, events: list[Event]) -> list[Event]:
+        new_events: list[Event] = []
+        for event in events:
+            derived = len(new_events)
+            try:
+                async for new_event in self.event_handler_service.handle(event):
+                    log.debug("Dispatched new event %s", new_event)
+                    new_events.append(new_event)
+                if self.metrics is not None:
+                    self.metrics.event_consumed(event, len(new_events) - derived)
+            except asyncio.exceptions.CancelledError:
+                raise
+            except Exception:  # Log all others # pylint: disable=broad-exception-caught
+                log.exception("Error while handling %s", event)
+        return new_events
 
     async def perform(self) -> None:
+        derived_events.set(True)
         while True:
             try:
-                event = await self.from_queue.get()
-                async for new_event in self.event_handler_service.handle(event):
-                    log.debug("Dispatched new event %s", new_event)
-                    await self.to_queue.dispatch_async(new_event)
-                self.from_queue.task_done()
+                events = await self.from_queue.get_many(
+                    self.batch_size, self.batch_linger_seconds
+                )
+                try:
+                    new_events = await self.handle_batch(events)
+                    if new_events:
+                        await self.to_queue.dispatch_many(new_events)
+                finally:
+                    for _ in events:
+                        self.from_queue.task_done()
             except asyncio.exceptions.CancelledError:
                 raise
             except Exception:  # Log all others # pylint: disable=broad-exception-caught
                 log.exception("Error during consuming")
 
 
+@dataclass
+class ShardedEventConsumerTask(BackgroundTask):
+    """Background task which reads events from the given event bus and spreads them over a pool of
+    EventConsumerTasks, each with its own queue, by the events' partition key. Events with the same
+    key are processed in order, while events with different keys can be processed concurrently.
+
+    Args:
+        BackgroundTask (BackgroundTask): Base class for background tasks.
+    """
+
+    from_queue: EventQueue
+    shards: list[EventConsumerTask]
+    batch_size: int = 64
+    shard_queue_depth_metric: Gauge | None = None
+    shard_skew_metric: Gauge | None = None
+
+    def __post_init__(self) -> None:
+        if self.shard_queue_depth_metric is not None:
+            for index, shard in enumerate(self.shards):
+                self.shard_queue_depth_metric.labels(shard=str(index)).set_function(
+                    shard.from_queue.qsize
+                )
+        if self.shard_skew_metric is not None:
+            self.shard_skew_metric.set_function(self.skew)
+
+    def skew(self) -> float:
+        """Depth of the deepest shard queue relative to the mean shard queue depth.
+
+        Returns:
+            float: 1 when the shards are evenly loaded, up to the number of shards when all events sit in one shard. 0 when all shard queues are empty.
+        """
+        depths = [shard.from_queue.qsize() for shard in self.shards]
+        if not any(depths):
+            return 0
+        return max(depths) * len(depths) / sum(depths)
+
+    def shard_for(self, event: Event) -> EventConsumerTask:
+        return self.shards[hash(event.partition_key) % len(self.shards)]
+
+    async def distribute(self) -> None:
+        while True:
+            try:
+                events = await self.from_queue.get_many(self.batch_size)
+                try:
+                    for event in events:
+                        await self.shard_for(event).from_queue.put(event)
+                finally:
+                    for _ in events:
+                        self.from_queue.task_done()
+            except asyncio.exceptions.CancelledError:
+                raise
+            except Exception:  # Log all others # pylint: disable=broad-exception-caught
+                log.exception("Error during distributing")
+
+    async def perform(self) -> None:
+        await asyncio.gather(
+            self.distribute(), *(shard.perform() for shard in self.shards)
+        )
+
+
+@dataclass
+class _Tick:
+    trigger: TickEventHandler
+    counter: int
+    deadline: float
+    due: datetime.datetime | None = None
+
+
 @dataclass
 class TickTriggerTask(BackgroundTask):
-    """Class for tick triggers. Places a Tick Event on the bus every second.
+    """Class for tick triggers. Places a TickEvent named after a tick trigger on the bus whenever
+    the trigger is due, see TickEventHandler.
+
+    Deadlines are kept on the time.monotonic() clock and advanced by the period of the trigger, so
+    ticks do not drift with the event loop lag; ticks missed while the loop was blocked are
+    skipped. Cron schedules follow the wall clock. The deadlines are timers of a TimerService,
+    which only wakes up when a trigger is due, and not at all without tick triggers.
 
     Args:
         BackgroundTask (BackgroundTask): Base class for background tasks.
     """
 
     event_bus: EventBus
+    triggers: list[TickEventHandler] = field(default_factory=list)
+    timers: TimerService = field(default_factory=TimerService)
+
+    _scheduled: dict[str, Timer] = field(init=False, repr=False, default_factory=dict)
+
+    def _schedule(self, tick: _Tick, now: float) -> None:
+        trigger = tick.trigger
+        if trigger.schedule is not None:
+            wall = datetime.datetime.now()
+            # Not before the previous time on the schedule, in case the clocks disagree
+            tick.due = trigger.schedule.next_after(max(wall, tick.due or wall))
+            tick.deadline = now + (tick.due - wall).total_seconds()
+            tick.counter += 1
+        else:
+            periods = max(
+                math.floor((now - tick.deadline) / trigger.every_n_seconds) + 1, 1
+            )
+            tick.deadline += periods * trigger.every_n_seconds
+            tick.counter += periods
+        self._scheduled[trigger.name] = self.timers.schedule_at(
+            tick.deadline, self._tick, name="tick_trigger", data=tick
+        )
+
+    async def _tick(self, timer: Timer) -> None:
+        tick: _Tick = timer.data
+        counter = tick.counter
+        self._schedule(tick, time.monotonic())
+        # Ticks are input from the outside world, a replay does not run the tick triggers
+        token = derived_events.set(False)
+        try:
+            await self.event_bus.dispatch_async(
+                TickEvent(counter=counter, name=tick.trigger.name)
+            )
+        finally:
+            derived_events.reset(token)
+
+    async def perform(self) -> None:
+        now = time.monotonic()
+        for trigger in self.triggers:
+            self._schedule(_Tick(trigger, 0, now), now)
+        try:
+            await asyncio.get_running_loop().create_future()
+        finally:
+            for timer in self._scheduled.values():
+                self.timers.cancel(timer)
+            self._scheduled.clear()
+
+
+@dataclass
+class LoopLagMonitorTask(BackgroundTask):
+    """Measures how late the event loop wakes up a task sleeping for a fixed interval, which is
+    the time the loop was blocked by work that was not offloaded.
+
+    Args:
+        BackgroundTask (BackgroundTask): Base class for background tasks.
+    """
+
+    metrics: ExecutorMetrics
+    interval_seconds: float = 0.5
 
     async def perform(self) -> None:
-        for counter in itertools.count(1):
-            await asyncio.sleep(1)
-            await self.event_bus.dispatch_async(TickEvent(counter=counter))
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval_seconds)
+            self.metrics.loop_lagged(
+                max(loop.time() - start - self.interval_seconds, 0.0)
+            )
 
 
 @dataclass
 class ThreatLevelMonitorTask(BackgroundTask):
     """Monitors the threat level of other lymphos.
 
+    The host name of the uri is resolved every resolve_interval_seconds, connecting to each host
+    it resolves to. The threat levels of hosts it no longer resolves to are removed, and so are
+    those not received for stale_after_seconds.
+
     Args:
         BackgroundTask (BackgroundTask): Base class for background tasks.
     """
@@ -83,6 +269,9 @@ class ThreatLevelMonitorTask(BackgroundTask):
     identifier: str
     uri: str
     other_threat_levels_manager: OtherThreatLevelsManager
+    executors: Executors = field(default_factory=Executors)
+    stale_after_seconds: float | None = None
+    resolve_interval_seconds: float = 5
 
     async def perform(self) -> None:
         hostname = websockets.uri.parse_uri(self.uri).host
@@ -92,14 +281,18 @@ class ThreatLevelMonitorTask(BackgroundTask):
         while True:
             try:
                 if not first:
-                    await asyncio.sleep(5)
+                    await asyncio.sleep(self.resolve_interval_seconds)
                 else:
                     first = False
 
+                resolved = True
                 try:
-                    _, _, hosts = socket.gethostbyname_ex(hostname)
+                    _, _, hosts = await self.executors.run(
+                        socket.gethostbyname_ex, hostname
+                    )
                 except socket.gaierror:
                     hosts = []
+                    resolved = False
 
                 for host, task in tasks.items():
                     if host not in hosts:
@@ -107,6 +300,11 @@ class ThreatLevelMonitorTask(BackgroundTask):
                             "Stopping task for host %s: %s", host, task.get_name()
                         )
                         task.cancel()
+                        # Failing lookups may be temporary, stale threat levels expire anyway
+                        if resolved:
+                            await self.other_threat_levels_manager.remove(
+                                self.identifier, host
+                            )
 
                 # Remove tasks that are done from the task dict
                 tasks = {host: task for host, task in tasks.items() if not task.done()}
@@ -125,6 +323,9 @@ class ThreatLevelMonitorTask(BackgroundTask):
                         )
             except asyncio.exceptions.CancelledError:
                 log.debug("Canceled connection manager")
+                for task in tasks.values():
+                    task.cancel()
+                await asyncio.gather(*tasks.values(), return_exceptions=True)
                 return
             except Exception:  # Log all others # pylint: disable=broad-exception-caught
                 log.exception("Exception in websocket connection manager")
@@ -173,6 +374,7 @@ class ThreatLevelMonitorTask(BackgroundTask):
                                 identifier=identifier,
                                 host=host,
                                 level=response["threat_level"],
+                                stale_after_seconds=self.stale_after_seconds,
                             )
                     except asyncio.exceptions.CancelledError:
                         raise
@@ -0,0 +1,145 @@
+"""
+Measures the events/second the EventConsumerTask gets through with a few hundred rules, triggers
+and actions registered. Compares handing every event to every handler as a scheduled task, routing
+through the handler index with a task per routed handler, and the inline fast path for synchronous
+handlers, and the cost of recording the event bus metrics on top of the inline fast path.
+
+Run with `python -m lymphocyte.benchmarks.event_consumer` from the `src` directory.
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import AsyncIterable, Callable, Iterable
+from dataclasses import dataclass
+
+from prometheus_client import CollectorRegistry
+
+from lymphocyte.actions.action import Action
+from lymphocyte.background_tasks import EventConsumerTask
+from lymphocyte.events.bus import Event, EventBus, EventHandler, EventHandlerService
+from lymphocyte.events.handlers.tick import TickEventHandler
+from lymphocyte.events.handlers.webhook import WebhookEventHandler
+from lymphocyte.events.metrics import EventMetrics
+from lymphocyte.events.queue import EventQueue
+from lymphocyte.events.tick import TickEvent
+from lymphocyte.events.webhook import WebhookEvent
+from lymphocyte.rules.conditional_rule import ConditionalRule
+
+
+@dataclass
+class NoopAction(Action):
+    async def perform(self) -> None:
+        pass
+
+
+class LegacyEventHandlerService(EventHandlerService):
+    """Hands every event to every handler, each as its own task."""
+
+    async def handle(self, event: Event) -> AsyncIterable[Event]:
+        for new_events in asyncio.as_completed(
+            [handler.handle(event) for handler in self.handlers]
+        ):
+            for new_event in await new_events:
+                yield new_event
+
+
+class IndexedTaskEventHandlerService(EventHandlerService):
+    """Routes events through the index, but still schedules a task per handler."""
+
+    async def handle(self, event: Event) -> AsyncIterable[Event]:
+        route = self.routes(event)
+        if not route:
+            return
+        for new_events in asyncio.as_completed(
+            [handler.handle(event) for handler in route]
+        ):
+            for new_event in await new_events:
+                yield new_event
+
+
+def create_handlers(count: int) -> list[EventHandler]:
+    handlers: list[EventHandler] = []
+    for i in range(count):
+        handlers += [
+            TickEventHandler(f"tick_{i}", every_n_seconds=60),
+            WebhookEventHandler(f"webhook_{i}", exact_match=f"hook_{i}"),
+            ConditionalRule(triggers=[f"webhook_{i}"], actions=[f"action_{i}"]),
+            NoopAction(f"action_{i}"),
+        ]
+    return handlers
+
+
+def create_events(count: int, handlers: int) -> Iterable[Event]:
+    for i in range(count):
+        if i % 2:
+            yield TickEvent(counter=i, name=f"tick_{i % handlers}")
+        else:
+            yield WebhookEvent(f"hook_{i % handlers}")
+
+
+async def measure(
+    service_factory: Callable[[list[EventHandler]], EventHandlerService],
+    handlers: int,
+    events: int,
+    batch_size: int,
+    metrics: EventMetrics | None = None,
+) -> float:
+    queue = EventQueue(metrics=metrics)
+    service = service_factory(create_handlers(handlers))
+    service.metrics = metrics
+    task = EventConsumerTask(
+        from_queue=queue,
+        event_handler_service=service,
+        to_queue=EventBus(queue, metrics=metrics),
+        batch_size=batch_size,
+        metrics=metrics,
+    )
+    for event in create_events(events, handlers):
+        queue.put_nowait(event)
+
+    start = time.perf_counter()
+    consumer = asyncio.create_task(task.perform())
+    await queue.join()
+    elapsed = time.perf_counter() - start
+
+    consumer.cancel()
+    await asyncio.gather(consumer, return_exceptions=True)
+    return events / elapsed
+
+
+async def main(handlers: int, events: int, batch_size: int) -> None:
+    results = {}
+    for name, factory in [
+        ("all handlers, task per handler", LegacyEventHandlerService),
+        ("indexed, task per handler", IndexedTaskEventHandlerService),
+        ("indexed, inline sync handlers", EventHandlerService),
+    ]:
+        results[name] = await measure(factory, handlers, events, batch_size)
+        print(f"{name:<32} {results[name]:>12,.0f} events/s")
+
+    instrumented = await measure(
+        EventHandlerService,
+        handlers,
+        events,
+        batch_size,
+        metrics=EventMetrics(registry=CollectorRegistry()),
+    )
+    print(f"{'inline, with metrics':<32} {instrumented:>12,.0f} events/s")
+
+    baseline = results["all handlers, task per handler"]
+    tasks = results["indexed, task per handler"]
+    inline = results["indexed, inline sync handlers"]
+    print(f"{'speedup over all handlers':<32} {inline / baseline:>12.1f}x")
+    print(f"{'speedup over task per handler':<32} {inline / tasks:>12.1f}x")
+    print(f"{'metrics overhead':<32} {1 - instrumented / inline:>12.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--handlers", type=int, default=100)
+    parser.add_argument("--events", type=int, default=2_000)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.handlers, args.events, args.batch_size))
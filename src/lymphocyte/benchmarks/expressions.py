@@ -0,0 +1,77 @@
+"""
+Measures how long compiling and evaluating the rule conditions and probe expressions of
+`settings.yaml` takes with the Jinja sandbox backend and with the restricted Python backend,
+against the context objects of a container built from the same settings.
+
+Run with `python -m lymphocyte.benchmarks.expressions` from the `src` directory.
+"""
+
+import argparse
+import functools
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from lymphocyte.expressions.cache import ExpressionCompiler, create_environment
+from lymphocyte.expressions.python import compile_python_expression
+from lymphocyte.main_utils import create_settings
+from lymphocyte.replay import create_replay_container
+from lymphocyte.settings import Settings
+
+SETTINGS = Path(__file__).parent.parent / "settings.yaml"
+
+
+def collect_expressions(settings: Settings) -> list[str]:
+    expressions = [
+        str(rule.model_extra["condition"]).strip()
+        for rule in settings.rules
+        if rule.model_extra and rule.model_extra.get("condition")
+    ]
+    expressions += [
+        settings.incoming_probes.startup_expression.strip(),
+        settings.incoming_probes.readiness_expression.strip(),
+        settings.incoming_probes.liveness_expression.strip(),
+    ]
+    return list(dict.fromkeys(expressions))
+
+
+def per_call(function: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=5)) / number
+
+
+def main(settings_file: str, number: int) -> None:
+    settings = create_settings(settings_file)
+    context = create_replay_container(settings).context()
+    backends: dict[str, ExpressionCompiler] = {
+        "jinja": create_environment().compile_expression,
+        "python": compile_python_expression,
+    }
+
+    print(f"{'expression':<40} {'backend':<8} {'compile':>12} {'evaluate':>12}")
+    totals = dict.fromkeys(backends, 0.0)
+    for expression in collect_expressions(settings):
+        for name, compiler in backends.items():
+            compile_seconds = per_call(
+                functools.partial(compiler, expression), number // 100
+            )
+            compiled = compiler(expression)
+            evaluate_seconds = per_call(functools.partial(compiled, context), number)
+            totals[name] += evaluate_seconds
+            print(
+                f"{expression[:40]:<40} {name:<8} "
+                f"{compile_seconds * 1e6:>9.1f} µs {evaluate_seconds * 1e6:>9.2f} µs"
+            )
+    print(
+        f"{'speedup evaluating all expressions':<49} "
+        f"{totals['jinja'] / totals['python']:>25.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--settings", default=str(SETTINGS))
+    parser.add_argument("--number", type=int, default=20_000)
+    args = parser.parse_args()
+
+    main(args.settings, args.number)
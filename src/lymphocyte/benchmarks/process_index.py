@@ -0,0 +1,94 @@
+"""
+Measures how long finding the processes to kill takes with a few thousand processes running.
+Compares the scan KillAction used to do, reading the uids of every process, with building a
+ProcessIndex, refreshing it incrementally or fully and looking processes up in it.
+
+Starts the given number of sleeping processes, so mind the process limit of the user.
+
+Run with `python -m lymphocyte.benchmarks.process_index` from the `src` directory.
+"""
+
+import argparse
+import os
+import subprocess  # nosec B404
+import time
+import timeit
+import uuid
+from collections.abc import Callable
+from typing import Any
+
+import psutil
+
+from lymphocyte.services.process_index import ProcessIndex
+
+
+def legacy_find(uid: int) -> list[psutil.Process]:
+    return [p for p in psutil.process_iter() if p.uids().real == uid]
+
+
+def per_call(function: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(function, number=number, repeat=3)) / number
+
+
+def report(name: str, seconds: float) -> None:
+    print(f"{name:<48} {seconds * 1e3:>10.3f} ms")
+
+
+def main(processes: int, started: int, number: int) -> None:
+    marker = uuid.uuid4().hex
+    command = ["bash", "-c", f"exec -a sleep-{marker} sleep 3600"]
+
+    def spawn() -> "subprocess.Popen[bytes]":
+        # The command is fixed, not taken from input
+        return subprocess.Popen(command)  # nosec B603
+
+    children = [spawn() for _ in range(processes)]
+    uid = os.getuid()
+    try:
+        print(f"{len(psutil.pids())} processes running")
+
+        report("scan reading uids (legacy)", per_call(lambda: legacy_find(uid), number))
+
+        def build() -> ProcessIndex:
+            index = ProcessIndex()
+            index.watch("cmdline", marker)
+            index.refresh()
+            return index
+
+        report("build index", per_call(build, number))
+        index = build()
+        report("refresh index, nothing changed", per_call(index.refresh, number))
+        report(
+            "refresh index fully", per_call(lambda: index.refresh(full=True), number)
+        )
+
+        seconds = 0.0
+        for _ in range(number):
+            children += [spawn() for _ in range(started)]
+            start = time.perf_counter()
+            index.refresh()
+            seconds += time.perf_counter() - start
+        report(f"refresh index, {started} processes started", seconds / number)
+
+        report("find by uid", per_call(lambda: index.find(uid=uid), number * 100))
+        report(
+            "find by uid and cmdline",
+            per_call(lambda: index.find(uid=uid, cmdline=marker), number * 100),
+        )
+        if len(index.find(uid=uid, cmdline=marker)) != len(children):
+            raise RuntimeError("The index did not find all started processes")
+    finally:
+        for child in children:
+            child.kill()
+        for child in children:
+            child.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=2000)
+    parser.add_argument("--started", type=int, default=10)
+    parser.add_argument("--number", type=int, default=5)
+    args = parser.parse_args()
+
+    main(args.processes, args.started, args.number)
@@ -1,4 +1,4 @@
-import asyncio
+import functools
 import itertools
 
 from dependency_injector import containers, providers
@@ -7,6 +7,7 @@ from prometheus_client import Gauge
 from lymphocyte.actions.debug import DebugAction
 from lymphocyte.actions.kill import KillAction
 from lymphocyte.actions.request import SendRestRequestAction
+from lymphocyte.actions.scheduler import ActionMetrics, ActionScheduler
 from lymphocyte.actions.threat_level import (
     IncrementThreatLevelAction,
     ResetThreatLevelAction,
@@ -21,26 +22,48 @@ from lymphocyte.container_utils import (
     create_app,
     create_background_tasks,
     create_event_handlers,
+    create_event_journal,
+    create_event_queue,
     create_instrumentors,
+    create_threat_level_metric,
 )
-from lymphocyte.events.bus import Event, EventBus, EventHandlerService
+from lymphocyte.events.bus import EventBus, EventHandlerService
 from lymphocyte.events.handlers.prometheus import PrometheusAlertStatusChangedHandler
-from lymphocyte.events.handlers.threat_level import (
-    PrometheusThreatLevelChangedHandler,
-    ThreatLevelChangedHandler,
-)
+from lymphocyte.events.handlers.threat_level import ThreatLevelChangedHandler
 from lymphocyte.events.handlers.tick import TickEventHandler
-from lymphocyte.events.handlers.ttl import TTLChangedEventHandler, TTLResetEventHandler
+from lymphocyte.events.handlers.ttl import (
+    TTLChangedEventHandler,
+    TTLResetEventHandler,
+    TTLThresholdReachedEventHandler,
+)
 from lymphocyte.events.handlers.webhook import WebhookEventHandler
+from lymphocyte.events.metrics import EventMetrics
+from lymphocyte.expressions.cache import (
+    ExpressionCache,
+    create_environment,
+    jinja_expression_names,
+)
+from lymphocyte.expressions.python import (
+    compile_python_expression,
+    python_expression_names,
+)
+from lymphocyte.managers.decay import HalfLifeDecay, LinearDecay
 from lymphocyte.managers.outgoing_probes import OutgoingProbesManager
 from lymphocyte.managers.prometheus import PrometheusManager
+from lymphocyte.managers.snapshot import RuleContext
 from lymphocyte.managers.threat_level import (
+    DecayingThreatLevelManager,
     OtherThreatLevelsManager,
     ThreatLevelManager,
 )
 from lymphocyte.managers.ttl import TTLManager
 from lymphocyte.rules.conditional_rule import ConditionalRule
+from lymphocyte.services.executors import ExecutorMetrics, Executors
+from lymphocyte.services.http_client import HTTPClientMetrics, HTTPClientPool
 from lymphocyte.services.probe_service import ProbeService
+from lymphocyte.services.process_index import ProcessIndex
+from lymphocyte.services.timers import TimerService
+from lymphocyte.settings import HTTPClientSettings
 
 
 class Container(containers.DeclarativeContainer):
@@ -49,17 +72,59 @@ class Container(containers.DeclarativeContainer):
     config = providers.Configuration(strict=True)
     wiring_config = containers.WiringConfiguration(packages=["lymphocyte.routers"])
 
-    queue: providers.Object[asyncio.Queue[Event]] = providers.Object(asyncio.Queue())
-    event_bus = providers.Factory(EventBus, queue=queue)
+    event_metrics: providers.Object[EventMetrics] = providers.Object(EventMetrics())
+    queue = providers.ThreadSafeSingleton(
+        create_event_queue, config=config.event_bus, metrics=event_metrics
+    )
+    event_journal = providers.Resource(create_event_journal, config=config.event_bus)
+    event_bus = providers.Factory(
+        EventBus, queue=queue, metrics=event_metrics, journal=event_journal
+    )
+
+    timers = providers.ThreadSafeSingleton(TimerService)
 
-    threat_level_manager = providers.ThreadSafeSingleton(
-        ThreatLevelManager, event_bus=event_bus, base_level=0
+    threat_level_manager = providers.Selector(
+        config.threat_level.decay,
+        none=providers.ThreadSafeSingleton(
+            ThreatLevelManager,
+            event_bus=event_bus,
+            base_level=config.threat_level.base_level,
+            timers=timers,
+            history_capacity=config.threat_level.history_capacity,
+        ),
+        half_life=providers.ThreadSafeSingleton(
+            DecayingThreatLevelManager,
+            event_bus=event_bus,
+            base_level=config.threat_level.base_level,
+            decay=providers.Factory(
+                HalfLifeDecay, config.threat_level.half_life_seconds
+            ),
+            thresholds=config.threat_level.thresholds,
+            timers=timers,
+            history_capacity=config.threat_level.history_capacity,
+        ),
+        linear=providers.ThreadSafeSingleton(
+            DecayingThreatLevelManager,
+            event_bus=event_bus,
+            base_level=config.threat_level.base_level,
+            decay=providers.Factory(LinearDecay, config.threat_level.leak_per_second),
+            thresholds=config.threat_level.thresholds,
+            timers=timers,
+            history_capacity=config.threat_level.history_capacity,
+        ),
     )
     other_threat_levels_manager = providers.ThreadSafeSingleton(
-        OtherThreatLevelsManager, event_bus=event_bus
+        OtherThreatLevelsManager,
+        event_bus=event_bus,
+        history_capacity=config.threat_level.neighbor_history_capacity,
+        timers=timers,
     )
     ttl_manager = providers.ThreadSafeSingleton(
-        TTLManager, event_bus=event_bus, base_ttl=config.ttl_manager.base_ttl_seconds
+        TTLManager,
+        event_bus=event_bus,
+        base_ttl=config.ttl_manager.base_ttl_seconds,
+        thresholds=config.ttl_manager.thresholds,
+        timers=timers,
     )
     prometheus_manager = providers.ThreadSafeSingleton(
         PrometheusManager, event_bus=event_bus
@@ -80,7 +145,7 @@ class Container(containers.DeclarativeContainer):
         initial_status=False,
     )
 
-    context = providers.Dict(
+    live_context = providers.Dict(
         other_threat_levels_manager=other_threat_levels_manager,
         threat_level_manager=threat_level_manager,
         ttl_manager=ttl_manager,
@@ -91,13 +156,63 @@ class Container(containers.DeclarativeContainer):
         outgoing_readiness_probe_manager=outgoing_readiness_probe_manager,
         outgoing_liveness_probe_manager=outgoing_liveness_probe_manager,
     )
-    probe_service = providers.Factory(
+    environment = providers.ThreadSafeSingleton(create_environment)
+    expressions = providers.ThreadSafeSingleton(
+        ExpressionCache,
+        compiler=providers.Selector(
+            config.expressions.backend,
+            jinja=environment.provided.compile_expression,
+            python=providers.Object(compile_python_expression),
+        ),
+        maxsize=config.expressions.cache_size,
+        analyzer=providers.Selector(
+            config.expressions.backend,
+            jinja=providers.Factory(
+                functools.partial, jinja_expression_names, environment
+            ),
+            python=providers.Object(python_expression_names),
+        ),
+    )
+
+    context = providers.Factory(RuleContext, live_context)
+
+    http_client_metrics: providers.Object[HTTPClientMetrics] = providers.Object(
+        HTTPClientMetrics()
+    )
+    http_client = providers.ThreadSafeSingleton(
+        HTTPClientPool,
+        settings=providers.Factory(
+            HTTPClientSettings.model_validate, config.http_client
+        ),
+        metrics=http_client_metrics,
+    )
+
+    probe_service = providers.ThreadSafeSingleton(
         ProbeService,
         ttl_manager=ttl_manager,
         startup_expression=config.incoming_probes.startup_expression,
         readiness_expression=config.incoming_probes.readiness_expression,
         liveness_expression=config.incoming_probes.liveness_expression,
         context=context,
+        expressions=expressions,
+    )
+
+    process_index = providers.ThreadSafeSingleton(ProcessIndex)
+
+    executor_metrics: providers.Object[ExecutorMetrics] = providers.Object(
+        ExecutorMetrics()
+    )
+    executors = providers.ThreadSafeSingleton(
+        Executors,
+        threads=config.executors.threads,
+        metrics=executor_metrics,
+    )
+
+    action_metrics: providers.Object[ActionMetrics] = providers.Object(ActionMetrics())
+    action_scheduler = providers.ThreadSafeSingleton(
+        ActionScheduler,
+        max_concurrency=config.action_scheduler.max_concurrency,
+        metrics=action_metrics,
     )
 
     factories = providers.Aggregate(
@@ -105,29 +220,56 @@ class Container(containers.DeclarativeContainer):
             tick_event=providers.Factory(TickEventHandler),
             ttl_reset=providers.Factory(TTLResetEventHandler),
             ttl_changed=providers.Factory(TTLChangedEventHandler),
+            ttl_threshold=providers.Factory(TTLThresholdReachedEventHandler),
             webhook=providers.Factory(WebhookEventHandler),
             threat_level=providers.Factory(ThreatLevelChangedHandler),
             prometheus_alert=providers.Factory(PrometheusAlertStatusChangedHandler),
         ),
         rules=providers.FactoryAggregate(
-            conditional=providers.Factory(ConditionalRule, context=context)
+            conditional=providers.Factory(
+                ConditionalRule, context=context, expressions=expressions
+            )
         ),
         actions=providers.FactoryAggregate(
-            debug=providers.Factory(DebugAction, context=context),
-            kill=providers.Factory(KillAction),
-            send_rest_request=providers.Factory(SendRestRequestAction),
+            debug=providers.Factory(
+                DebugAction,
+                context=context,
+                environment=environment,
+                scheduler=action_scheduler,
+            ),
+            kill=providers.Factory(
+                KillAction,
+                processes=process_index,
+                executors=executors,
+                scheduler=action_scheduler,
+            ),
+            send_rest_request=providers.Factory(
+                SendRestRequestAction,
+                http_client=http_client,
+                scheduler=action_scheduler,
+            ),
             increment_threat_level=providers.Factory(
-                IncrementThreatLevelAction, threat_level_manager=threat_level_manager
+                IncrementThreatLevelAction,
+                threat_level_manager=threat_level_manager,
+                scheduler=action_scheduler,
             ),
             reset_threat_level=providers.Factory(
-                ResetThreatLevelAction, threat_level_manager=threat_level_manager
+                ResetThreatLevelAction,
+                threat_level_manager=threat_level_manager,
+                scheduler=action_scheduler,
+            ),
+            scale_TTL=providers.Factory(
+                ScaleTTLAction, ttl_manager=ttl_manager, scheduler=action_scheduler
             ),
-            scale_TTL=providers.Factory(ScaleTTLAction, ttl_manager=ttl_manager),
             decrement_TTL=providers.Factory(
-                DecrementTTLAction, ttl_manager=ttl_manager
+                DecrementTTLAction, ttl_manager=ttl_manager, scheduler=action_scheduler
+            ),
+            set_TTL=providers.Factory(
+                SetTTLAction, ttl_manager=ttl_manager, scheduler=action_scheduler
+            ),
+            restart_TTL=providers.Factory(
+                RestartTTLAction, ttl_manager=ttl_manager, scheduler=action_scheduler
             ),
-            set_TTL=providers.Factory(SetTTLAction, ttl_manager=ttl_manager),
-            restart_TTL=providers.Factory(RestartTTLAction, ttl_manager=ttl_manager),
         ),
     )
 
@@ -141,14 +283,30 @@ class Container(containers.DeclarativeContainer):
         factories=factories,
     )
 
-    metric_threat_level: providers.Object[Gauge] = providers.Object(
-        Gauge("lymphocyte_threat_level", "Threat level of lymphocyte")
+    metric_threat_level = providers.Resource(
+        create_threat_level_metric,
+        gauge=providers.Object(
+            Gauge("lymphocyte_threat_level", "Threat level of lymphocyte")
+        ),
+        threat_level_manager=threat_level_manager,
     )
 
-    extra_event_handler_factories = providers.List(
-        providers.Factory(PrometheusThreatLevelChangedHandler, metric_threat_level)
+    metric_event_shard_queue_depth: providers.Object[Gauge] = providers.Object(
+        Gauge(
+            "lymphocyte_event_shard_queue_depth",
+            "Events waiting per event consumer shard",
+            ["shard"],
+        )
+    )
+    metric_event_shard_skew: providers.Object[Gauge] = providers.Object(
+        Gauge(
+            "lymphocyte_event_shard_skew",
+            "Deepest event consumer shard queue relative to the mean shard queue depth",
+        )
     )
 
+    extra_event_handler_factories = providers.List()
+
     event_handler_service = providers.ThreadSafeSingleton(
         EventHandlerService,
         handlers=providers.Factory(
@@ -157,11 +315,20 @@ class Container(containers.DeclarativeContainer):
                 itertools.chain, rule_event_handlers, extra_event_handler_factories
             ),
         ),
+        metrics=event_metrics,
     )
 
     background_tasks = providers.Resource(create_background_tasks, __self__, config)
     instrumentors = providers.Resource(
-        create_instrumentors, background_tasks=background_tasks
+        create_instrumentors,
+        background_tasks=background_tasks,
+        startup_handlers=providers.List(timers.provided.start),
+        shutdown_handlers=providers.List(
+            action_scheduler.provided.aclose,
+            http_client.provided.aclose,
+            executors.provided.aclose,
+            timers.provided.aclose,
+        ),
     )
     fastapi_app = providers.Resource(
         create_app,
@@ -1,24 +1,39 @@
-from collections.abc import Iterable
-from typing import TypeVar
+from collections.abc import Awaitable, Callable, Generator, Iterable
+from typing import Any, TypeVar
 
 from dependency_injector import containers, providers
 from fastapi import FastAPI
+from prometheus_client import Gauge
 
 from lymphocyte.background_tasks import (
     BackgroundTask,
     EventConsumerTask,
+    LoopLagMonitorTask,
     ProbeTask,
+    ShardedEventConsumerTask,
     ThreatLevelMonitorTask,
     TickTriggerTask,
 )
+from lymphocyte.events.handlers.tick import TickEventHandler
+from lymphocyte.events.journal import EventJournal
+from lymphocyte.events.metrics import EventMetrics
+from lymphocyte.events.queue import EventQueue, Lane
 from lymphocyte.instrumentors import (
     InstrumentFastAPI,
     RegisterBackgroundTasks,
     RegisterMiddlewares,
     RegisterPrometheus,
     RegisterRoutes,
+    RegisterShutdown,
+    RegisterStartup,
+)
+from lymphocyte.managers.threat_level import ThreatLevelManager
+from lymphocyte.settings import (
+    EventBusSettings,
+    ExecutorSettings,
+    NeighborSetting,
+    SingleOutgoingProbeSettings,
 )
-from lymphocyte.settings import SingleOutgoingProbeSettings
 
 T = TypeVar("T")
 
@@ -40,29 +55,145 @@ def create_event_handlers(
     return result
 
 
+def create_event_queue(
+    config: dict[str, Any], metrics: EventMetrics | None = None
+) -> EventQueue:
+    settings = EventBusSettings.model_validate(config)
+    queue = EventQueue(
+        lanes=[
+            (
+                Lane(
+                    name=lane.name,
+                    priority=lane.priority,
+                    capacity=lane.capacity,
+                    overflow=lane.overflow,
+                ),
+                lane.events,
+            )
+            for lane in settings.lanes
+        ],
+        default_lane=settings.default_lane,
+        coalesce=settings.coalesce,
+        metrics=metrics,
+    )
+    if metrics is not None:
+        metrics.watch_queue(queue)
+    return queue
+
+
+def create_event_journal(
+    config: dict[str, Any]
+) -> Generator[EventJournal | None, None, None]:
+    settings = EventBusSettings.model_validate(config).journal
+    if not settings.enabled:
+        yield None
+        return
+
+    journal = EventJournal(
+        settings.directory,
+        max_file_bytes=settings.max_file_bytes,
+        max_files=settings.max_files,
+    )
+    try:
+        yield journal
+    finally:
+        journal.close()
+
+
+def create_threat_level_metric(
+    gauge: Gauge, threat_level_manager: ThreatLevelManager
+) -> Gauge:
+    """Let the threat level gauge read the current threat level whenever it is scraped, so it
+    follows a decaying threat level, which changes without events."""
+    gauge.set_function(lambda: threat_level_manager.current)
+    return gauge
+
+
 def create_background_tasks(
     container: containers.Container,
     config: providers.Configuration,
 ) -> list[BackgroundTask]:
     tasks: list[BackgroundTask] = []
 
+    event_bus_settings = EventBusSettings.model_validate(config["event_bus"])
+    if event_bus_settings.workers == 1:
+        tasks += [
+            EventConsumerTask(
+                from_queue=container.queue(),
+                event_handler_service=container.event_handler_service(),
+                to_queue=container.event_bus(),
+                batch_size=event_bus_settings.batch_size,
+                batch_linger_seconds=event_bus_settings.batch_linger_seconds,
+                metrics=container.event_metrics(),
+                context=container.context(),
+            )
+        ]
+    else:
+        tasks += [
+            ShardedEventConsumerTask(
+                from_queue=container.queue(),
+                shards=[
+                    EventConsumerTask(
+                        from_queue=EventQueue(
+                            lanes=[
+                                (
+                                    Lane(
+                                        "shard",
+                                        capacity=event_bus_settings.shard_capacity,
+                                    ),
+                                    [],
+                                )
+                            ],
+                            default_lane="shard",
+                            coalesce=False,
+                        ),
+                        event_handler_service=container.event_handler_service(),
+                        to_queue=container.event_bus(),
+                        batch_size=event_bus_settings.batch_size,
+                        batch_linger_seconds=event_bus_settings.batch_linger_seconds,
+                        metrics=container.event_metrics(),
+                        context=container.context(),
+                    )
+                    for _ in range(event_bus_settings.workers)
+                ],
+                batch_size=event_bus_settings.batch_size,
+                shard_queue_depth_metric=container.metric_event_shard_queue_depth(),
+                shard_skew_metric=container.metric_event_shard_skew(),
+            )
+        ]
+
     tasks += [
-        EventConsumerTask(
-            from_queue=container.queue(),
-            event_handler_service=container.event_handler_service(),
-            to_queue=container.event_bus(),
+        TickTriggerTask(
+            event_bus=container.event_bus(),
+            triggers=[
+                handler
+                for handler in container.event_handler_service().handlers
+                if isinstance(handler, TickEventHandler)
+            ],
+            timers=container.timers(),
         )
     ]
 
-    tasks += [TickTriggerTask(event_bus=container.event_bus())]
+    tasks += [
+        LoopLagMonitorTask(
+            metrics=container.executor_metrics(),
+            interval_seconds=ExecutorSettings.model_validate(
+                config["executors"]
+            ).loop_lag_interval_seconds,
+        )
+    ]
 
     tasks += [
         ThreatLevelMonitorTask(
-            identifier=neighbor["identifier"],
-            uri=neighbor["threat_level_websocket_url"],
+            identifier=neighbor.identifier,
+            uri=neighbor.threat_level_websocket_url,
             other_threat_levels_manager=container.other_threat_levels_manager(),
+            executors=container.executors(),
+            stale_after_seconds=neighbor.stale_after_seconds,
+        )
+        for neighbor in map(
+            NeighborSetting.model_validate, container.config()["neighbors"]
         )
-        for neighbor in container.config()["neighbors"]
     ]
 
     if config["outgoing_probes"]["startup"]:
@@ -107,10 +238,14 @@ def create_background_tasks(
 
 def create_instrumentors(
     background_tasks: list[BackgroundTask],
+    shutdown_handlers: Iterable[Callable[[], Awaitable[None]]] = (),
+    startup_handlers: Iterable[Callable[[], Awaitable[None]]] = (),
 ) -> Iterable[InstrumentFastAPI]:
     instrumentors: list[InstrumentFastAPI] = []
 
+    instrumentors += [RegisterStartup(list(startup_handlers))]
     instrumentors += [RegisterBackgroundTasks(background_tasks)]
+    instrumentors += [RegisterShutdown(list(shutdown_handlers))]
     instrumentors += [RegisterRoutes()]
     instrumentors += [RegisterMiddlewares([])]
     instrumentors += [RegisterPrometheus()]
@@ -1,8 +1,15 @@
 import asyncio
 import logging
-from collections.abc import AsyncIterable, Iterable
-from dataclasses import dataclass
-from typing import Protocol
+import time
+from collections import Counter
+from collections.abc import AsyncIterable, Hashable, Iterable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Protocol, runtime_checkable
+
+if TYPE_CHECKING:
+    from lymphocyte.events.journal import EventJournal
+    from lymphocyte.events.metrics import EventMetrics
+    from lymphocyte.events.queue import EventQueue
 
 log = logging.getLogger(__name__)
 
@@ -11,6 +18,30 @@ log = logging.getLogger(__name__)
 class Event:
     """Base Event class."""
 
+    @property
+    def routing_name(self) -> str | None:
+        """Name handlers can subscribe to next to the event type. Unnamed events return None."""
+        return None
+
+    @property
+    def coalescing_key(self) -> Hashable | None:
+        """Key identifying the state an event reports on. A pending event of the same type and
+        key is replaced by a newer one. Events that must all be processed return None.
+        """
+        return None
+
+    @property
+    def partition_key(self) -> Hashable:
+        """Key to shard events over consumers by. Events with the same key are processed in
+        order. Defaults to the routing name, or the event type for unnamed events."""
+        return self.routing_name or type(self).__name__
+
+
+Subscription = tuple[type[Event], str | None]
+"""An event type a handler consumes, optionally narrowed down to a single routing name."""
+
+RouteKey = tuple[type[Event], str | None]
+
 
 class EventHandler(Protocol):
     """Base EventHandler protocol class for static type checking.
@@ -22,23 +53,141 @@ class EventHandler(Protocol):
     async def handle(self, event: Event) -> Iterable[Event]:
         ...
 
+    def subscriptions(self) -> Iterable[Subscription]:
+        """Event types (and routing names) this handler consumes. Defaults to all events.
+
+        Returns:
+            Iterable[Subscription]: Pairs of event type and routing name, where a name of None matches any name.
+        """
+        return [(Event, None)]
+
+
+@runtime_checkable
+class SyncEventHandler(EventHandler, Protocol):
+    """EventHandler that handles events without awaiting anything. The EventHandlerService calls
+    these inline instead of scheduling a coroutine per event.
+
+    Args:
+        EventHandler (EventHandler): Base EventHandler class
+        Protocol (Protocol): allows for static type checking.
+    """
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
+        ...
+
+    async def handle(self, event: Event) -> Iterable[Event]:
+        return self.handle_sync(event)
+
+
+@dataclass
+class Route:
+    """Handlers consuming a single route key, in order of registration. The synchronous handlers
+    registered before the first asynchronous one are called inline, the remaining handlers are
+    scheduled as tasks, so no handler gets an event before the handlers registered earlier."""
+
+    handlers: list[EventHandler] = field(default_factory=list)
+    inline_handlers: list[SyncEventHandler] = field(init=False, default_factory=list)
+    scheduled_handlers: list[EventHandler] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._split()
+
+    def _split(self) -> None:
+        self.inline_handlers = []
+        for handler in self.handlers:
+            if not isinstance(handler, SyncEventHandler):
+                break
+            self.inline_handlers.append(handler)
+        self.scheduled_handlers = self.handlers[len(self.inline_handlers) :]
+
+    def append(self, handler: EventHandler) -> None:
+        self.handlers.append(handler)
+        self._split()
+
+    def remove(self, handler: EventHandler) -> None:
+        for index, routed in enumerate(self.handlers):
+            if routed is handler:
+                del self.handlers[index]
+                self._split()
+                return
+
 
 class EventBus:
-    """The tasks are synchronized using an event bus. The event bus is a FIFO
-    queue on which events are dispatched."""
+    """The tasks are synchronized using an event bus. The event bus is a prioritised queue on
+    which events are dispatched, see lymphocyte.events.queue.EventQueue. Dispatched events are
+    optionally recorded in an EventJournal before they are queued."""
 
-    _queue: asyncio.Queue[Event]
+    _queue: "EventQueue"
+    _metrics: "EventMetrics | None"
+    _journal: "EventJournal | None"
 
-    def __init__(self, queue: asyncio.Queue[Event]) -> None:
+    def __init__(
+        self,
+        queue: "EventQueue",
+        metrics: "EventMetrics | None" = None,
+        journal: "EventJournal | None" = None,
+    ) -> None:
         self._queue = queue
+        self._metrics = metrics
+        self._journal = journal
 
-    async def dispatch_async(self, event: Event) -> None:
+    async def dispatch_async(self, event: Event, block: bool = True) -> None:
         """Dispatch events on the bus.
 
         Args:
             event (Event): An Event object.
+            block (bool, optional): Wait for room when the event's lane is full. Defaults to True.
+
+        Raises:
+            EventQueueFull: When not blocking and the event's lane is full.
+        """
+        if self._metrics is not None:
+            self._metrics.event_dispatched(event)
+        if self._journal is not None:
+            self._journal.append(event)
+        if block:
+            await self._queue.put(event)
+        else:
+            self._queue.put_nowait(event)
+
+    async def dispatch_many(self, events: Iterable[Event]) -> None:
+        """Dispatch several events on the bus at once, in order.
+
+        Args:
+            events (Iterable[Event]): Event objects.
+        """
+        if self._metrics is not None or self._journal is not None:
+            events = list(events)
+            for event in events:
+                if self._metrics is not None:
+                    self._metrics.event_dispatched(event)
+                if self._journal is not None:
+                    self._journal.append(event)
+        await self._queue.put_many(events)
+
+    def lane_full(
+        self, event_type: type[Event], name: str | None = None, count: int = 1
+    ) -> bool:
+        """Whether count events of the given type can currently not be dispatched without
+        waiting or being dropped.
+
+        Args:
+            event_type (type[Event]): Type of the event.
+            name (str | None, optional): Routing name of the event. Defaults to None.
+            count (int, optional): Number of events to dispatch. Defaults to 1.
+
+        Returns:
+            bool: True when the lane of the event has no room for count more events.
         """
-        await self._queue.put(event)
+        return self._queue.full(event_type, name, count)
+
+
+def _matches(subscription: Subscription, key: RouteKey) -> bool:
+    event_type, name = key
+    subscribed_type, subscribed_name = subscription
+    return issubclass(event_type, subscribed_type) and (
+        subscribed_name is None or subscribed_name == name
+    )
 
 
 @dataclass
@@ -48,11 +197,69 @@ class EventHandlerService:
     event type, they all get passed the same event, in order of registration. Event handlers can put
     new events on the event bus.
 
+    Events are routed through an index of `(event type, routing name) -> handlers`, built from the
+    handlers' subscriptions, so only handlers that consume an event get to see it. Routing names no
+    handler subscribes to share a single index entry per event type, which keeps the index bounded.
+    Synchronous handlers are called inline as long as no asynchronous handler was registered before
+    them on the same route; the other handlers are scheduled as tasks, in order of registration.
+
         Yields:
             (Future) Event: An eventual new event.
     """
 
     handlers: list[EventHandler]
+    metrics: "EventMetrics | None" = None
+
+    _subscriptions: dict[int, tuple[Subscription, ...]] = field(
+        init=False, repr=False, default_factory=dict
+    )
+    _subscribed_names: Counter[str] = field(
+        init=False, repr=False, default_factory=Counter
+    )
+    _routes: dict[RouteKey, Route] = field(init=False, repr=False, default_factory=dict)
+
+    def __post_init__(self) -> None:
+        for handler in self.handlers:
+            self._add_subscriptions(handler)
+
+    def _add_subscriptions(self, handler: EventHandler) -> None:
+        subscriptions = tuple(handler.subscriptions())
+        self._subscriptions[id(handler)] = subscriptions
+        self._subscribed_names.update(
+            name for _, name in subscriptions if name is not None
+        )
+
+    def _route_key(self, event: Event) -> RouteKey:
+        name = event.routing_name
+        if name is not None and name not in self._subscribed_names:
+            name = None
+        return type(event), name
+
+    def _is_routed(self, handler: EventHandler, key: RouteKey) -> bool:
+        return any(
+            _matches(subscription, key)
+            for subscription in self._subscriptions[id(handler)]
+        )
+
+    def _route(self, event: Event) -> Route:
+        key = self._route_key(event)
+        if (route := self._routes.get(key)) is None:
+            route = self._routes[key] = Route(
+                [handler for handler in self.handlers if self._is_routed(handler, key)]
+            )
+        return route
+
+    def routes(self, event: Event) -> list[EventHandler]:
+        """Look up the handlers consuming an event, in order of registration.
+
+        Args:
+            event (Event): The event to route.
+
+        Returns:
+            list[EventHandler]: Handlers subscribed to the event's type and routing name.
+        """
+        route = self._route(event)
+        return list(route.handlers)
 
     def register(self, handler: EventHandler) -> None:
         """Set up a handler.
@@ -62,6 +269,10 @@ class EventHandlerService:
         """
         log.debug("Regisering new handler: %s", handler)
         self.handlers.append(handler)
+        self._add_subscriptions(handler)
+        for key, route in self._routes.items():
+            if self._is_routed(handler, key):
+                route.append(handler)
 
     def unregister(self, handler: EventHandler) -> None:
         """Unregister a handler.
@@ -71,10 +282,78 @@ class EventHandlerService:
         """
         log.debug("Unregistering handler: %s", handler)
         self.handlers.remove(handler)
+        for route in self._routes.values():
+            route.remove(handler)
+        subscriptions = self._subscriptions.pop(id(handler), ())
+        self._subscribed_names.subtract(
+            name for _, name in subscriptions if name is not None
+        )
+        # Entries for names nobody subscribes to anymore are unreachable, drop them.
+        unsubscribed = {
+            name for name, count in self._subscribed_names.items() if not count
+        }
+        if unsubscribed:
+            for name in unsubscribed:
+                del self._subscribed_names[name]
+            self._routes = {
+                key: route
+                for key, route in self._routes.items()
+                if key[1] not in unsubscribed
+            }
+
+    async def _handle_timed(
+        self, metrics: "EventMetrics", handler: EventHandler, event: Event
+    ) -> Iterable[Event]:
+        start = time.perf_counter()
+        try:
+            return await handler.handle(event)
+        finally:
+            metrics.handler_finished(handler, time.perf_counter() - start)
+
+    def _handle_sync_timed(
+        self, metrics: "EventMetrics", route: Route, event: Event
+    ) -> list[Event]:
+        # Consecutive handlers of the same type are timed as one group, so a route with a hundred
+        # tick handlers records a single observation instead of a hundred.
+        new_events: list[Event] = []
+        group: SyncEventHandler | None = None
+        start = time.perf_counter()
+        try:
+            for sync_handler in route.inline_handlers:
+                if group is None or type(sync_handler) is not type(group):
+                    if group is not None:
+                        now = time.perf_counter()
+                        metrics.handler_finished(group, now - start)
+                        start = now
+                    group = sync_handler
+                new_events.extend(sync_handler.handle_sync(event))
+        finally:
+            if group is not None:
+                metrics.handler_finished(group, time.perf_counter() - start)
+        return new_events
 
     async def handle(self, event: Event) -> AsyncIterable[Event]:
-        for new_events in asyncio.as_completed(
-            [handler.handle(event) for handler in self.handlers]
-        ):
-            for new_event in await new_events:
+        route = self._route(event)
+        metrics = self.metrics
+        if metrics is None:
+            for sync_handler in route.inline_handlers:
+                for new_event in sync_handler.handle_sync(event):
+                    yield new_event
+        elif route.inline_handlers:
+            for new_event in self._handle_sync_timed(metrics, route, event):
+                yield new_event
+        if not route.scheduled_handlers:
+            return
+        # as_completed would wrap bare coroutines in arbitrary order, create the tasks up front so
+        # they start in order of registration.
+        tasks = [
+            asyncio.create_task(
+                handler.handle(event)
+                if metrics is None
+                else self._handle_timed(metrics, handler, event)
+            )
+            for handler in route.scheduled_handlers
+        ]
+        for handled in asyncio.as_completed(tasks):
+            for new_event in await handled:
                 yield new_event
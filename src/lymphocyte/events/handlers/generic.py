@@ -4,7 +4,7 @@ from collections.abc import AsyncIterator, Iterable
 from dataclasses import dataclass, field
 from typing import Generic, TypeVar
 
-from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.events.bus import Event, Subscription, SyncEventHandler
 
 log = logging.getLogger(__name__)
 
@@ -12,15 +12,15 @@ T = TypeVar("T", bound=Event)
 
 
 @dataclass
-class GenericEventHandler(EventHandler, Generic[T]):
+class GenericEventHandler(SyncEventHandler, Generic[T]):
     """Non-specific EventHandler to listen to events and put events on the event bus.
 
     Args:
-        EventHandler (EventHandler): Base EventHandler class
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
         Generic (Event): Static Event type.
 
     Returns:
-        List: The asynchronous handle function returns an empty list, as long as there is no event to put on the bus.
+        List: The handle function returns an empty list, as long as there is no event to put on the bus.
 
     Yields:
         Event: Yields an event from the bus that it is subscribed to.
@@ -30,9 +30,12 @@ class GenericEventHandler(EventHandler, Generic[T]):
 
     queue: asyncio.Queue[T] = field(default_factory=asyncio.Queue)
 
-    async def handle(self, event: Event) -> Iterable[Event]:
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(self.handles, None)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
         if isinstance(event, self.handles):
-            await self.queue.put(event)
+            self.queue.put_nowait(event)
         return []
 
     async def subscribe(self) -> AsyncIterator[T]:
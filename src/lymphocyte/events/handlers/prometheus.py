@@ -2,7 +2,7 @@ import logging
 from collections.abc import Iterable
 from dataclasses import dataclass
 
-from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.events.bus import Event, Subscription, SyncEventHandler
 from lymphocyte.events.prometheus import PrometheusAlertStatusChangedEvent
 from lymphocyte.events.trigger import TriggerEvent
 
@@ -10,11 +10,11 @@ log = logging.getLogger(__name__)
 
 
 @dataclass
-class PrometheusAlertStatusChangedHandler(EventHandler):
+class PrometheusAlertStatusChangedHandler(SyncEventHandler):
     """If this EventHandler receives a PrometheusAlertStatusChangedEvent, it returns the
 
     Args:
-        EventHandler (EventHandler): Base EventHandler class
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
 
     Returns:
         TriggerEvent: TriggerEvent of base class Event with named trigger.
@@ -23,7 +23,10 @@ class PrometheusAlertStatusChangedHandler(EventHandler):
     name: str
     alertname: str
 
-    async def handle(self, event: Event) -> Iterable[Event]:
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(PrometheusAlertStatusChangedEvent, None)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
         """Handles a PrometheusAlertStatusChangedEvent.
 
         Args:
@@ -2,12 +2,10 @@ import logging
 from collections.abc import Iterable
 from dataclasses import dataclass, field
 
-from prometheus_client import Gauge
-
-from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.events.bus import Event, Subscription, SyncEventHandler
 from lymphocyte.events.threat_level import (
-    OwnThreatLevelChangedEvent,
     ThreatLevelChangedEvent,
+    ThreatLevelRemovedEvent,
 )
 from lymphocyte.events.trigger import TriggerEvent
 
@@ -15,11 +13,11 @@ log = logging.getLogger(__name__)
 
 
 @dataclass
-class ThreatLevelChangedHandler(EventHandler):
-    """EventHandler for threat-level changes.
+class ThreatLevelChangedHandler(SyncEventHandler):
+    """EventHandler for threat-level changes, including the removal of a threat-level.
 
     Args:
-        EventHandler (EventHandler): Base EventHandler class
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
 
     Returns:
         TriggerEvent: TriggerEvent of base class Event with named trigger.
@@ -29,8 +27,11 @@ class ThreatLevelChangedHandler(EventHandler):
     identifier: str
     host: str | None = field(default=None)
 
-    async def handle(self, event: Event) -> Iterable[Event]:
-        """Handles a ThreatLevelChangedEvent.
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(ThreatLevelChangedEvent, None), (ThreatLevelRemovedEvent, None)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
+        """Handles a ThreatLevelChangedEvent or ThreatLevelRemovedEvent.
 
         Args:
             event (Event): An event from the event bus
@@ -39,7 +40,7 @@ class ThreatLevelChangedHandler(EventHandler):
             Iterable[Event]: Trigger event when: the received event was a ThreatLevelChangedEvent, when the handler and event identifiers match, and when the event's and handler's hosts are not the same.
             []: Returns an empty list when the above does not hold.
         """
-        if not isinstance(event, ThreatLevelChangedEvent):
+        if not isinstance(event, (ThreatLevelChangedEvent, ThreatLevelRemovedEvent)):
             return []
 
         if self.identifier != event.identifier:
@@ -48,32 +49,3 @@ class ThreatLevelChangedHandler(EventHandler):
             return []
 
         return [TriggerEvent(self.name)]
-
-
-@dataclass
-class PrometheusThreatLevelChangedHandler(EventHandler):
-    """EventHandler for Prometheus threat-level changes. Sets threat-level metric with the Prometheus threat-level
-
-    Args:
-        EventHandler (EventHandler): Base EventHandler class
-
-    Returns:
-        list: Returns empty list after setting the threat-level metric.
-    """
-
-    threat_level_metric: Gauge
-
-    async def handle(self, event: Event) -> Iterable[Event]:
-        """Handles an OwnThreatLevelChangedEvent. Sets the threat level metric after receiving the corresponding event.
-
-        Args:
-            event (Event): An event from the event bus.
-
-        Returns:
-            Iterable[Event]: Returns an empty list. No new events are passed on the event bus by this event handler.
-        """
-        if not isinstance(event, OwnThreatLevelChangedEvent):
-            return []
-
-        self.threat_level_metric.set(event.current)
-        return []
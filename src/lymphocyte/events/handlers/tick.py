@@ -2,38 +2,51 @@ import logging
 from collections.abc import Iterable
 from dataclasses import dataclass, field
 
-from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.events.bus import Event, Subscription, SyncEventHandler
 from lymphocyte.events.tick import TickEvent
 from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.services.cron import CronSchedule
 
 log = logging.getLogger(__name__)
 
 
 @dataclass
-class TickEventHandler(EventHandler):
-    """EventHandler listening for TickEvents and triggering a named trigger every n seconds.
+class TickEventHandler(SyncEventHandler):
+    """EventHandler listening for TickEvents and triggering a named trigger every n seconds, or on
+    a cron schedule. Fractions of seconds are supported. The TickTriggerTask sends the tick events
+    when the trigger is due.
 
     Args:
-        EventHandler (EventHandler): Base Eventhandler class
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
 
     Returns:
         TriggerEvent: Named trigger
     """
 
     name: str
-    every_n_seconds: int = field(default=1)
+    every_n_seconds: float = field(default=1)
+    cron: str | None = field(default=None)
 
-    async def handle(self, event: Event) -> Iterable[Event]:
+    schedule: CronSchedule | None = field(init=False, repr=False, default=None)
+
+    def __post_init__(self) -> None:
+        if self.every_n_seconds <= 0:
+            raise ValueError(f"every_n_seconds of tick trigger {self.name} must be > 0")
+        if self.cron is not None:
+            self.schedule = CronSchedule.parse(self.cron)
+
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(TickEvent, self.name)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
         """Handles a TickEvent.
 
         Args:
             event (Event): An event from the event bus,
 
         Returns:
-            Iterable[Event]: Trigger event when tick event aligns with the handlder's every_n_seconds value.
+            Iterable[Event]: Trigger event, the handler is only routed the tick events named after it.
         """
         if not isinstance(event, TickEvent):
             return []
-        if event.counter % self.every_n_seconds != 0:
-            return []
         return [TriggerEvent(self.name)]
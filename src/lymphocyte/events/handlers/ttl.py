@@ -1,20 +1,24 @@
 import logging
 from collections.abc import Iterable
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
-from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.events.bus import Event, Subscription, SyncEventHandler
 from lymphocyte.events.trigger import TriggerEvent
-from lymphocyte.events.ttl import TTLChangedEvent, TTLRestartedEvent
+from lymphocyte.events.ttl import (
+    TTLChangedEvent,
+    TTLRestartedEvent,
+    TTLThresholdReachedEvent,
+)
 
 log = logging.getLogger(__name__)
 
 
 @dataclass
-class TTLResetEventHandler(EventHandler):
+class TTLResetEventHandler(SyncEventHandler):
     """EventHandler that handles a TTLRestartedEvent, and consequently returns a corresponding named trigger.
 
     Args:
-        EventHandler (EventHandler): Base EventHandler class
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
 
     Returns:
         TriggerEvent: Named trigger.
@@ -22,7 +26,10 @@ class TTLResetEventHandler(EventHandler):
 
     name: str
 
-    async def handle(self, event: Event) -> Iterable[Event]:
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(TTLRestartedEvent, None)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
         if not isinstance(event, TTLRestartedEvent):
             return []
 
@@ -30,11 +37,11 @@ class TTLResetEventHandler(EventHandler):
 
 
 @dataclass
-class TTLChangedEventHandler(EventHandler):
+class TTLChangedEventHandler(SyncEventHandler):
     """EventHandler that handles a TTLChangedEvent, and consequently returns a corresponding named trigger.
 
     Args:
-        EventHandler (EventHandler): Base EventHandler class
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
 
     Returns:
         TriggerEvent: Named trigger.
@@ -42,8 +49,38 @@ class TTLChangedEventHandler(EventHandler):
 
     name: str
 
-    async def handle(self, event: Event) -> Iterable[Event]:
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(TTLChangedEvent, None)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
         if not isinstance(event, TTLChangedEvent):
             return []
 
         return [TriggerEvent(self.name)]
+
+
+@dataclass
+class TTLThresholdReachedEventHandler(SyncEventHandler):
+    """EventHandler that handles a TTLThresholdReachedEvent, and consequently returns a corresponding named trigger.
+    Without a fraction, every threshold of the TTL manager triggers.
+
+    Args:
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
+
+    Returns:
+        TriggerEvent: Named trigger.
+    """
+
+    name: str
+    fraction: float | None = field(default=None)
+
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(TTLThresholdReachedEvent, None)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
+        if not isinstance(event, TTLThresholdReachedEvent):
+            return []
+        if self.fraction is not None and self.fraction != event.fraction:
+            return []
+
+        return [TriggerEvent(self.name)]
@@ -2,7 +2,7 @@ import logging
 from collections.abc import Iterable
 from dataclasses import dataclass
 
-from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.events.bus import Event, Subscription, SyncEventHandler
 from lymphocyte.events.trigger import TriggerEvent
 from lymphocyte.events.webhook import WebhookEvent
 
@@ -10,11 +10,11 @@ log = logging.getLogger(__name__)
 
 
 @dataclass
-class WebhookEventHandler(EventHandler):
+class WebhookEventHandler(SyncEventHandler):
     """EventHandler that handles a WebhookEvent, and consequently returns a corresponding named trigger.
 
     Args:
-        EventHandler (EventHandler): Base EventHandler class
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class
 
     Returns:
         TriggerEvent: Named trigger.
@@ -23,7 +23,10 @@ class WebhookEventHandler(EventHandler):
     name: str
     exact_match: str
 
-    async def handle(self, event: Event) -> Iterable[Event]:
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(WebhookEvent, self.exact_match)]
+
+    def handle_sync(self, event: Event) -> Iterable[Event]:
         if not isinstance(event, WebhookEvent):
             return []
 
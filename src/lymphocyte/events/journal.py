@@ -0,0 +1,309 @@
+"""
+Append-only binary journal of the events dispatched on the event bus.
+
+The journal is a directory of segment files. Each segment is preallocated to a fixed size and
+memory-mapped, so appending a record is a copy into the mapping; when a record does not fit, the
+segment is truncated to its used size and the next one is started. Only the newest `max_files`
+segments are kept.
+
+A segment starts with the magic bytes `LYJ\\x01`, followed by records of the form
+
+    u32 length | i64 timestamp (ns since epoch) | u8 flags | u8 type name length | type name
+    | u8 field count | fields
+
+where each field is a one byte tag followed by its value: `N` (None), `?` (u8 bool), `q` (i64),
+`d` (f64), `s` (u32 length and utf-8) or `b` (u32 length and raw bytes). Fields are the event
+dataclass' init fields, in declaration order. A length of 0 marks the end of a segment that was
+not closed cleanly.
+"""
+
+import contextvars
+import dataclasses
+import logging
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from lymphocyte.events.bus import Event
+
+log = logging.getLogger(__name__)
+
+MAGIC = b"LYJ\x01"
+SEGMENT_PATTERN = re.compile(r"^events-(\d{8})\.journal$")
+
+FLAG_DERIVED = 0x01
+
+_HEADER = struct.Struct("<IqB")
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+_I64 = struct.Struct("<q")
+_F64 = struct.Struct("<d")
+
+derived_events: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "derived_events", default=False
+)
+"""Set by the event consumers and the TimerService; events dispatched while it is set, including
+those dispatched by tasks started from an event handler or by timers, are derived from other events
+rather than received from the outside world."""
+
+
+def _encode_value(value: Any, out: bytearray) -> None:
+    if value is None:
+        out += b"N"
+    elif isinstance(value, bool):
+        out += b"?" + _U8.pack(value)
+    elif isinstance(value, int):
+        out += b"q" + _I64.pack(value)
+    elif isinstance(value, float):
+        out += b"d" + _F64.pack(value)
+    elif isinstance(value, str):
+        data = value.encode()
+        out += b"s" + _U32.pack(len(data)) + data
+    elif isinstance(value, bytes):
+        out += b"b" + _U32.pack(len(value)) + value
+    else:
+        raise TypeError(f"Cannot journal values of type {type(value).__name__}")
+
+
+def _decode_value(data: memoryview, offset: int) -> tuple[Any, int]:
+    tag = data[offset]
+    offset += 1
+    if tag == ord("N"):
+        return None, offset
+    if tag == ord("?"):
+        return bool(data[offset]), offset + 1
+    if tag == ord("q"):
+        return _I64.unpack_from(data, offset)[0], offset + _I64.size
+    if tag == ord("d"):
+        return _F64.unpack_from(data, offset)[0], offset + _F64.size
+    if tag in (ord("s"), ord("b")):
+        (length,) = _U32.unpack_from(data, offset)
+        offset += _U32.size
+        raw = bytes(data[offset : offset + length])
+        return (raw.decode() if tag == ord("s") else raw), offset + length
+    raise ValueError(f"Unknown field tag {tag!r}")
+
+
+def _init_fields(event_type: type[Event]) -> list[str]:
+    return [field.name for field in dataclasses.fields(event_type) if field.init]
+
+
+def encode_event(event: Event, timestamp_ns: int, derived: bool = False) -> bytes:
+    """Encode an event as a journal record.
+
+    Args:
+        event (Event): The event, a dataclass with primitive fields.
+        timestamp_ns (int): Time the event was dispatched, in nanoseconds since the epoch.
+        derived (bool, optional): Whether the event was derived from another event. Defaults to False.
+
+    Raises:
+        TypeError: When a field of the event cannot be journaled.
+
+    Returns:
+        bytes: The record, including its length prefix.
+    """
+    name = type(event).__name__.encode()
+    fields = _init_fields(type(event))
+    body = bytearray(_U8.pack(len(name)) + name + _U8.pack(len(fields)))
+    for field in fields:
+        _encode_value(getattr(event, field), body)
+    header = _HEADER.pack(
+        _HEADER.size - _U32.size + len(body),
+        timestamp_ns,
+        FLAG_DERIVED if derived else 0,
+    )
+    return header + body
+
+
+def _event_types() -> dict[str, type[Event]]:
+    types: dict[str, type[Event]] = {}
+    pending = [Event]
+    while pending:
+        event_type = pending.pop()
+        types[event_type.__name__] = event_type
+        pending += event_type.__subclasses__()
+    return types
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    """An event read back from the journal."""
+
+    timestamp_ns: int
+    derived: bool
+    event: Event
+
+
+class EventJournal:
+    """Appends events to size-rotated, memory-mapped segment files.
+
+    Appending is thread-safe. Events that cannot be encoded are logged and skipped, the journal
+    never fails a dispatch.
+    """
+
+    directory: Path
+    max_file_bytes: int
+    max_files: int
+
+    _lock: threading.Lock
+    _index: int
+    _file: BinaryIO | None
+    _map: mmap.mmap | None
+    _offset: int
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_file_bytes: int = 16 * 2**20,
+        max_files: int = 8,
+    ) -> None:
+        """Opens a journal, starting a new segment after any existing ones.
+
+        Args:
+            directory (str | Path): Directory holding the segment files, created when missing.
+            max_file_bytes (int, optional): Size of a segment. Defaults to 16 MiB.
+            max_files (int, optional): Number of segments to keep. Defaults to 8.
+        """
+        if max_file_bytes <= len(MAGIC) + _HEADER.size:
+            raise ValueError("max_file_bytes is too small to hold a record")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max(max_files, 1)
+        self._lock = threading.Lock()
+        self._index = max((index for index, _ in segments(self.directory)), default=0)
+        self._file = None
+        self._map = None
+        self._offset = 0
+
+    def _open_segment(self) -> mmap.mmap:
+        self._index += 1
+        path = self.directory / f"events-{self._index:08d}.journal"
+        self._file = open(path, "w+b")
+        self._file.truncate(self.max_file_bytes)
+        self._map = mmap.mmap(self._file.fileno(), self.max_file_bytes)
+        self._map[: len(MAGIC)] = MAGIC
+        self._offset = len(MAGIC)
+        for _, old in segments(self.directory)[: -self.max_files]:
+            old.unlink(missing_ok=True)
+        return self._map
+
+    def _close_segment(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.truncate(self._offset)
+            self._file.close()
+            self._file = None
+
+    def append(self, event: Event) -> None:
+        """Append an event, stamped with the current time.
+
+        Args:
+            event (Event): The event.
+        """
+        try:
+            record = encode_event(event, time.time_ns(), derived_events.get())
+        except (TypeError, struct.error):
+            log.exception("Cannot journal %s", event)
+            return
+        if len(MAGIC) + len(record) > self.max_file_bytes:
+            log.warning("Event %s does not fit in a journal segment", event)
+            return
+        with self._lock:
+            segment = self._map
+            if segment is None or self._offset + len(record) > self.max_file_bytes:
+                self._close_segment()
+                segment = self._open_segment()
+            segment[self._offset : self._offset + len(record)] = record
+            self._offset += len(record)
+
+    def flush(self) -> None:
+        """Write the appended records of the current segment to disk."""
+        with self._lock:
+            if self._map is not None:
+                self._map.flush()
+
+    def close(self) -> None:
+        """Close the current segment, trimming it to the records it holds."""
+        with self._lock:
+            self._close_segment()
+
+
+def segments(directory: str | Path) -> list[tuple[int, Path]]:
+    """List the segment files of a journal, oldest first.
+
+    Args:
+        directory (str | Path): Directory of the journal.
+
+    Returns:
+        list[tuple[int, Path]]: Index and path of each segment.
+    """
+    found = []
+    for path in Path(directory).iterdir():
+        if match := SEGMENT_PATTERN.match(path.name):
+            found.append((int(match.group(1)), path))
+    return sorted(found)
+
+
+def _read_segment(
+    path: Path, event_types: dict[str, type[Event]]
+) -> Iterator[JournalRecord]:
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as segment:
+            data = memoryview(segment)
+            try:
+                if bytes(data[: len(MAGIC)]) != MAGIC:
+                    raise ValueError(f"{path} is not an event journal segment")
+                offset = len(MAGIC)
+                while offset + _HEADER.size <= len(data):
+                    length, timestamp_ns, flags = _HEADER.unpack_from(data, offset)
+                    if not length:
+                        break
+                    end = offset + _U32.size + length
+                    offset += _HEADER.size
+                    name_length = data[offset]
+                    name = bytes(data[offset + 1 : offset + 1 + name_length]).decode()
+                    offset += 1 + name_length
+                    field_count = data[offset]
+                    offset += 1
+                    values = []
+                    for _ in range(field_count):
+                        value, offset = _decode_value(data, offset)
+                        values.append(value)
+                    offset = end
+
+                    if (event_type := event_types.get(name)) is None:
+                        log.warning("Skipping journaled event of unknown type %s", name)
+                        continue
+                    event = event_type(**dict(zip(_init_fields(event_type), values)))
+                    yield JournalRecord(timestamp_ns, bool(flags & FLAG_DERIVED), event)
+            finally:
+                data.release()
+
+
+def read_journal(directory: str | Path) -> Iterator[JournalRecord]:
+    """Read back the events of a journal, oldest first.
+
+    Event types are looked up by name among the imported subclasses of Event.
+
+    Args:
+        directory (str | Path): Directory of the journal.
+
+    Yields:
+        JournalRecord: The journaled events.
+    """
+    event_types = _event_types()
+    for _, path in segments(directory):
+        yield from _read_segment(path, event_types)
@@ -0,0 +1,138 @@
+from collections.abc import Callable
+from typing import Any
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram
+
+from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.events.queue import EventQueue
+
+LATENCY_BUCKETS = (
+    0.000_01,
+    0.000_05,
+    0.000_1,
+    0.000_5,
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1,
+    5,
+)
+FAN_OUT_BUCKETS = (0, 1, 2, 4, 8, 16, 32, 64)
+
+
+class EventMetrics:
+    """Prometheus metrics of the event bus internals.
+
+    Labels are limited to event types, handler types and lane names, which are all bounded by the
+    code and configuration, never by event contents. Labelled children are cached, so recording a
+    sample on the hot path is a dictionary lookup and an increment.
+    """
+
+    dispatched: Counter
+    consumed: Counter
+    dropped: Counter
+    coalesced: Counter
+    queue_depth: Gauge
+    queue_wait: Histogram
+    handler_duration: Histogram
+    fan_out: Histogram
+
+    _children: dict[tuple[Any, ...], Any]
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY) -> None:
+        """Constructs and registers the event bus metrics.
+
+        Args:
+            registry (CollectorRegistry, optional): Registry to register the metrics with. Defaults to REGISTRY.
+        """
+        self.dispatched = Counter(
+            "lymphocyte_events_dispatched",
+            "Events dispatched on the event bus",
+            ["event_type"],
+            registry=registry,
+        )
+        self.consumed = Counter(
+            "lymphocyte_events_consumed",
+            "Events taken from the event bus and handled",
+            ["event_type"],
+            registry=registry,
+        )
+        self.dropped = Counter(
+            "lymphocyte_events_dropped",
+            "Events dropped because their lane was full",
+            ["lane"],
+            registry=registry,
+        )
+        self.coalesced = Counter(
+            "lymphocyte_events_coalesced",
+            "Pending events replaced by a newer event with the same coalescing key",
+            ["lane"],
+            registry=registry,
+        )
+        self.queue_depth = Gauge(
+            "lymphocyte_event_queue_depth",
+            "Events waiting in a lane of the event bus",
+            ["lane"],
+            registry=registry,
+        )
+        self.queue_wait = Histogram(
+            "lymphocyte_event_queue_wait_seconds",
+            "Time events spend waiting in a lane of the event bus",
+            ["lane"],
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.handler_duration = Histogram(
+            "lymphocyte_event_handler_duration_seconds",
+            "Time spent handling an event in handlers of a type",
+            ["handler"],
+            buckets=LATENCY_BUCKETS,
+            registry=registry,
+        )
+        self.fan_out = Histogram(
+            "lymphocyte_event_fan_out",
+            "New events derived from handling a single event",
+            ["event_type"],
+            buckets=FAN_OUT_BUCKETS,
+            registry=registry,
+        )
+        self._children = {}
+
+    def _child(self, metric: Any, label: str) -> Any:
+        key = (id(metric), label)
+        if (child := self._children.get(key)) is None:
+            child = self._children[key] = metric.labels(label)
+        return child
+
+    def watch_queue(self, queue: EventQueue) -> None:
+        """Report the depth of the lanes of a queue whenever the metrics are collected.
+
+        Args:
+            queue (EventQueue): The queue.
+        """
+        for lane in queue.lanes:
+            depth: Callable[[], float] = lane.__len__
+            self.queue_depth.labels(lane.name).set_function(depth)
+
+    def event_dispatched(self, event: Event) -> None:
+        self._child(self.dispatched, type(event).__name__).inc()
+
+    def event_consumed(self, event: Event, new_events: int) -> None:
+        event_type = type(event).__name__
+        self._child(self.consumed, event_type).inc()
+        self._child(self.fan_out, event_type).observe(new_events)
+
+    def event_dropped(self, lane: str) -> None:
+        self._child(self.dropped, lane).inc()
+
+    def event_coalesced(self, lane: str) -> None:
+        self._child(self.coalesced, lane).inc()
+
+    def event_waited(self, lane: str, seconds: float) -> None:
+        self._child(self.queue_wait, lane).observe(seconds)
+
+    def handler_finished(self, handler: EventHandler, seconds: float) -> None:
+        self._child(self.handler_duration, type(handler).__name__).observe(seconds)
@@ -1,3 +1,4 @@
+from collections.abc import Hashable
 from dataclasses import dataclass
 
 from lymphocyte.events.bus import Event
@@ -13,3 +14,7 @@ class PrometheusAlertStatusChangedEvent(Event):
 
     alertname: str
     is_firing: bool
+
+    @property
+    def partition_key(self) -> Hashable:
+        return self.alertname
@@ -0,0 +1,465 @@
+import asyncio
+import collections
+import logging
+import time
+from collections.abc import Hashable, Iterable
+from typing import TYPE_CHECKING, Literal
+
+from lymphocyte.events.bus import Event
+
+if TYPE_CHECKING:
+    from lymphocyte.events.metrics import EventMetrics
+
+log = logging.getLogger(__name__)
+
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest", "coalesce"]
+
+
+class EventQueueFull(asyncio.QueueFull):
+    """Raised when an event does not fit in its lane without blocking."""
+
+
+class _Slot:
+    """Position of a pending event in a lane. Coalescing swaps the event in place."""
+
+    __slots__ = ("event", "key", "enqueued_at")
+
+    def __init__(self, event: Event, key: Hashable | None, enqueued_at: float) -> None:
+        self.event = event
+        self.key = key
+        self.enqueued_at = enqueued_at
+
+
+class Lane:
+    """A bounded FIFO of events sharing a priority and overflow policy.
+
+    Overflow policies, applied when the lane is at capacity:
+        block: the producer waits until the consumer frees up a slot.
+        drop_oldest: the oldest pending event is dropped to make room.
+        drop_newest: the new event is dropped.
+        coalesce: the new event replaces an equal pending event, or else the oldest pending event.
+    """
+
+    name: str
+    priority: int
+    capacity: int
+    overflow: OverflowPolicy
+
+    dropped: int
+    coalesced: int
+
+    putters: collections.deque[asyncio.Future[None]]
+
+    _slots: collections.deque[_Slot]
+    _keyed: dict[Hashable, _Slot]
+
+    def __init__(
+        self,
+        name: str,
+        priority: int = 0,
+        capacity: int = 0,
+        overflow: OverflowPolicy = "block",
+    ) -> None:
+        """Constructs a Lane.
+
+        Args:
+            name (str): Name of the lane.
+            priority (int, optional): Lanes with a lower priority value are served first. Defaults to 0.
+            capacity (int, optional): Maximum number of pending events, 0 for unbounded. Defaults to 0.
+            overflow (OverflowPolicy, optional): What to do when the lane is full. Defaults to "block".
+        """
+        self.name = name
+        self.priority = priority
+        self.capacity = capacity
+        self.overflow = overflow
+        self.dropped = 0
+        self.coalesced = 0
+        self.putters = collections.deque()
+        self._slots = collections.deque()
+        self._keyed = {}
+
+    def __repr__(self) -> str:
+        return (
+            f"Lane(name={self.name!r}, priority={self.priority}, capacity={self.capacity}, "
+            f"overflow={self.overflow!r}, pending={len(self)}, dropped={self.dropped}, "
+            f"coalesced={self.coalesced})"
+        )
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def pending(self) -> list[Event]:
+        """The pending events, oldest first."""
+        return [slot.event for slot in self._slots]
+
+    def full(self, count: int = 1) -> bool:
+        """Whether the lane has no room for count more events."""
+        return 0 < self.capacity < len(self._slots) + count
+
+    def push(
+        self, event: Event, key: Hashable | None = None, enqueued_at: float = 0
+    ) -> None:
+        """Append an event, registering its coalescing key if it has one."""
+        slot = _Slot(event, key, enqueued_at)
+        self._slots.append(slot)
+        if key is not None:
+            self._keyed[key] = slot
+
+    def pop(self) -> tuple[Event, float]:
+        """Remove and return the oldest event, with the time it was pushed at."""
+        slot = self._slots.popleft()
+        if slot.key is not None and self._keyed.get(slot.key) is slot:
+            del self._keyed[slot.key]
+        return slot.event, slot.enqueued_at
+
+    def coalesce(self, event: Event, key: Hashable) -> bool:
+        """Replace the pending event with the same coalescing key by a newer event, in place.
+
+        Returns:
+            bool: True when a pending event was replaced.
+        """
+        if (slot := self._keyed.get(key)) is None:
+            return False
+        slot.event = event
+        self.coalesced += 1
+        return True
+
+    def replace_equal(self, event: Event) -> Event | None:
+        """Replace a pending event equal to the given event.
+
+        Returns:
+            Event | None: The replaced event, if any.
+        """
+        for slot in self._slots:
+            if slot.event == event:
+                replaced, slot.event = slot.event, event
+                return replaced
+        return None
+
+
+class EventQueue:
+    """Queue backing the event bus, made up of prioritised lanes with their own capacity and
+    overflow policy. Events are assigned to lanes by type, or by type and routing name, e.g.
+    `WebhookEvent` or `ActionTriggerEvent:some_action`. Events of types without a lane end up in
+    the default lane. The consumer always takes from the highest priority lane holding events.
+
+    Events with a coalescing key replace a pending event of the same type and key, keeping its
+    place in the lane, so only the latest state is processed.
+
+    The interface mirrors asyncio.Queue, so it can be used as a drop-in replacement.
+    """
+
+    _lanes: list[Lane]
+    _lanes_by_event: dict[str, Lane]
+    _named_events: set[str]
+    _default_lane: Lane
+    _lane_cache: dict[tuple[type[Event], str | None], Lane]
+
+    _coalesce: bool
+    _metrics: "EventMetrics | None"
+
+    _getters: collections.deque[asyncio.Future[None]]
+    _unfinished_tasks: int
+    _finished: asyncio.Event
+
+    def __init__(
+        self,
+        lanes: Iterable[tuple[Lane, Iterable[str]]] = (),
+        default_lane: str = "default",
+        coalesce: bool = True,
+        metrics: "EventMetrics | None" = None,
+    ) -> None:
+        """Constructs an EventQueue.
+
+        Args:
+            lanes (Iterable[tuple[Lane, Iterable[str]]], optional): Lanes with the event types routed to them. Defaults to ().
+            default_lane (str, optional): Name of the lane for all other events, created unbounded with the lowest priority if not given. Defaults to "default".
+            coalesce (bool, optional): Coalesce events by their coalescing key. Defaults to True.
+            metrics (EventMetrics | None, optional): Metrics to record drops, coalescing and queue wait time in. Defaults to None.
+        """
+        self._lanes = []
+        self._lanes_by_event = {}
+        for lane, events in lanes:
+            self._lanes.append(lane)
+            for event in events:
+                self._lanes_by_event[event] = lane
+
+        lanes_by_name = {lane.name: lane for lane in self._lanes}
+        if default_lane not in lanes_by_name:
+            lanes_by_name[default_lane] = Lane(
+                default_lane,
+                priority=max((lane.priority + 1 for lane in self._lanes), default=0),
+            )
+            self._lanes.append(lanes_by_name[default_lane])
+        self._default_lane = lanes_by_name[default_lane]
+
+        self._lanes.sort(key=lambda lane: lane.priority)
+        self._named_events = {
+            event.partition(":")[2] for event in self._lanes_by_event if ":" in event
+        }
+        self._lane_cache = {}
+        self._coalesce = coalesce
+        self._metrics = metrics
+
+        self._getters = collections.deque()
+        self._unfinished_tasks = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    @property
+    def lanes(self) -> list[Lane]:
+        """All lanes, in order of priority."""
+        return self._lanes
+
+    def lane_for(self, event_type: type[Event], name: str | None = None) -> Lane:
+        """Look up the lane events of the given type and routing name are queued in.
+
+        Args:
+            event_type (type[Event]): Type of the event.
+            name (str | None, optional): Routing name of the event. Defaults to None.
+
+        Returns:
+            Lane: The lane the event is assigned to.
+        """
+        if name not in self._named_events:
+            name = None
+        if (lane := self._lane_cache.get((event_type, name))) is not None:
+            return lane
+
+        lane = self._default_lane
+        for cls in event_type.__mro__:
+            if name is not None and (named := f"{cls.__name__}:{name}") in (
+                self._lanes_by_event
+            ):
+                lane = self._lanes_by_event[named]
+                break
+            if cls.__name__ in self._lanes_by_event:
+                lane = self._lanes_by_event[cls.__name__]
+                break
+        self._lane_cache[event_type, name] = lane
+        return lane
+
+    def _lane(self, event: Event) -> Lane:
+        return self.lane_for(type(event), event.routing_name)
+
+    def full(
+        self, event_type: type[Event] = Event, name: str | None = None, count: int = 1
+    ) -> bool:
+        """Whether the lane of the given event type is at capacity.
+
+        Args:
+            event_type (type[Event], optional): Type of the event. Defaults to Event.
+            name (str | None, optional): Routing name of the event. Defaults to None.
+            count (int, optional): Number of events to make room for. Defaults to 1.
+
+        Returns:
+            bool: True when the lane has no room for count more events.
+        """
+        return self.lane_for(event_type, name).full(count)
+
+    def qsize(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+    def empty(self) -> bool:
+        return not any(len(lane) for lane in self._lanes)
+
+    def _wakeup_next(self, waiters: collections.deque[asyncio.Future[None]]) -> None:
+        while waiters:
+            waiter = waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                break
+
+    def _coalesced(self, lane: Lane, event: Event) -> bool:
+        if not self._coalesce or (key := event.coalescing_key) is None:
+            return False
+        if not lane.coalesce(event, (type(event), key)):
+            return False
+        if self._metrics is not None:
+            self._metrics.event_coalesced(lane.name)
+        return True
+
+    def _append(self, lane: Lane, event: Event) -> None:
+        key = event.coalescing_key if self._coalesce else None
+        lane.push(
+            event,
+            None if key is None else (type(event), key),
+            0 if self._metrics is None else time.monotonic(),
+        )
+        self._unfinished_tasks += 1
+        self._finished.clear()
+        self._wakeup_next(self._getters)
+
+    def _drop(self, lane: Lane, event: Event) -> None:
+        lane.dropped += 1
+        if self._metrics is not None:
+            self._metrics.event_dropped(lane.name)
+        log.debug("Lane %s full, dropped %s", lane.name, event)
+
+    def _overflow(self, lane: Lane, event: Event) -> bool:
+        """Make room in a full lane following its overflow policy.
+
+        Returns:
+            bool: True when the event should be appended, False when it is dropped or merged.
+        """
+        if (
+            lane.overflow == "coalesce"
+            and (replaced := lane.replace_equal(event)) is not None
+        ):
+            self._drop(lane, replaced)
+            return False
+
+        if lane.overflow in ("drop_oldest", "coalesce"):
+            self._drop(lane, lane.pop()[0])
+            self.task_done()
+            return True
+
+        self._drop(lane, event)
+        return False
+
+    def put_nowait(self, event: Event) -> None:
+        """Put an event in its lane without blocking.
+
+        Args:
+            event (Event): The event.
+
+        Raises:
+            EventQueueFull: When the lane is full and its policy does not make room for the event.
+        """
+        lane = self._lane(event)
+        if self._coalesced(lane, event):
+            return
+        if lane.full():
+            if lane.overflow in ("block", "drop_newest"):
+                self._drop(lane, event)
+                raise EventQueueFull(lane.name)
+            if not self._overflow(lane, event):
+                return
+        self._append(lane, event)
+
+    async def put(self, event: Event) -> None:
+        """Put an event in its lane, waiting for a free slot if the lane blocks when full.
+
+        Args:
+            event (Event): The event.
+        """
+        lane = self._lane(event)
+        if self._coalesced(lane, event):
+            return
+        while lane.full() and lane.overflow == "block":
+            putter = asyncio.get_running_loop().create_future()
+            lane.putters.append(putter)
+            try:
+                await putter
+            except:
+                putter.cancel()
+                if not lane.full():
+                    self._wakeup_next(lane.putters)
+                raise
+
+        if lane.full() and not self._overflow(lane, event):
+            return
+        self._append(lane, event)
+
+    def _pop(self, lane: Lane) -> Event:
+        event, enqueued_at = lane.pop()
+        self._wakeup_next(lane.putters)
+        if self._metrics is not None:
+            self._metrics.event_waited(lane.name, time.monotonic() - enqueued_at)
+        return event
+
+    def get_nowait(self) -> Event:
+        """Take the oldest event from the highest priority lane holding events.
+
+        Raises:
+            asyncio.QueueEmpty: When there are no events.
+
+        Returns:
+            Event: The event.
+        """
+        for lane in self._lanes:
+            if len(lane):
+                return self._pop(lane)
+        raise asyncio.QueueEmpty
+
+    async def get(self) -> Event:
+        """Take the oldest event from the highest priority lane holding events, waiting for one
+        if there are none.
+
+        Returns:
+            Event: The event.
+        """
+        while self.empty():
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except:
+                getter.cancel()
+                if not self.empty():
+                    self._wakeup_next(self._getters)
+                raise
+        return self.get_nowait()
+
+    async def put_many(self, events: Iterable[Event]) -> None:
+        """Put several events in their lanes, in order, waiting for free slots where needed.
+
+        Args:
+            events (Iterable[Event]): The events.
+        """
+        for event in events:
+            await self.put(event)
+
+    def get_many_nowait(self, max_events: int) -> list[Event]:
+        """Take up to max_events events that are ready, in order of priority.
+
+        Args:
+            max_events (int): Maximum number of events to take.
+
+        Returns:
+            list[Event]: The events, possibly none.
+        """
+        events: list[Event] = []
+        for lane in self._lanes:
+            while len(lane) and len(events) < max_events:
+                events.append(self._pop(lane))
+        return events
+
+    async def get_many(self, max_events: int, linger_seconds: float = 0) -> list[Event]:
+        """Wait for an event, then take up to max_events events. When fewer are ready, wait up to
+        linger_seconds for more to arrive.
+
+        Args:
+            max_events (int): Maximum number of events to take.
+            linger_seconds (float, optional): Time to wait for the batch to fill up. Defaults to 0.
+
+        Returns:
+            list[Event]: At least one event.
+        """
+        events = [await self.get()]
+        events += self.get_many_nowait(max_events - len(events))
+        if linger_seconds <= 0:
+            return events
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + linger_seconds
+        while len(events) < max_events and (remaining := deadline - loop.time()) > 0:
+            try:
+                events.append(await asyncio.wait_for(self.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+            events += self.get_many_nowait(max_events - len(events))
+        return events
+
+    def task_done(self) -> None:
+        """Indicate that a formerly queued event is processed."""
+        if self._unfinished_tasks <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished_tasks -= 1
+        if self._unfinished_tasks == 0:
+            self._finished.set()
+
+    async def join(self) -> None:
+        """Wait until all queued events are processed."""
+        if self._unfinished_tasks > 0:
+            await self._finished.wait()
@@ -1,3 +1,4 @@
+from collections.abc import Hashable
 from dataclasses import dataclass, field
 
 from lymphocyte.events.bus import Event
@@ -15,6 +16,14 @@ class ThreatLevelChangedEvent(Event):
     identifier: str
     host: str
 
+    @property
+    def coalescing_key(self) -> Hashable | None:
+        return self.identifier, self.host
+
+    @property
+    def partition_key(self) -> Hashable:
+        return self.identifier
+
 
 @dataclass
 class OwnThreatLevelChangedEvent(ThreatLevelChangedEvent):
@@ -27,3 +36,24 @@ class OwnThreatLevelChangedEvent(ThreatLevelChangedEvent):
     current: float
     identifier: str = field(init=False, default="self")
     host: str = field(init=False, default="localhost")
+
+
+@dataclass
+class ThreatLevelRemovedEvent(Event):
+    """Event communicating another's threat-level is no longer tracked, because it went stale or
+    its host went away.
+
+    Args:
+        Event (Event): Base Event class
+    """
+
+    identifier: str
+    host: str
+
+    @property
+    def coalescing_key(self) -> Hashable | None:
+        return self.identifier, self.host
+
+    @property
+    def partition_key(self) -> Hashable:
+        return self.identifier
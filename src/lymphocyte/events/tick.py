@@ -1,14 +1,25 @@
-from dataclasses import dataclass
+from collections.abc import Hashable
+from dataclasses import dataclass, field
 
 from lymphocyte.events.bus import Event
 
 
 @dataclass
 class TickEvent(Event):
-    """Tick Event sent every second.
+    """Tick Event sent when a tick trigger is due, named after the trigger, and routed only to
+    that trigger. Unnamed tick events were sent every second before, and trigger nothing.
 
     Args:
         Event (Event): Base Event class
     """
 
     counter: int
+    name: str | None = field(default=None)
+
+    @property
+    def routing_name(self) -> str | None:
+        return self.name
+
+    @property
+    def coalescing_key(self) -> Hashable | None:
+        return self.name
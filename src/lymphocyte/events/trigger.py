@@ -12,3 +12,7 @@ class TriggerEvent(Event):
     """
 
     name: str
+
+    @property
+    def routing_name(self) -> str | None:
+        return self.name
@@ -1,3 +1,4 @@
+from collections.abc import Hashable
 from dataclasses import dataclass
 
 from lymphocyte.events.bus import Event
@@ -11,6 +12,10 @@ class TTLChangedEvent(Event):
         Event (Event): Base Event class
     """
 
+    @property
+    def coalescing_key(self) -> Hashable | None:
+        return ()
+
 
 @dataclass
 class TTLRestartedEvent(Event):
@@ -19,3 +24,22 @@ class TTLRestartedEvent(Event):
     Args:
         Event (Event): Base Event class
     """
+
+    @property
+    def coalescing_key(self) -> Hashable | None:
+        return ()
+
+
+@dataclass
+class TTLThresholdReachedEvent(Event):
+    """Event communicating that a fraction of the TTL has passed.
+
+    Args:
+        Event (Event): Base Event class
+    """
+
+    fraction: float
+
+    @property
+    def coalescing_key(self) -> Hashable | None:
+        return self.fraction
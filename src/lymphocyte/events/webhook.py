@@ -12,3 +12,7 @@ class WebhookEvent(Event):
     """
 
     name: str
+
+    @property
+    def routing_name(self) -> str | None:
+        return self.name
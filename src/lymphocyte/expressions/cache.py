@@ -0,0 +1,124 @@
+import functools
+from collections.abc import Callable, Mapping
+from typing import Any
+
+import jinja2
+import jinja2.nodes
+import jinja2.parser
+import jinja2.sandbox
+
+CompiledExpression = Callable[[Mapping[str, Any]], Any]
+"""An expression compiled into a callable, evaluated against a context of named objects."""
+
+ExpressionCompiler = Callable[[str], CompiledExpression]
+
+ExpressionAnalyzer = Callable[[str], frozenset[str]]
+"""Finds the names of the context variables an expression reads."""
+
+
+def create_environment() -> jinja2.Environment:
+    """The sandboxed environment expressions and templates are compiled in.
+
+    Returns:
+        jinja2.Environment: A new environment.
+    """
+    return jinja2.sandbox.ImmutableSandboxedEnvironment(extensions=["jinja2.ext.debug"])
+
+
+def jinja_expression_names(
+    environment: jinja2.Environment, expression: str
+) -> frozenset[str]:
+    """Find the names of the context variables a Jinja expression reads.
+
+    Args:
+        environment (jinja2.Environment): The environment the expression is compiled in.
+        expression (str): The expression.
+
+    Returns:
+        frozenset[str]: Names of the variables.
+    """
+    parser = jinja2.parser.Parser(environment, expression, state="variable")
+    return frozenset(
+        node.name
+        for node in parser.parse_expression().find_all(jinja2.nodes.Name)
+        if node.ctx == "load"
+    )
+
+
+class ExpressionCache:
+    """Compiles expressions and keeps the most recently used compiled expressions, so an
+    expression that is evaluated over and over again is parsed and compiled only once.
+
+    The cache is bounded and thread-safe.
+    """
+
+    compiler: ExpressionCompiler
+    analyzer: ExpressionAnalyzer | None
+    maxsize: int
+
+    _compile: "functools._lru_cache_wrapper[CompiledExpression]"
+    _names: ExpressionAnalyzer | None
+
+    def __init__(
+        self,
+        compiler: ExpressionCompiler | None = None,
+        maxsize: int = 256,
+        analyzer: ExpressionAnalyzer | None = None,
+    ) -> None:
+        """Constructs an ExpressionCache object.
+
+        Args:
+            compiler (ExpressionCompiler | None, optional): Compiles an expression into a callable. Defaults to compiling in a new sandboxed Jinja environment.
+            maxsize (int, optional): Number of compiled expressions to keep. Defaults to 256.
+            analyzer (ExpressionAnalyzer | None, optional): Finds the variables an expression reads. Defaults to None, or the Jinja analyzer with the default compiler.
+        """
+        if compiler is None:
+            environment = create_environment()
+            compiler = environment.compile_expression
+            analyzer = analyzer or functools.partial(
+                jinja_expression_names, environment
+            )
+        self.compiler = compiler
+        self.analyzer = analyzer
+        self.maxsize = maxsize
+        self._compile = functools.lru_cache(maxsize=maxsize)(compiler)
+        self._names = (
+            functools.lru_cache(maxsize=maxsize)(analyzer) if analyzer else None
+        )
+
+    def compile(self, expression: str) -> CompiledExpression:
+        """Compile an expression, or look up its compiled form.
+
+        Args:
+            expression (str): The expression.
+
+        Returns:
+            CompiledExpression: Callable evaluating the expression against a context.
+        """
+        return self._compile(expression)
+
+    def names(self, expression: str) -> frozenset[str] | None:
+        """Find the names of the context variables an expression reads.
+
+        Args:
+            expression (str): The expression.
+
+        Returns:
+            frozenset[str] | None: Names of the variables, None when they cannot be determined.
+        """
+        return self._names(expression) if self._names is not None else None
+
+    def evaluate(self, expression: str, context: Mapping[str, Any]) -> Any:
+        """Evaluate an expression against a context.
+
+        Args:
+            expression (str): The expression.
+            context (Mapping[str, Any]): Context variables.
+
+        Returns:
+            Any: The value of the expression.
+        """
+        return self._compile(expression)(context)
+
+    def cache_info(self) -> "functools._CacheInfo":
+        return self._compile.cache_info()
@@ -0,0 +1,127 @@
+import math
+import time
+from collections.abc import Mapping
+from typing import Any
+
+from lymphocyte.expressions.cache import CompiledExpression, ExpressionCache
+from lymphocyte.managers.versioned import (
+    VersionedState,
+    VolatileReading,
+    volatile_readings,
+)
+
+_NOT_EVALUATED = object()
+
+
+class Condition:
+    """An expression evaluated against a context of managers, memoised on the state versions of
+    the managers it reads. As long as none of them changed, the previous value is returned
+    without evaluating the expression again.
+
+    Which managers an expression reads is determined from the variables it refers to. Their
+    versions are looked up in the context, so during a cycle the value is memoised on the
+    versions of the snapshot it was evaluated against, not on those of the live managers. When it
+    reads volatile managers, the time-dependent values it reads are tracked while evaluating, and
+    the value is memoised until the first of them reaches a value it was compared with. Expressions
+    reading context variables without a state version are evaluated every time.
+    """
+
+    expression: str
+    context: Mapping[str, Any]
+    evaluations: int
+
+    _compiled: CompiledExpression
+    _dependencies: tuple[str, ...] | None
+    _volatile: bool
+    _versions: tuple[int, ...] | None
+    _valid_until: float
+    _value: Any
+
+    def __init__(
+        self, expression: str, context: Mapping[str, Any], expressions: ExpressionCache
+    ) -> None:
+        """Compiles the expression and finds the managers it reads.
+
+        Args:
+            expression (str): The expression.
+            context (Mapping[str, Any]): Context variables the expression is evaluated against.
+            expressions (ExpressionCache): Cache to compile the expression with.
+        """
+        self.expression = expression
+        self.context = context
+        self.evaluations = 0
+        self._compiled = expressions.compile(expression)
+        self._dependencies = self._find_dependencies(expressions.names(expression))
+        self._volatile = any(
+            self._manager(name).volatile for name in self._dependencies or ()
+        )
+        self._versions = None
+        self._valid_until = -math.inf
+        self._value = _NOT_EVALUATED
+
+    def _manager(self, name: str) -> Any:
+        # Look through snapshots to the managers themselves
+        return getattr(self.context[name], "__wrapped__", self.context[name])
+
+    def _find_dependencies(
+        self, names: frozenset[str] | None
+    ) -> tuple[str, ...] | None:
+        if names is None:
+            return None
+        dependencies = []
+        for name in sorted(names):
+            if name not in self.context:
+                continue  # Constants and builtins
+            if not isinstance(self._manager(name), VersionedState):
+                return None
+            dependencies.append(name)
+        return tuple(dependencies)
+
+    @property
+    def memoised(self) -> bool:
+        """Whether the value of the condition is memoised."""
+        return self._dependencies is not None
+
+    @property
+    def valid_until(self) -> float:
+        """time.monotonic() until which the memoised value holds, unless a manager changes."""
+        return self._valid_until
+
+    def _evaluate_tracked(self, now: float) -> Any:
+        readings: list[VolatileReading] = []
+        token = volatile_readings.set(readings)
+        try:
+            value = self._compiled(self.context)
+        finally:
+            volatile_readings.reset(token)
+        self._valid_until = now + min(
+            (reading.seconds_valid() for reading in readings), default=math.inf
+        )
+        return value
+
+    def __call__(self) -> Any:
+        """Evaluate the expression, unless none of the managers it reads changed since the
+        previous evaluation.
+
+        Returns:
+            Any: The value of the expression.
+        """
+        if self._dependencies is None:
+            self.evaluations += 1
+            return self._compiled(self.context)
+
+        versions = tuple(self.context[name].version for name in self._dependencies)
+        now = time.monotonic()
+        if (
+            versions != self._versions
+            or now >= self._valid_until
+            or self._value is _NOT_EVALUATED
+        ):
+            self.evaluations += 1
+            if self._volatile:
+                self._value = self._evaluate_tracked(now)
+            else:
+                self._value = self._compiled(self.context)
+                self._valid_until = math.inf
+            self._versions = versions
+        return self._value
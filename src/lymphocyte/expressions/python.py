@@ -0,0 +1,332 @@
+"""
+A restricted Python expression backend, an alternative to compiling expressions in the Jinja
+sandbox. Expressions are parsed with `ast`, validated against an allowlist of syntax and compiled
+into a plain closure, so evaluating them does no sandbox checks at all.
+
+Besides Python syntax, the constants `true`, `false` and `none` and the Jinja filters used in rule
+conditions (`x | count`, `x | map(attribute=2) | max`, ...) are supported, so most expressions
+written for the Jinja backend evaluate the same.
+
+Restrictions: names and attributes starting with an underscore, string formatting, frame and code
+attributes and methods that modify lists, dicts and sets are rejected, as are lambdas, assignment
+expressions, f-strings and anything that is not an expression. Only a small set of builtins is
+available.
+"""
+
+import ast
+from collections.abc import Callable, Iterable, Mapping, Sized
+from typing import Any
+
+from lymphocyte.expressions.cache import CompiledExpression
+
+MAX_RANGE = 100_000
+
+ALLOWED_NODES: tuple[type[ast.AST], ...] = (
+    ast.Expression,
+    ast.BoolOp,
+    ast.And,
+    ast.Or,
+    ast.BinOp,
+    ast.Add,
+    ast.Sub,
+    ast.Mult,
+    ast.Div,
+    ast.FloorDiv,
+    ast.Mod,
+    ast.Pow,
+    ast.BitOr,
+    ast.BitAnd,
+    ast.UnaryOp,
+    ast.Not,
+    ast.USub,
+    ast.UAdd,
+    ast.Compare,
+    ast.Eq,
+    ast.NotEq,
+    ast.Lt,
+    ast.LtE,
+    ast.Gt,
+    ast.GtE,
+    ast.Is,
+    ast.IsNot,
+    ast.In,
+    ast.NotIn,
+    ast.IfExp,
+    ast.Call,
+    ast.keyword,
+    ast.Attribute,
+    ast.Subscript,
+    ast.Slice,
+    ast.Name,
+    ast.Load,
+    ast.Store,
+    ast.Constant,
+    ast.List,
+    ast.Tuple,
+    ast.Dict,
+    ast.Set,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+    ast.GeneratorExp,
+    ast.comprehension,
+)
+
+BLOCKED_ATTRIBUTES = frozenset(
+    {
+        # String formatting can reach any attribute, "{0.__class__}".format(x)
+        "format",
+        "format_map",
+        # Frames and code objects of generators, coroutines and tracebacks
+        "gi_frame",
+        "gi_code",
+        "cr_frame",
+        "cr_code",
+        "ag_frame",
+        "ag_code",
+        "tb_frame",
+        "tb_next",
+        "f_back",
+        "f_globals",
+        "f_locals",
+        "f_builtins",
+        "mro",
+        # Methods modifying lists, dicts and sets, like jinja2.sandbox.ImmutableSandboxedEnvironment
+        "append",
+        "extend",
+        "insert",
+        "pop",
+        "popitem",
+        "remove",
+        "reverse",
+        "sort",
+        "clear",
+        "update",
+        "setdefault",
+        "add",
+        "discard",
+        "difference_update",
+        "intersection_update",
+        "symmetric_difference_update",
+    }
+)
+
+
+class UnsafeExpressionError(ValueError):
+    """Raised when an expression uses syntax, names or attributes that are not allowed."""
+
+
+def _safe_range(*args: int) -> range:
+    result = range(*args)
+    if len(result) > MAX_RANGE:
+        raise OverflowError(f"Range too big, at most {MAX_RANGE} items are allowed")
+    return result
+
+
+SAFE_BUILTINS: dict[str, Any] = {
+    "abs": abs,
+    "all": all,
+    "any": any,
+    "bool": bool,
+    "dict": dict,
+    "enumerate": enumerate,
+    "float": float,
+    "int": int,
+    "len": len,
+    "list": list,
+    "max": max,
+    "min": min,
+    "range": _safe_range,
+    "round": round,
+    "set": set,
+    "sorted": sorted,
+    "str": str,
+    "sum": sum,
+    "tuple": tuple,
+    "zip": zip,
+    "true": True,
+    "false": False,
+    "none": None,
+}
+
+
+def _attribute_getter(attribute: str | int | None) -> Callable[[Any], Any]:
+    if attribute is None:
+        return lambda item: item
+    if isinstance(attribute, int):
+        return lambda item: item[attribute]
+
+    parts = attribute.split(".")
+    for part in parts:
+        if part.startswith("_") or part in BLOCKED_ATTRIBUTES:
+            raise UnsafeExpressionError(f"Attribute {part!r} is not allowed")
+
+    def getter(item: Any) -> Any:
+        for part in parts:
+            try:
+                item = getattr(item, part)
+            except AttributeError:
+                item = item[int(part) if part.isdigit() else part]
+        return item
+
+    return getter
+
+
+def _filter_count(value: Iterable[Any]) -> int:
+    return len(value) if isinstance(value, Sized) else sum(1 for _ in value)
+
+
+def _filter_map(value: Iterable[Any], attribute: str | int) -> Iterable[Any]:
+    return map(_attribute_getter(attribute), value)
+
+
+def _filter_max(value: Iterable[Any], attribute: str | int | None = None) -> Any:
+    return max(value, key=_attribute_getter(attribute), default=None)
+
+
+def _filter_min(value: Iterable[Any], attribute: str | int | None = None) -> Any:
+    return min(value, key=_attribute_getter(attribute), default=None)
+
+
+def _filter_sum(value: Iterable[Any], attribute: str | int | None = None) -> Any:
+    return sum(map(_attribute_getter(attribute), value))
+
+
+def _filter_first(value: Iterable[Any]) -> Any:
+    return next(iter(value), None)
+
+
+def _filter_last(value: Iterable[Any]) -> Any:
+    items = list(value)
+    return items[-1] if items else None
+
+
+def _filter_sort(
+    value: Iterable[Any], reverse: bool = False, attribute: str | int | None = None
+) -> list[Any]:
+    return sorted(value, key=_attribute_getter(attribute), reverse=reverse)
+
+
+FILTERS: dict[str, Callable[..., Any]] = {
+    "abs": abs,
+    "bool": bool,
+    "count": _filter_count,
+    "first": _filter_first,
+    "float": float,
+    "int": int,
+    "last": _filter_last,
+    "length": _filter_count,
+    "list": list,
+    "map": _filter_map,
+    "max": _filter_max,
+    "min": _filter_min,
+    "round": round,
+    "sort": _filter_sort,
+    "string": str,
+    "sum": _filter_sum,
+}
+
+
+def _filter_name(name: str) -> str:
+    # Names starting with an underscore cannot appear in a validated expression.
+    return f"_filter_{name}"
+
+
+class _Validator(ast.NodeVisitor):
+    def generic_visit(self, node: ast.AST) -> None:
+        if not isinstance(node, ALLOWED_NODES):
+            raise UnsafeExpressionError(f"{type(node).__name__} is not allowed")
+        super().generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        if node.id.startswith("_"):
+            raise UnsafeExpressionError(f"Name {node.id!r} is not allowed")
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        if node.attr.startswith("_") or node.attr in BLOCKED_ATTRIBUTES:
+            raise UnsafeExpressionError(f"Attribute {node.attr!r} is not allowed")
+        self.generic_visit(node)
+
+
+class _FilterTransformer(ast.NodeTransformer):
+    """Rewrites `value | name(args)` into `_filter_name(value, args)` for known filters."""
+
+    def visit_BinOp(self, node: ast.BinOp) -> ast.AST:
+        self.generic_visit(node)
+        if not isinstance(node.op, ast.BitOr):
+            return node
+
+        right = node.right
+        if isinstance(right, ast.Name) and right.id in FILTERS:
+            func, args, keywords = right, [], []
+        elif (
+            isinstance(right, ast.Call)
+            and isinstance(right.func, ast.Name)
+            and right.func.id in FILTERS
+        ):
+            func, args, keywords = right.func, right.args, right.keywords
+        else:
+            return node
+
+        return ast.Call(
+            func=ast.Name(id=_filter_name(func.id), ctx=ast.Load()),
+            args=[node.left, *args],
+            keywords=keywords,
+        )
+
+
+_NAMESPACE: dict[str, Any] = {
+    "__builtins__": SAFE_BUILTINS,
+    **{_filter_name(name): function for name, function in FILTERS.items()},
+}
+
+
+def python_expression_names(expression: str) -> frozenset[str]:
+    """Find the names of the context variables a Python expression reads.
+
+    Args:
+        expression (str): The expression.
+
+    Returns:
+        frozenset[str]: Names of the variables, excluding those bound by comprehensions.
+    """
+    names = [
+        node
+        for node in ast.walk(ast.parse(expression.strip(), mode="eval"))
+        if isinstance(node, ast.Name)
+    ]
+    bound = {node.id for node in names if isinstance(node.ctx, ast.Store)}
+    return frozenset(
+        node.id
+        for node in names
+        if isinstance(node.ctx, ast.Load) and node.id not in bound
+    )
+
+
+def compile_python_expression(expression: str) -> CompiledExpression:
+    """Compile an expression into a closure evaluating it against a context.
+
+    Args:
+        expression (str): The expression.
+
+    Raises:
+        SyntaxError: When the expression is not a Python expression.
+        UnsafeExpressionError: When the expression uses syntax, names or attributes that are not allowed.
+
+    Returns:
+        CompiledExpression: Callable evaluating the expression against a context.
+    """
+    tree = ast.parse(expression.strip(), mode="eval")
+    _Validator().visit(tree)
+    tree = ast.fix_missing_locations(_FilterTransformer().visit(tree))
+    code = compile(tree, "<expression>", "eval")
+
+    def evaluate(context: Mapping[str, Any]) -> Any:
+        # Context variables are globals, so comprehensions can refer to them too. They cannot
+        # shadow the restricted builtins or the filters.
+        # Sandboxed, the tree is validated and only reaches the restricted builtins
+        # pylint: disable-next=eval-used
+        return eval(code, {**context, **_NAMESPACE})  # nosec B307
+
+    return evaluate
@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from collections.abc import Iterable
+from collections.abc import Awaitable, Callable, Iterable
 from dataclasses import dataclass, field
 from typing import Any, Protocol
 
@@ -33,6 +33,28 @@ class RegisterBackgroundTasks(InstrumentFastAPI):
             )
 
 
+@dataclass
+class RegisterStartup(InstrumentFastAPI):
+    handlers: list[Callable[[], Awaitable[None]]] = field(default_factory=list)
+
+    def instrument_app(self, app: FastAPI) -> None:
+        @app.on_event("startup")
+        async def startup_event() -> None:
+            for handler in self.handlers:
+                await handler()
+
+
+@dataclass
+class RegisterShutdown(InstrumentFastAPI):
+    handlers: list[Callable[[], Awaitable[None]]] = field(default_factory=list)
+
+    def instrument_app(self, app: FastAPI) -> None:
+        @app.on_event("shutdown")
+        async def shutdown_event() -> None:
+            for handler in self.handlers:
+                await handler()
+
+
 @dataclass
 class RegisterRoutes(InstrumentFastAPI):
     routes: Iterable[APIRouter] = field(
@@ -0,0 +1,84 @@
+import math
+from dataclasses import dataclass
+from typing import Protocol
+
+
+class Decay(Protocol):
+    """Decay of the part of a threat level above, or below, the base level."""
+
+    def decayed(self, excess: float, seconds: float) -> float:
+        """The excess left after some time.
+
+        Args:
+            excess (float): Excess over the base level.
+            seconds (float): Seconds passed.
+
+        Returns:
+            float: The excess left.
+        """
+
+    def area(self, excess: float, seconds: float) -> float:
+        """The area under the excess while it decays for some time.
+
+        Args:
+            excess (float): Excess over the base level.
+            seconds (float): Seconds passed.
+
+        Returns:
+            float: The area, negative for an excess below the base level.
+        """
+
+    def seconds_until(self, excess: float, goal: float) -> float | None:
+        """Seconds until an excess has decayed to another.
+
+        Args:
+            excess (float): Excess over the base level.
+            goal (float): Excess to decay to.
+
+        Returns:
+            float | None: Seconds from now, None when the excess never decays to the goal.
+        """
+
+
+@dataclass
+class HalfLifeDecay:
+    """Exponential decay, halving the excess every half_life_seconds. The base level itself is
+    never reached."""
+
+    half_life_seconds: float
+
+    def decayed(self, excess: float, seconds: float) -> float:
+        return excess * math.pow(0.5, seconds / self.half_life_seconds)
+
+    def area(self, excess: float, seconds: float) -> float:
+        return (
+            (excess - self.decayed(excess, seconds))
+            * self.half_life_seconds
+            / math.log(2)
+        )
+
+    def seconds_until(self, excess: float, goal: float) -> float | None:
+        if goal == excess:
+            return 0.0
+        if goal * excess <= 0 or abs(goal) > abs(excess):
+            return None
+        return self.half_life_seconds * math.log2(excess / goal)
+
+
+@dataclass
+class LinearDecay:
+    """Linear decay, leaking per_second from the excess until the base level is reached."""
+
+    per_second: float
+
+    def decayed(self, excess: float, seconds: float) -> float:
+        return math.copysign(max(abs(excess) - self.per_second * seconds, 0.0), excess)
+
+    def area(self, excess: float, seconds: float) -> float:
+        seconds = min(seconds, abs(excess) / self.per_second)
+        return (excess + self.decayed(excess, seconds)) / 2 * seconds
+
+    def seconds_until(self, excess: float, goal: float) -> float | None:
+        if goal * excess < 0 or abs(goal) > abs(excess):
+            return None
+        return (abs(excess) - abs(goal)) / self.per_second
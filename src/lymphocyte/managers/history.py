@@ -0,0 +1,283 @@
+import math
+import time
+from array import array
+from collections.abc import Iterator
+
+from lymphocyte.managers.decay import Decay
+from lymphocyte.managers.versioned import tracked
+
+
+class LevelHistory:
+    """Fixed-size history of a threat level, as `(time.monotonic(), level)` samples in a ring
+    buffer of arrays. Once full, new samples overwrite the oldest ones.
+
+    A level holds from its sample until the next, so a window of the last n seconds also covers
+    the level of the sample before it. With a decay, the level decays from each sample towards
+    the base level until the next, as the level of a DecayingThreatLevelManager does. Next to the
+    samples the buffer keeps the area under the levels up to each sample, and a segment tree of
+    the maximum level between each sample and the next, so windowed max, mean and rate take
+    O(log n). Percentiles sort the levels in the window.
+
+    Windowed values change with the passing of time. Read from a volatile manager, max and
+    percentile are tracked until the next sample leaves the window, or not memoised with a decay;
+    mean and rate change continuously and are not memoised.
+    """
+
+    capacity: int
+    decay: Decay | None
+    base_level: float
+
+    _times: "array[float]"
+    _levels: "array[float]"
+    _areas: "array[float]"
+    _tree: "array[float]"
+    _start: int
+    _size: int
+
+    def __init__(
+        self,
+        capacity: int = 1024,
+        decay: Decay | None = None,
+        base_level: float = 0.0,
+    ) -> None:
+        """Constructs a LevelHistory object.
+
+        Args:
+            capacity (int, optional): Maximum number of samples. Defaults to 1024.
+            decay (Decay | None, optional): How the level decays between samples. Defaults to None, a level that holds.
+            base_level (float, optional): Level decayed towards. Defaults to 0.0.
+        """
+        if capacity < 1:
+            raise ValueError("History capacity must be at least 1")
+        self.capacity = capacity
+        self.decay = decay
+        self.base_level = base_level
+        self._times = array("d", bytes(8 * capacity))
+        self._levels = array("d", bytes(8 * capacity))
+        self._areas = array("d", bytes(8 * capacity))
+        self._tree = array("d", [-math.inf]) * (2 * capacity)
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[tuple[float, float]]:
+        for index in range(self._size):
+            slot = self._slot(index)
+            yield self._times[slot], self._levels[slot]
+
+    def _slot(self, index: int) -> int:
+        return (self._start + index) % self.capacity
+
+    def _decayed(self, slot: int, seconds: float) -> float:
+        """Level of a sample some seconds after it, had no other sample followed."""
+        if self.decay is None:
+            return self._levels[slot]
+        excess = self._levels[slot] - self.base_level
+        return self.base_level + self.decay.decayed(excess, max(seconds, 0.0))
+
+    def _segment_area(self, slot: int, seconds: float) -> float:
+        """Area under the level of a sample over some seconds after it."""
+        if self.decay is None:
+            return self._levels[slot] * seconds
+        excess = self._levels[slot] - self.base_level
+        return self.base_level * seconds + self.decay.area(excess, seconds)
+
+    def _set_max(self, slot: int, level: float) -> None:
+        node = slot + self.capacity
+        self._tree[node] = level
+        while node > 1:
+            node //= 2
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def record(self, level: float, now: float | None = None) -> None:
+        """Record a level.
+
+        Args:
+            level (float): The level.
+            now (float | None, optional): time.monotonic() of the level, not before the previous sample. Defaults to now.
+        """
+        now = time.monotonic() if now is None else now
+        area = 0.0
+        if self._size:
+            last = self._slot(self._size - 1)
+            seconds = now - self._times[last]
+            area = self._areas[last] + self._segment_area(last, seconds)
+            if self.decay is not None:
+                # The level only decays, so it is highest at either end of a sample
+                self._set_max(
+                    last, max(self._levels[last], self._decayed(last, seconds))
+                )
+
+        if self._size == self.capacity:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        else:
+            slot = self._slot(self._size)
+            self._size += 1
+        self._times[slot] = now
+        self._levels[slot] = level
+        self._areas[slot] = area
+        self._set_max(slot, level)
+
+    def _find(self, moment: float) -> int:
+        """Index of the last sample at or before a moment, -1 when there is none."""
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if self._times[self._slot(middle)] <= moment:
+                low = middle + 1
+            else:
+                high = middle
+        return low - 1
+
+    def _max_slots(self, low: int, high: int) -> float:
+        """Maximum level from the slots from low up to high until their next samples."""
+        result = -math.inf
+        low += self.capacity
+        high += self.capacity
+        while low < high:
+            if low % 2:
+                result = max(result, self._tree[low])
+                low += 1
+            if high % 2:
+                high -= 1
+                result = max(result, self._tree[high])
+            low //= 2
+            high //= 2
+        return result
+
+    def _window(
+        self, seconds: float, now: float | None
+    ) -> tuple[int, int, float, float]:
+        """Indexes of the first and last sample covering the window, and its begin and end."""
+        now = time.monotonic() if now is None else now
+        last = max(self._find(now), 0)
+        first = min(max(self._find(now - seconds), 0), last)
+        begin = max(now - seconds, self._times[self._slot(first)])
+        return first, last, begin, now
+
+    def _seconds_until_first_leaves(
+        self, seconds: float, first: int, now: float
+    ) -> float | None:
+        if first + 1 >= self._size:
+            return None
+        return max(self._times[self._slot(first + 1)] + seconds - now, 0.0)
+
+    def _max_indexes(self, first: int, stop: int) -> float:
+        """Maximum level from the samples from first up to stop until their next samples."""
+        if first >= stop:
+            return -math.inf
+        low, high = self._slot(first), self._slot(stop - 1) + 1
+        if low < high:
+            return self._max_slots(low, high)
+        return max(self._max_slots(low, self.capacity), self._max_slots(0, high))
+
+    def _area_at(self, moment: float) -> float:
+        slot = self._slot(max(self._find(moment), 0))
+        return self._areas[slot] + self._segment_area(slot, moment - self._times[slot])
+
+    def _level_at(self, moment: float) -> float:
+        slot = self._slot(max(self._find(moment), 0))
+        return self._decayed(slot, moment - self._times[slot])
+
+    def _until(self, seconds: float, first: int, now: float) -> float | None:
+        """Seconds a maximum or percentile stays the same."""
+        if self.decay is not None:
+            return 0.0
+        return self._seconds_until_first_leaves(seconds, first, now)
+
+    def max(self, seconds: float, now: float | None = None) -> float | None:
+        """Maximum level over the last seconds.
+
+        Args:
+            seconds (float): Length of the window.
+            now (float | None, optional): time.monotonic() at the end of the window. Defaults to now.
+
+        Returns:
+            float | None: The maximum, None without samples.
+        """
+        if not self._size:
+            return None
+        first, last, begin, end = self._window(seconds, now)
+        value = max(self._level_at(begin), self._level_at(end))
+        if first < last:
+            first_slot, next_slot = self._slot(first), self._slot(first + 1)
+            value = max(
+                value,
+                self._decayed(
+                    first_slot, self._times[next_slot] - self._times[first_slot]
+                ),
+                self._max_indexes(first + 1, last),
+                self._levels[self._slot(last)],
+            )
+        until = self._until(seconds, first, end)
+        return tracked(value, lambda _: until)
+
+    def mean(self, seconds: float, now: float | None = None) -> float | None:
+        """Time-weighted mean level over the last seconds, or over the whole history when it is
+        shorter.
+
+        Args:
+            seconds (float): Length of the window.
+            now (float | None, optional): time.monotonic() at the end of the window. Defaults to now.
+
+        Returns:
+            float | None: The mean, None without samples.
+        """
+        if not self._size:
+            return None
+        _, _, begin, end = self._window(seconds, now)
+        if end <= begin:
+            value = self._level_at(end)
+        else:
+            value = (self._area_at(end) - self._area_at(begin)) / (end - begin)
+        return tracked(value, lambda _: 0.0)
+
+    def rate(self, seconds: float, now: float | None = None) -> float | None:
+        """Change of the level per second over the last seconds, or over the whole history when
+        it is shorter.
+
+        Args:
+            seconds (float): Length of the window.
+            now (float | None, optional): time.monotonic() at the end of the window. Defaults to now.
+
+        Returns:
+            float | None: The rate, None without samples.
+        """
+        if not self._size:
+            return None
+        _, _, begin, end = self._window(seconds, now)
+        value = 0.0
+        if end > begin:
+            value = (self._level_at(end) - self._level_at(begin)) / (end - begin)
+        return tracked(value, lambda _: 0.0)
+
+    def percentile(
+        self, seconds: float, percent: float, now: float | None = None
+    ) -> float | None:
+        """Percentile of the level at the start of the window and of the sampled levels within
+        it, interpolating linearly.
+
+        Args:
+            seconds (float): Length of the window.
+            percent (float): The percentile, from 0 to 100.
+            now (float | None, optional): time.monotonic() at the end of the window. Defaults to now.
+
+        Returns:
+            float | None: The percentile, None without samples.
+        """
+        if not self._size:
+            return None
+        first, last, begin, end = self._window(seconds, now)
+        levels = sorted(
+            [self._level_at(begin)]
+            + [self._levels[self._slot(index)] for index in range(first + 1, last + 1)]
+        )
+        position = min(max(percent, 0.0), 100.0) / 100 * (len(levels) - 1)
+        below = math.floor(position)
+        above = min(below + 1, len(levels) - 1)
+        value = levels[below] + (levels[above] - levels[below]) * (position - below)
+        until = self._until(seconds, first, end)
+        return tracked(value, lambda _: until)
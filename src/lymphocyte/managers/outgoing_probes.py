@@ -1,7 +1,8 @@
 from lymphocyte.events.bus import EventBus
+from lymphocyte.managers.versioned import VersionedState
 
 
-class OutgoingProbesManager:
+class OutgoingProbesManager(VersionedState):
     """Manager keeping the state of Of outgoing probes (health, readiness, and liveness).
 
     Returns:
@@ -38,4 +39,6 @@ class OutgoingProbesManager:
         Args:
             status (bool): Current status to set.
         """
-        self._status = status
+        if status != self._status:
+            self._status = status
+            self.changed()
@@ -3,6 +3,7 @@ from collections import namedtuple
 
 from lymphocyte.events.bus import EventBus
 from lymphocyte.events.prometheus import PrometheusAlertStatusChangedEvent
+from lymphocyte.managers.versioned import VersionedState
 
 StatusRecordIdentifiers = namedtuple("StatusRecordIdentifiers", ["alertname"])
 StatusRecordValues = namedtuple("StatusRecordValues", ["current_status", "last_change"])
@@ -11,7 +12,7 @@ StatusRecord = namedtuple(
 )
 
 
-class PrometheusManager:
+class PrometheusManager(VersionedState):
     """Manager storing the state of Prometheus alerts and records with the use of set and get methods.
 
     Returns:
@@ -49,6 +50,7 @@ class PrometheusManager:
         self._statuses[identifier] = StatusRecordValues(
             is_firing, datetime.datetime.now()
         )
+        self.changed()
         await self._event_bus.dispatch_async(
             PrometheusAlertStatusChangedEvent(identifier.alertname, is_firing)
         )
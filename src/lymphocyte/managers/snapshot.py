@@ -0,0 +1,207 @@
+import contextlib
+import contextvars
+import inspect
+from collections.abc import Callable, Hashable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from lymphocyte.managers.versioned import (
+    SecondsUntil,
+    TrackedValue,
+    VersionedState,
+    VolatileReading,
+    tracked,
+    volatile_readings,
+)
+
+
+@dataclass(frozen=True)
+class _TimeDependent:
+    value: float
+    seconds_until: SecondsUntil
+
+
+_UNCACHEABLE = object()
+
+
+def _freeze(value: Any) -> Any:
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _read(compute: Callable[[], Any]) -> Any:
+    """Read a value to keep in a snapshot. Time-dependent values of volatile managers are kept
+    with the means to keep tracking them; values derived from them cannot be kept."""
+    readings: list[VolatileReading] = []
+    token = volatile_readings.set(readings)
+    try:
+        value = compute()
+    finally:
+        volatile_readings.reset(token)
+
+    if not readings:
+        return _freeze(value)
+    if (
+        len(readings) == 1
+        and isinstance(value, TrackedValue)
+        and not readings[0].opaque
+        and not readings[0].thresholds
+    ):
+        return _TimeDependent(float.__float__(value), readings[0].seconds_until)
+    return _UNCACHEABLE
+
+
+def _kept(value: Any) -> Any:
+    if isinstance(value, _TimeDependent):
+        return tracked(value.value, value.seconds_until)
+    return value
+
+
+class ManagerSnapshot:
+    """Read-only view of a manager, which keeps everything read from it: attribute values and the
+    results of method calls per set of arguments. Lists are returned as tuples, and coroutine
+    methods, which would change the manager, are not available. The state version is the one of
+    the manager when the snapshot was taken."""
+
+    __slots__ = ("_manager", "_values")
+
+    _manager: VersionedState
+    _values: dict[Hashable, Any]
+
+    def __init__(self, manager: VersionedState) -> None:
+        object.__setattr__(self, "_manager", manager)
+        object.__setattr__(self, "_values", {"version": manager.version})
+
+    @property
+    def __wrapped__(self) -> VersionedState:
+        return self._manager
+
+    def _call(self, name: str, method: Callable[..., Any]) -> Callable[..., Any]:
+        def call(*args: Any, **kwargs: Any) -> Any:
+            try:
+                key = (name, args, tuple(sorted(kwargs.items())))
+                hash(key)
+            except TypeError:
+                return _freeze(method(*args, **kwargs))
+            if (value := self._values.get(key, _UNCACHEABLE)) is _UNCACHEABLE:
+                value = _read(lambda: method(*args, **kwargs))
+                if value is _UNCACHEABLE:
+                    return method(*args, **kwargs)
+                self._values[key] = value
+            return _kept(value)
+
+        return call
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if (value := self._values.get(name, _UNCACHEABLE)) is not _UNCACHEABLE:
+            return _kept(value)
+
+        attribute = getattr(self._manager, name)
+        if inspect.iscoroutinefunction(attribute):
+            raise AttributeError(f"{name} is not available on a snapshot")
+        if inspect.ismethod(attribute):
+            value = self._values[name] = self._call(name, attribute)
+            return value
+
+        value = _read(lambda: getattr(self._manager, name))
+        if value is _UNCACHEABLE:
+            return getattr(self._manager, name)
+        self._values[name] = value
+        return _kept(value)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("A snapshot cannot be changed")
+
+    def __repr__(self) -> str:
+        return f"ManagerSnapshot({self._manager!r})"
+
+
+class ContextSnapshot(Mapping[str, Any]):
+    """Lazily populated snapshot of a context: managers are replaced by ManagerSnapshots when
+    they are first looked up, other context variables are passed as they are."""
+
+    _live: Mapping[str, Any]
+    _values: dict[str, Any]
+
+    def __init__(self, live: Mapping[str, Any]) -> None:
+        self._live = live
+        self._values = {}
+
+    def __getitem__(self, name: str) -> Any:
+        if (value := self._values.get(name, _UNCACHEABLE)) is _UNCACHEABLE:
+            value = self._live[name]
+            if isinstance(value, VersionedState):
+                value = ManagerSnapshot(value)
+            self._values[name] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._live)
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+
+current_snapshot: contextvars.ContextVar[
+    ContextSnapshot | None
+] = contextvars.ContextVar("current_snapshot", default=None)
+
+
+class RuleContext(Mapping[str, Any]):
+    """The context rule conditions, actions and probes are evaluated against.
+
+    During a cycle, all lookups share one ContextSnapshot, so every rule and action handling the
+    events of the cycle sees the same state, and every query on a manager runs at most once.
+    Tasks started during a cycle, like performing an action, keep seeing its snapshot. Outside a
+    cycle, lookups return the live managers.
+
+    The snapshot of a cycle is shared by all RuleContexts, which are expected to hold the same
+    managers.
+    """
+
+    _live: Mapping[str, Any]
+
+    def __init__(self, live: Mapping[str, Any]) -> None:
+        """Constructs a RuleContext object.
+
+        Args:
+            live (Mapping[str, Any]): The live context variables.
+        """
+        self._live = live
+
+    def __getitem__(self, name: str) -> Any:
+        if (snapshot := current_snapshot.get()) is not None:
+            return snapshot[name]
+        return self._live[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._live)
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def live(self, name: str) -> Any:
+        """Look up a live context variable, also during a cycle.
+
+        Args:
+            name (str): Name of the variable.
+
+        Returns:
+            Any: The variable.
+        """
+        return self._live[name]
+
+    @contextlib.contextmanager
+    def cycle(self) -> Iterator[ContextSnapshot]:
+        """Start a cycle with a new snapshot, for the current task and the tasks it starts.
+
+        Yields:
+            ContextSnapshot: The snapshot.
+        """
+        snapshot = ContextSnapshot(self._live)
+        token = current_snapshot.set(snapshot)
+        try:
+            yield snapshot
+        finally:
+            current_snapshot.reset(token)
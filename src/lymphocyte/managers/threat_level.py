@@ -1,53 +1,102 @@
-import asyncio
+import bisect
 import collections
 import datetime
+import logging
+import math
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import NamedTuple
 
 from lymphocyte.events.bus import EventBus
 from lymphocyte.events.threat_level import (
     OwnThreatLevelChangedEvent,
     ThreatLevelChangedEvent,
+    ThreatLevelRemovedEvent,
 )
+from lymphocyte.managers.decay import Decay
+from lymphocyte.managers.history import LevelHistory
+from lymphocyte.managers.versioned import VersionedState, tracked
+from lymphocyte.services.timers import Timer, TimerService
 
+log = logging.getLogger(__name__)
 
-class ThreatLevelManager:
+TemporaryIncrement = collections.namedtuple(
+    "TemporaryIncrement", ["amount", "deadline"]
+)
+
+
+class ThreatLevelManager(VersionedState):
     """Manager setting and storing the state of own threat-level.
 
+    Temporary increments are reverted by timers of a TimerService, which reset() cancels.
+
+    Every change of the level is recorded in a fixed-size history, which rules can query for
+    windowed aggregates. Those change with the passing of time, so the manager is volatile.
+
     Returns:
         float: Current threat-level
     """
 
+    volatile = True
+
+    history: LevelHistory
+
     _event_bus: EventBus
+    _timers: TimerService
 
     _base_level: float
     _current_level: float
+    _increments: set[Timer]
 
-    def __init__(self, event_bus: EventBus, base_level: float) -> None:
+    def __init__(
+        self,
+        event_bus: EventBus,
+        base_level: float,
+        timers: TimerService | None = None,
+        history_capacity: int = 1024,
+    ) -> None:
         """Constructs a ThreatLevelManager object.
 
         Args:
             event_bus (EventBus): The event bus.
             base_level (float): Base threat level value.
+            timers (TimerService | None, optional): Timers to revert temporary increments with. Defaults to a TimerService of its own.
+            history_capacity (int, optional): Number of changes kept in the history. Defaults to 1024.
         """
         self._event_bus = event_bus
+        self._timers = timers if timers is not None else TimerService()
         self._base_level = base_level
         self._current_level = base_level
+        self._increments = set()
+        self.history = LevelHistory(history_capacity)
+        self.history.record(base_level)
+
+    def changed(self) -> None:
+        super().changed()
+        self._record()
+
+    def _record(self) -> None:
+        """Record the current level in the history."""
+        self.history.record(self._current_level, time.monotonic())
 
     async def reset(self) -> None:
-        """Resets the threat level to the base value."""
+        """Resets the threat level to the base value, cancelling the temporary increments."""
+        for timer in self._increments:
+            self._timers.cancel(timer)
+        self._increments.clear()
         self._current_level = self._base_level
+        self.changed()
         await self.notify_changed()
 
-    async def _decrement_after_increment(
-        self, amount: float, sleep_for_seconds: float
-    ) -> None:
-        """Decrease the threat level after n seconds to accomodate a temporary increment. Can be called by increment().
+    async def _decrement_after_increment(self, timer: Timer) -> None:
+        """Revert a temporary increment, called by its timer.
 
         Args:
-            amount (float): Value to decrease the threat level by.
-            sleep_for_seconds (float): Seconds to wait before decreasing the threat level back.
+            timer (Timer): The timer of the increment, with the amount as data.
         """
-        await asyncio.sleep(sleep_for_seconds)
-        await self.increment(-amount, None)
+        self._increments.discard(timer)
+        await self.increment(-timer.data, None)
 
     async def increment(self, amount: float, for_seconds: float | None = None) -> None:
         """Increase the threat level, possibly temporarily.
@@ -57,11 +106,17 @@ class ThreatLevelManager:
             for_seconds (float | None, optional): Amount of seconds of temporary increment. Defaults to None.
         """
         self._current_level += amount
+        self.changed()
         await self.notify_changed()
 
         if for_seconds:
-            asyncio.get_event_loop().create_task(
-                self._decrement_after_increment(amount, for_seconds)
+            self._increments.add(
+                self._timers.schedule(
+                    for_seconds,
+                    self._decrement_after_increment,
+                    name="threat_level_increment",
+                    data=amount,
+                )
             )
 
     async def notify_changed(self) -> None:
@@ -72,49 +127,326 @@ class ThreatLevelManager:
     def current(self) -> float:
         return self._current_level
 
+    @property
+    def temporary_increments(self) -> list[TemporaryIncrement]:
+        """The temporary increments yet to be reverted, with the time.monotonic() deadline at
+        which they are, earliest first."""
+        return [
+            TemporaryIncrement(timer.data, timer.deadline)
+            for timer in sorted(self._increments)
+        ]
+
+
+class DecayingThreatLevelManager(ThreatLevelManager):
+    """Manager of own threat-level which decays back to the base level by itself. The level is
+    kept as the value at the last change and the time of that change, and computed from those on
+    read.
+
+    Rather than on every change, OwnThreatLevelChangedEvents are dispatched when the level crosses
+    one of the thresholds, by increments or by decaying; a single timer waits for the next
+    crossing by decay. Without thresholds every increment and reset is dispatched, and decay is not.
+    Increments decay by themselves, so they are never temporary. The history follows the decay
+    between changes.
+
+    Returns:
+        float: Current threat-level
+    """
+
+    _decay: Decay
+    _thresholds: tuple[float, ...]
+    _updated: float
+    _band: int
+    _crossing: Timer | None
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        base_level: float,
+        decay: Decay,
+        thresholds: Iterable[float] = (),
+        timers: TimerService | None = None,
+        history_capacity: int = 1024,
+    ) -> None:
+        """Constructs a DecayingThreatLevelManager object.
+
+        Args:
+            event_bus (EventBus): The event bus.
+            base_level (float): Base threat level value.
+            decay (Decay): How the level decays back to the base level.
+            thresholds (Iterable[float], optional): Levels crossings of which are dispatched. Defaults to ().
+            timers (TimerService | None, optional): Timers to wait for crossings with. Defaults to a TimerService of its own.
+            history_capacity (int, optional): Number of changes kept in the history. Defaults to 1024.
+        """
+        super().__init__(event_bus, base_level, timers, history_capacity)
+        self._decay = decay
+        self._thresholds = tuple(sorted(set(thresholds)))
+        self._updated = time.monotonic()
+        self._band = self._band_of(base_level)
+        self._crossing = None
+        self.history = LevelHistory(history_capacity, decay, base_level)
+        self._record()
+
+    def _band_of(self, level: float) -> int:
+        """The number of thresholds a level is at or above."""
+        return bisect.bisect_right(self._thresholds, level)
+
+    def _level_at(self, now: float) -> float:
+        excess = self._current_level - self._base_level
+        return self._base_level + self._decay.decayed(excess, now - self._updated)
+
+    def _record(self) -> None:
+        self.history.record(self._current_level, self._updated)
+
+    def _settle(self) -> None:
+        now = time.monotonic()
+        self._current_level = self._level_at(now)
+        self._updated = now
+
+    @property
+    def current(self) -> float:
+        return tracked(self._level_at(time.monotonic()), self.seconds_until)
+
+    def seconds_until(self, level: float) -> float | None:
+        """Seconds until the threat level has decayed to the given level.
+
+        Args:
+            level (float): The level.
+
+        Returns:
+            float | None: Seconds from now, None when the threat level never decays to it.
+        """
+        excess = self._level_at(time.monotonic()) - self._base_level
+        return self._decay.seconds_until(excess, level - self._base_level)
+
+    async def reset(self) -> None:
+        """Resets the threat level to the base value."""
+        self._updated = time.monotonic()
+        await super().reset()
+        self._band = self._band_of(self._current_level)
+        self._schedule_crossing()
+
+    async def increment(self, amount: float, for_seconds: float | None = None) -> None:
+        """Increase the threat level, which then decays.
+
+        Args:
+            amount (float): Value to increase the threat level by
+            for_seconds (float | None, optional): Ignored, increments decay by themselves. Defaults to None.
+        """
+        if for_seconds:
+            log.debug("Ignoring for_seconds of decaying threat level increment")
+        self._settle()
+        self._current_level += amount
+        self.changed()
+
+        band = self._band_of(self._current_level)
+        if not self._thresholds or band != self._band:
+            self._band = band
+            await self.notify_changed()
+        self._schedule_crossing()
+
+    def _schedule_crossing(self) -> None:
+        """Wait for the level to decay across the nearest threshold towards the base level."""
+        if self._crossing is not None:
+            self._timers.cancel(self._crossing)
+            self._crossing = None
+
+        if self._current_level > self._base_level and self._band > 0:
+            threshold, band = self._thresholds[self._band - 1], self._band - 1
+        elif self._current_level < self._base_level and self._band < len(
+            self._thresholds
+        ):
+            threshold, band = self._thresholds[self._band], self._band + 1
+        else:
+            return
+
+        if self._band_of(self._level_at(time.monotonic())) == band:
+            seconds: float | None = 0.0  # Crossed already
+        else:
+            seconds = self.seconds_until(threshold)
+        if seconds is not None:
+            self._crossing = self._timers.schedule(
+                seconds, self._crossed, name="threat_level_crossing", data=band
+            )
+
+    async def _crossed(self, timer: Timer) -> None:
+        self._crossing = None
+        self._band = timer.data
+        await self.notify_changed()
+        self._schedule_crossing()
+
 
 ThreatLevelRecordIdentifiers = collections.namedtuple(
     "ThreatLevelRecordIdentifiers", ["identifier", "host"]
 )
-ThreatLevelRecordValues = collections.namedtuple(
-    "ThreatLevelRecordValues", ["level", "last_update"]
-)
-ThreatLevelRecord = collections.namedtuple(
-    "ThreatLevelRecord", ["identifier", "host", "level", "last_update"]
+
+
+class ThreatLevelRecord(NamedTuple):
+    identifier: str
+    host: str
+    level: float
+    last_update: datetime.datetime
+
+
+ThreatLevelAggregate = collections.namedtuple(
+    "ThreatLevelAggregate", ["count", "min", "max", "mean"]
 )
 
 
-class OtherThreatLevelsManager:
+@dataclass
+class _LevelAggregate:
+    """Levels kept in order, to aggregate in O(1) between changes. The mean is summed exactly
+    with math.fsum on the first read after a change, so it does not drift with the updates.
+
+    The levels are the hosts of an identifier, or all hosts, which are dozens. Inserting into a
+    sorted list shifts them with a single memmove, which is cheaper at that size than keeping a
+    tree or heaps in Python.
+    """
+
+    levels: list[float] = field(default_factory=list)
+    mean: float | None = None
+
+    def add(self, level: float) -> None:
+        bisect.insort(self.levels, level)
+        self.mean = None
+
+    def remove(self, level: float) -> None:
+        del self.levels[bisect.bisect_left(self.levels, level)]
+        self.mean = None
+
+    def aggregate(self) -> ThreatLevelAggregate:
+        if not self.levels:
+            return ThreatLevelAggregate(0, None, None, None)
+        count = len(self.levels)
+        if self.mean is None:
+            self.mean = math.fsum(self.levels) / count
+        return ThreatLevelAggregate(count, self.levels[0], self.levels[-1], self.mean)
+
+
+class OtherThreatLevelsManager(VersionedState):
     """Manager setting and storing the state of others' threat-levels.
 
+    Records are indexed by identifier and by host, so get() only looks at the records that can
+    match, and returns them in the order they were first set. The count, minimum and maximum
+    level per identifier and over all records are kept up to date on every change, and read in
+    O(1) with aggregate(); the mean is summed exactly on the first read after a change.
+
+    Records set with stale_after_seconds are removed when they have not been set again for that
+    long. A timer of a TimerService checks each of them once the time has passed since the
+    update it was scheduled for; updates since move it on. Removal dispatches a
+    ThreatLevelRemovedEvent.
+
+    The levels set for each identifier and host are recorded in a fixed-size history, see
+    ThreatLevelManager, so the manager is volatile.
+
     Returns:
         float: Current threat-level of others
     """
 
-    _event_bus: EventBus
-
-    _current_levels: dict[ThreatLevelRecordIdentifiers, ThreatLevelRecordValues]
+    volatile = True
 
-    def __init__(self, event_bus: EventBus) -> None:
+    _event_bus: EventBus
+    _timers: TimerService
+    _history_capacity: int
+
+    _records: dict[ThreatLevelRecordIdentifiers, ThreatLevelRecord]
+    _by_identifier: dict[str, dict[ThreatLevelRecordIdentifiers, ThreatLevelRecord]]
+    _by_host: dict[str, dict[ThreatLevelRecordIdentifiers, ThreatLevelRecord]]
+    _aggregates: dict[str | None, _LevelAggregate]
+    _histories: dict[ThreatLevelRecordIdentifiers, LevelHistory]
+    _updated: dict[ThreatLevelRecordIdentifiers, float]
+    _stale_after: dict[ThreatLevelRecordIdentifiers, float]
+    _expiry: dict[ThreatLevelRecordIdentifiers, Timer]
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        history_capacity: int = 256,
+        timers: TimerService | None = None,
+    ) -> None:
         """Constructs a OtherThreatLevelsManager object.
 
         Args:
             event_bus (EventBus): The event bus.
+            history_capacity (int, optional): Number of levels kept in the history of each identifier and host. Defaults to 256.
+            timers (TimerService | None, optional): Timers to remove stale records with. Defaults to a TimerService of its own.
         """
         self._event_bus = event_bus
-        self._current_levels = {}
+        self._timers = timers if timers is not None else TimerService()
+        self._history_capacity = history_capacity
+        self._records = {}
+        self._by_identifier = {}
+        self._by_host = {}
+        self._aggregates = {None: _LevelAggregate()}
+        self._histories = {}
+        self._updated = {}
+        self._stale_after = {}
+        self._expiry = {}
+
+    def _index(self, record: ThreatLevelRecord) -> None:
+        """Index a new record, or replace a record in place, keeping its position."""
+        key = ThreatLevelRecordIdentifiers(record.identifier, record.host)
+        if (previous := self._records.get(key)) is not None:
+            self._aggregates[None].remove(previous.level)
+            self._aggregates[record.identifier].remove(previous.level)
+        self._records[key] = record
+        self._by_identifier.setdefault(record.identifier, {})[key] = record
+        self._by_host.setdefault(record.host, {})[key] = record
+        self._aggregates[None].add(record.level)
+        self._aggregates.setdefault(record.identifier, _LevelAggregate()).add(
+            record.level
+        )
 
-    async def set(self, identifier: str, host: str, level: float) -> None:
+    def _unindex(self, record: ThreatLevelRecord) -> None:
+        key = ThreatLevelRecordIdentifiers(record.identifier, record.host)
+        del self._records[key]
+        for index, name in (
+            (self._by_identifier, record.identifier),
+            (self._by_host, record.host),
+        ):
+            del index[name][key]
+            if not index[name]:
+                del index[name]
+        self._aggregates[None].remove(record.level)
+        self._aggregates[record.identifier].remove(record.level)
+        if not self._aggregates[record.identifier].levels:
+            del self._aggregates[record.identifier]
+
+    async def set(
+        self,
+        identifier: str,
+        host: str,
+        level: float,
+        stale_after_seconds: float | None = None,
+    ) -> None:
         """Set the current threat level of another application, given identifier, host, and level.
 
         Args:
             identifier (str): Application identifier
             host (str): Hostname
             level (float): Value to set the threatlevel to.
+            stale_after_seconds (float | None, optional): Seconds after which the record is removed unless set again. Defaults to never.
         """
-        self._current_levels[
-            ThreatLevelRecordIdentifiers(identifier, host)
-        ] = ThreatLevelRecordValues(level, datetime.datetime.now())
+        key = ThreatLevelRecordIdentifiers(identifier, host)
+        self._updated[key] = time.monotonic()
+        if stale_after_seconds is None:
+            self._stale_after.pop(key, None)
+            if (timer := self._expiry.pop(key, None)) is not None:
+                self._timers.cancel(timer)
+        else:
+            self._stale_after[key] = stale_after_seconds
+            if key not in self._expiry:
+                self._expiry[key] = self._timers.schedule(
+                    stale_after_seconds,
+                    self._expire,
+                    name="threat_level_stale",
+                    data=key,
+                )
+
+        self._index(ThreatLevelRecord(identifier, host, level, datetime.datetime.now()))
+        if (history := self._histories.get(key)) is None:
+            history = self._histories[key] = LevelHistory(self._history_capacity)
+        history.record(level)
+        self.changed()
         await self.notify_changed(identifier=identifier, host=host, current=level)
 
     def get(
@@ -137,16 +469,93 @@ class OtherThreatLevelsManager:
         Returns:
             list[ThreatLevelRecord]: List of threat level records.
         """
+        records: Iterable[ThreatLevelRecord]
+        if identifier_match is not None and host_match is not None:
+            key = ThreatLevelRecordIdentifiers(identifier_match, host_match)
+            records = [self._records[key]] if key in self._records else []
+        elif identifier_match is not None:
+            records = self._by_identifier.get(identifier_match, {}).values()
+        elif host_match is not None:
+            records = self._by_host.get(host_match, {}).values()
+        else:
+            records = self._records.values()
+
         return [
-            ThreatLevelRecord(identifier, host, value, last_update)
-            for (identifier, host), (value, last_update) in self._current_levels.items()
-            if (identifier_match is None or identifier == identifier_match)
-            and (host_match is None or host == host_match)
-            and (value_gte is None or value >= value_gte)
-            and (value_lte is None or value <= value_lte)
-            and (after is None or last_update > after)
+            record
+            for record in records
+            if (identifier_match is None or record.identifier == identifier_match)
+            and (host_match is None or record.host == host_match)
+            and (value_gte is None or record.level >= value_gte)
+            and (value_lte is None or record.level <= value_lte)
+            and (after is None or record.last_update > after)
         ]
 
+    async def remove(self, identifier: str, host: str) -> bool:
+        """Remove the threat level record of another application, given identifier and host.
+
+        Args:
+            identifier (str): Application identifier
+            host (str): Hostname
+
+        Returns:
+            bool: Whether there was a record.
+        """
+        key = ThreatLevelRecordIdentifiers(identifier, host)
+        if (record := self._records.get(key)) is None:
+            return False
+        self._unindex(record)
+        del self._histories[key]
+        self._updated.pop(key, None)
+        self._stale_after.pop(key, None)
+        if (timer := self._expiry.pop(key, None)) is not None:
+            self._timers.cancel(timer)
+        self.changed()
+        await self._event_bus.dispatch_async(
+            ThreatLevelRemovedEvent(identifier=identifier, host=host)
+        )
+        return True
+
+    async def _expire(self, timer: Timer) -> None:
+        """Remove a record if it went stale, or check it again when it will be."""
+        key: ThreatLevelRecordIdentifiers = timer.data
+        del self._expiry[key]
+        deadline = self._updated[key] + self._stale_after[key]
+        if deadline > time.monotonic():
+            self._expiry[key] = self._timers.schedule_at(
+                deadline, self._expire, name="threat_level_stale", data=key
+            )
+            return
+        log.debug("Removing stale threat level of %s at %s", *key)
+        await self.remove(*key)
+
+    def aggregate(self, identifier: str | None = None) -> ThreatLevelAggregate:
+        """Aggregate the current threat levels of other applications.
+
+        Args:
+            identifier (str | None, optional): Identifier of the applications. Defaults to all applications.
+
+        Returns:
+            ThreatLevelAggregate: Count, minimum, maximum and mean level; all but the count None without records.
+        """
+        aggregate = self._aggregates.get(identifier)
+        if aggregate is None:
+            return ThreatLevelAggregate(0, None, None, None)
+        return aggregate.aggregate()
+
+    def history(self, identifier: str, host: str) -> LevelHistory:
+        """The history of the threat level of another application.
+
+        Args:
+            identifier (str): Application identifier
+            host (str): Hostname
+
+        Returns:
+            LevelHistory: The history, empty when no level was set for the application.
+        """
+        return self._histories.get(
+            ThreatLevelRecordIdentifiers(identifier, host), LevelHistory(1)
+        )
+
     async def notify_changed(self, identifier: str, host: str, current: float) -> None:
         """Put a ThreatLevelChangedEvent on the event bus.
 
@@ -1,33 +1,73 @@
-from datetime import datetime, timedelta
+import builtins
+import time
+from collections.abc import Iterable
+from datetime import timedelta
 
 from lymphocyte.events.bus import EventBus
-from lymphocyte.events.ttl import TTLChangedEvent, TTLRestartedEvent
+from lymphocyte.events.ttl import (
+    TTLChangedEvent,
+    TTLRestartedEvent,
+    TTLThresholdReachedEvent,
+)
+from lymphocyte.managers.versioned import VersionedState, tracked
+from lymphocyte.services.timers import Timer, TimerService
 
 
-class TTLManager:
-    """Manager storing and setting the Time To Live of the application.
+class TTLManager(VersionedState):
+    """Manager storing and setting the Time To Live of the application. The fraction of the TTL
+    that has passed changes with time, so the manager is volatile.
+
+    The TTL runs on the time.monotonic() clock. When one of the threshold fractions of the TTL has
+    passed, a TTLThresholdReachedEvent is dispatched from a timer, which is rescheduled whenever
+    the TTL changes or restarts. Each threshold is reached once per restart, unless a longer TTL
+    takes the fraction passed below it again.
 
     Returns:
         float: Fraction passed of total TTL
     """
 
+    volatile = True
+
     event_bus: EventBus
 
-    start_time: datetime
+    start_time: float
     base_ttl: timedelta
     current_ttl: timedelta
-
-    def __init__(self, event_bus: EventBus, base_ttl: timedelta) -> None:
+    thresholds: tuple[float, ...]
+
+    _timers: TimerService
+    _threshold_timers: list[Timer]
+    _reached: builtins.set[float]
+
+    def __init__(
+        self,
+        event_bus: EventBus,
+        base_ttl: timedelta,
+        thresholds: Iterable[float] = (),
+        timers: TimerService | None = None,
+    ) -> None:
         """Construct a TTLManager object.
 
         Args:
             event_bus (EventBus): The event bus.
             base_ttl (timedelta): The default TTL.
+            thresholds (Iterable[float], optional): Fractions of the TTL to dispatch a TTLThresholdReachedEvent at. Defaults to ().
+            timers (TimerService | None, optional): Timers to wait for the thresholds with. Defaults to a TimerService of its own.
         """
         self.event_bus = event_bus
         self.base_ttl = base_ttl
         self.current_ttl = base_ttl
-        self.start_time = datetime.now()
+        self.thresholds = tuple(sorted(set(thresholds)))
+        self.start_time = time.monotonic()
+        self._timers = timers if timers is not None else TimerService()
+        self._threshold_timers = []
+        self._reached = set()
+        self._schedule_thresholds()
+
+    @property
+    def deadline(self) -> float:
+        """time.monotonic() at which the TTL has passed."""
+        return self.start_time + self.current_ttl.total_seconds()
 
     async def reset(self) -> None:
         """Reset the TTL of the application to its default, then restart() the TTL."""
@@ -36,16 +76,67 @@ class TTLManager:
 
     async def restart(self) -> None:
         """Restart the TTL of the application. This changes the start time, but does not change the TTL."""
-        self.start_time = datetime.now()
+        self.start_time = time.monotonic()
+        self._reached.clear()
+        self._schedule_thresholds()
+        self.changed()
         await self.event_bus.dispatch_async(TTLRestartedEvent())
 
+    def _fraction_passed(self) -> float:
+        return (time.monotonic() - self.start_time) / self.current_ttl.total_seconds()
+
     def fraction_passed(self) -> float:
         """Expresses the time passed in a fraction.
 
         Returns:
             float: Fraction of total TTL that has passed.
         """
-        return (datetime.now() - self.start_time) / self.current_ttl
+        return tracked(self._fraction_passed(), self.seconds_until_fraction_passed)
+
+    def seconds_until_fraction_passed(self, fraction: float) -> float | None:
+        """Seconds until the given fraction of the TTL has passed.
+
+        Args:
+            fraction (float): Fraction of the TTL.
+
+        Returns:
+            float | None: Seconds from now, None when the fraction has already passed.
+        """
+        seconds = (
+            self.start_time
+            + self.current_ttl.total_seconds() * fraction
+            - time.monotonic()
+        )
+        return seconds if seconds >= 0 else None
+
+    def _schedule_thresholds(self) -> None:
+        """Schedule a timer for each threshold not reached yet, which fires at once for the
+        thresholds a change of the TTL has passed."""
+        for timer in self._threshold_timers:
+            self._timers.cancel(timer)
+        fraction_passed = self._fraction_passed()
+        self._reached = {
+            fraction for fraction in self._reached if fraction <= fraction_passed
+        }
+        self._threshold_timers = [
+            self._timers.schedule_at(
+                self.start_time + self.current_ttl.total_seconds() * fraction,
+                self._threshold_reached,
+                name="ttl_threshold",
+                data=fraction,
+            )
+            for fraction in self.thresholds
+            if fraction not in self._reached
+        ]
+
+    async def _threshold_reached(self, timer: Timer) -> None:
+        self._reached.add(timer.data)
+        await self.event_bus.dispatch_async(TTLThresholdReachedEvent(timer.data))
+
+    async def _changed(self) -> None:
+        self._schedule_thresholds()
+        self.changed()
+        await self.event_bus.dispatch_async(TTLChangedEvent())
 
     async def scale(self, fraction: float) -> None:
         """Scale the time to live by a float.
@@ -56,7 +147,7 @@ class TTLManager:
         if self.current_ttl * fraction <= timedelta():
             return
         self.current_ttl *= fraction
-        await self.event_bus.dispatch_async(TTLChangedEvent())
+        await self._changed()
 
     async def decrement(self, by: timedelta) -> None:
         """Decrease the TTL by an absolute value
@@ -67,7 +158,7 @@ class TTLManager:
         if self.current_ttl - by <= timedelta():
             return
         self.current_ttl -= by
-        await self.event_bus.dispatch_async(TTLChangedEvent())
+        await self._changed()
 
     async def set(self, goal: timedelta) -> None:
         """Set the TTL to a given value.
@@ -78,4 +169,4 @@ class TTLManager:
         if goal <= timedelta():
             return
         self.current_ttl = goal
-        await self.event_bus.dispatch_async(TTLChangedEvent())
+        await self._changed()
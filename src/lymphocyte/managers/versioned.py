@@ -0,0 +1,152 @@
+import contextvars
+import math
+from collections.abc import Callable
+from typing import Any, ClassVar
+
+
+class VersionedState:
+    """Base class for managers keeping a state version, which increases with every change of
+    their state. Readers of a manager can remember the version they read to find out whether
+    the state changed since.
+
+    Volatile managers have state that also changes with the passing of time, without a change
+    of version. They return such time-dependent values through `tracked`, so readers can find
+    out until when the outcome of what they read stays the same.
+    """
+
+    volatile: ClassVar[bool] = False
+
+    version: int = 0
+
+    def changed(self) -> None:
+        """Increase the state version, to be called on every change of state."""
+        self.version += 1
+
+
+SecondsUntil = Callable[[float], float | None]
+"""Seconds until a time-dependent value reaches the given value, None when it never will."""
+
+
+class VolatileReading:
+    """Records how a time-dependent value read from a volatile manager was used: the values it was
+    compared with, or that it was used in any other way, which makes its outcome unpredictable.
+    """
+
+    seconds_until: SecondsUntil
+    thresholds: list[float]
+    opaque: bool
+
+    def __init__(self, seconds_until: SecondsUntil) -> None:
+        self.seconds_until = seconds_until
+        self.thresholds = []
+        self.opaque = False
+
+    def seconds_valid(self) -> float:
+        """Seconds the outcome of the reading stays the same.
+
+        Returns:
+            float: Seconds until the value reaches the nearest value it was compared with, 0 for
+            opaque readings and infinity when the outcome never changes.
+        """
+        if self.opaque:
+            return 0.0
+        seconds = (self.seconds_until(threshold) for threshold in self.thresholds)
+        return min((max(s, 0.0) for s in seconds if s is not None), default=math.inf)
+
+
+volatile_readings: contextvars.ContextVar[
+    list[VolatileReading] | None
+] = contextvars.ContextVar("volatile_readings", default=None)
+"""Set while evaluating an expression whose outcome is memoised, see tracked."""
+
+
+def _comparison(name: str) -> Callable[["TrackedValue", Any], Any]:
+    compare = getattr(float, name)
+
+    def method(self: "TrackedValue", other: Any) -> Any:
+        if isinstance(other, (int, float)) and not isinstance(other, bool):
+            self.reading.thresholds.append(float(other))
+        else:
+            self.reading.opaque = True
+        return compare(self, other)
+
+    return method
+
+
+def _opaque(name: str) -> Callable[..., Any]:
+    operation = getattr(float, name)
+
+    def method(self: "TrackedValue", *args: Any) -> Any:
+        self.reading.opaque = True
+        return operation(self, *args)
+
+    return method
+
+
+class TrackedValue(float):
+    """A time-dependent float that records what it is compared with. Any other use marks its
+    reading as opaque, and returns a plain float."""
+
+    reading: VolatileReading
+
+    def __new__(cls, value: float, reading: VolatileReading) -> "TrackedValue":
+        tracked_value = super().__new__(cls, value)
+        tracked_value.reading = reading
+        return tracked_value
+
+    __lt__ = _comparison("__lt__")
+    __le__ = _comparison("__le__")
+    __gt__ = _comparison("__gt__")
+    __ge__ = _comparison("__ge__")
+    __eq__ = _comparison("__eq__")
+    __ne__ = _comparison("__ne__")
+
+    __hash__ = _opaque("__hash__")
+    __bool__ = _opaque("__bool__")
+    __repr__ = _opaque("__repr__")
+    __str__ = _opaque("__str__")
+    __format__ = _opaque("__format__")
+    __float__ = _opaque("__float__")
+    __int__ = _opaque("__int__")
+    __trunc__ = _opaque("__trunc__")
+    __floor__ = _opaque("__floor__")
+    __ceil__ = _opaque("__ceil__")
+    __round__ = _opaque("__round__")
+    __abs__ = _opaque("__abs__")
+    __neg__ = _opaque("__neg__")
+    __pos__ = _opaque("__pos__")
+    __add__ = _opaque("__add__")
+    __radd__ = _opaque("__radd__")
+    __sub__ = _opaque("__sub__")
+    __rsub__ = _opaque("__rsub__")
+    __mul__ = _opaque("__mul__")
+    __rmul__ = _opaque("__rmul__")
+    __truediv__ = _opaque("__truediv__")
+    __rtruediv__ = _opaque("__rtruediv__")
+    __floordiv__ = _opaque("__floordiv__")
+    __rfloordiv__ = _opaque("__rfloordiv__")
+    __mod__ = _opaque("__mod__")
+    __rmod__ = _opaque("__rmod__")
+    __divmod__ = _opaque("__divmod__")
+    __rdivmod__ = _opaque("__rdivmod__")
+    __pow__ = _opaque("__pow__")
+    __rpow__ = _opaque("__rpow__")
+
+
+def tracked(value: float, seconds_until: SecondsUntil) -> float:
+    """Return a time-dependent value read from a volatile manager, tracking its use while an
+    expression whose outcome is memoised is evaluated.
+
+    Args:
+        value (float): The current value.
+        seconds_until (SecondsUntil): Seconds until the value reaches a given value.
+
+    Returns:
+        float: The value, or a TrackedValue while tracking.
+    """
+    readings = volatile_readings.get()
+    if readings is None:
+        return value
+    reading = VolatileReading(seconds_until)
+    readings.append(reading)
+    return TrackedValue(value, reading)
@@ -0,0 +1,250 @@
+"""
+Replays an event journal through a fresh Container, to reproduce an incident or to see how a
+changed configuration behaves under recorded traffic. Events are fed at the recorded pace (scaled
+by --speed) or as fast as possible with --speed 0, and the throughput and end-to-end latency of
+the replayed events are reported. The latency of an event runs from the moment it was due to be
+dispatched until the event consumer finished handling it.
+
+Only events received from the outside world are fed; events that were derived from other events
+when the journal was recorded are derived anew by the replayed configuration. Actions perform
+for real, unless --no-actions is given.
+
+Run with `python -m lymphocyte.replay <journal directory> [--config settings.yaml]` from the
+`src` directory.
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from dependency_injector import providers
+from prometheus_client import CollectorRegistry
+
+from lymphocyte.actions.action import Action
+from lymphocyte.actions.scheduler import ActionMetrics
+from lymphocyte.background_tasks import EventConsumerTask
+from lymphocyte.container import Container
+from lymphocyte.events.bus import Event
+from lymphocyte.events.journal import JournalRecord, read_journal
+from lymphocyte.events.metrics import EventMetrics
+from lymphocyte.main_utils import create_settings
+from lymphocyte.services.executors import ExecutorMetrics
+from lymphocyte.services.http_client import HTTPClientMetrics
+from lymphocyte.settings import EventBusSettings, Settings
+
+log = logging.getLogger(__name__)
+
+
+class ReplayMetrics(EventMetrics):
+    """EventMetrics that also measure the end-to-end latency of the replayed events."""
+
+    latencies: list[float]
+    consumed_events: int
+
+    _due: dict[int, tuple[Event, float]]
+
+    def __init__(self) -> None:
+        super().__init__(CollectorRegistry())
+        self.latencies = []
+        self.consumed_events = 0
+        self._due = {}
+
+    def event_due(self, event: Event, due: float) -> None:
+        self._due[id(event)] = (event, due)
+
+    def event_consumed(self, event: Event, new_events: int) -> None:
+        super().event_consumed(event, new_events)
+        self.consumed_events += 1
+        entry = self._due.pop(id(event), None)
+        if entry is not None and entry[0] is event:
+            self.latencies.append(time.perf_counter() - entry[1])
+
+    @property
+    def lost_events(self) -> int:
+        """Replayed events that were dropped or coalesced instead of handled."""
+        return len(self._due)
+
+
+@dataclass
+class ReplayReport:
+    replayed_events: int
+    skipped_derived_events: int
+    consumed_events: int
+    lost_events: int
+    seconds: float
+    latencies: list[float] = field(repr=False)
+
+    @property
+    def throughput(self) -> float:
+        return self.replayed_events / self.seconds if self.seconds else 0.0
+
+    def latency(self, quantile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+
+    def summary(self) -> str:
+        lines = [
+            f"{'replayed events':<24} {self.replayed_events:>12,}",
+            f"{'skipped derived events':<24} {self.skipped_derived_events:>12,}",
+            f"{'handled events':<24} {self.consumed_events:>12,}",
+            f"{'dropped or coalesced':<24} {self.lost_events:>12,}",
+            f"{'duration':<24} {self.seconds:>12.3f} s",
+            f"{'throughput':<24} {self.throughput:>12,.0f} events/s",
+        ]
+        if self.latencies:
+            lines.append(
+                f"{'latency mean':<24} {statistics.fmean(self.latencies) * 1000:>12.3f} ms"
+            )
+            for quantile in (0.5, 0.95, 0.99, 1.0):
+                label = (
+                    "latency max" if quantile == 1 else f"latency p{quantile * 100:g}"
+                )
+                lines.append(f"{label:<24} {self.latency(quantile) * 1000:>12.3f} ms")
+        return "\n".join(lines)
+
+
+def create_replay_container(settings: Settings) -> Container:
+    """Create a container for the given settings, which does not journal the replayed events
+    again and keeps its event bus metrics apart from the default registry.
+
+    Args:
+        settings (Settings): The settings to replay the journal against.
+
+    Returns:
+        Container: The container.
+    """
+    settings = settings.model_copy(deep=True)
+    settings.event_bus.journal.enabled = False
+
+    container = Container()
+    container.config.from_dict(settings.model_dump())
+    container.event_metrics.override(providers.Object(ReplayMetrics()))
+    container.action_metrics.override(
+        providers.Object(ActionMetrics(CollectorRegistry()))
+    )
+    container.executor_metrics.override(
+        providers.Object(ExecutorMetrics(CollectorRegistry()))
+    )
+    container.http_client_metrics.override(
+        providers.Object(HTTPClientMetrics(CollectorRegistry()))
+    )
+    return container
+
+
+async def replay(
+    container: Container,
+    records: Iterable[JournalRecord],
+    speed: float = 1.0,
+    actions: bool = True,
+) -> ReplayReport:
+    """Feed journaled events through the EventHandlerService of a container.
+
+    Args:
+        container (Container): Container created with create_replay_container.
+        records (Iterable[JournalRecord]): The journaled events, oldest first.
+        speed (float, optional): Pace relative to the recording, 0 replays as fast as possible. Defaults to 1.0.
+        actions (bool, optional): Whether the configured actions handle events. Defaults to True.
+
+    Returns:
+        ReplayReport: Throughput and latency of the replay.
+    """
+    metrics = container.event_metrics()
+    if not isinstance(metrics, ReplayMetrics):
+        raise TypeError(
+            f"Replaying needs ReplayMetrics as event metrics, not {type(metrics).__name__}"
+        )
+    settings = EventBusSettings.model_validate(container.config()["event_bus"])
+    queue = container.queue()
+    event_bus = container.event_bus()
+    event_handler_service = container.event_handler_service()
+    if not actions:
+        for handler in list(event_handler_service.handlers):
+            if isinstance(handler, Action):
+                event_handler_service.unregister(handler)
+
+    consumer = asyncio.create_task(
+        EventConsumerTask(
+            from_queue=queue,
+            event_handler_service=event_handler_service,
+            to_queue=event_bus,
+            batch_size=settings.batch_size,
+            batch_linger_seconds=settings.batch_linger_seconds,
+            metrics=metrics,
+            context=container.context(),
+        ).perform()
+    )
+
+    replayed = skipped = 0
+    first_timestamp_ns: int | None = None
+    start = time.perf_counter()
+    try:
+        for record in records:
+            if record.derived:
+                skipped += 1
+                continue
+            if first_timestamp_ns is None:
+                first_timestamp_ns = record.timestamp_ns
+
+            due = time.perf_counter()
+            if speed > 0:
+                due = start + (record.timestamp_ns - first_timestamp_ns) / 1e9 / speed
+                if (delay := due - time.perf_counter()) > 0:
+                    await asyncio.sleep(delay)
+
+            metrics.event_due(record.event, due)
+            await event_bus.dispatch_async(record.event)
+            replayed += 1
+
+        await queue.join()
+        seconds = time.perf_counter() - start
+    finally:
+        consumer.cancel()
+        await asyncio.gather(consumer, return_exceptions=True)
+
+    return ReplayReport(
+        replayed_events=replayed,
+        skipped_derived_events=skipped,
+        consumed_events=metrics.consumed_events,
+        lost_events=metrics.lost_events,
+        seconds=seconds,
+        latencies=metrics.latencies,
+    )
+
+
+async def main(journal: str, config: str | None, speed: float, actions: bool) -> None:
+    container = create_replay_container(create_settings(config))
+    try:
+        report = await replay(container, read_journal(journal), speed, actions)
+    finally:
+        await container.action_scheduler().aclose()
+        await container.http_client().aclose()
+        await container.executors().aclose()
+        await container.timers().aclose()
+    print(report.summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("journal", help="directory of the event journal")
+    parser.add_argument("--config", help="settings file to replay against")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="pace relative to the recording, 0 replays as fast as possible",
+    )
+    parser.add_argument(
+        "--no-actions",
+        dest="actions",
+        action="store_false",
+        help="do not let actions handle the replayed events",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args.journal, args.config, args.speed, args.actions))
@@ -6,6 +6,8 @@ from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, ConfigDict
 
+from lymphocyte.events.bus import EventBus
+from lymphocyte.events.prometheus import PrometheusAlertStatusChangedEvent
 from lymphocyte.managers.prometheus import PrometheusManager
 
 log = logging.getLogger(__name__)
@@ -44,15 +46,18 @@ class AlertmanagerWebhook(BaseModel):
 async def alertmanager_webhook(
     payload: AlertmanagerWebhook,
     prometheus_manager: PrometheusManager = Depends(Provide["prometheus_manager"]),
+    event_bus: EventBus = Depends(Provide["event_bus"]),
 ) -> Literal[True]:
     """This manager parses the alert and passes the alert status to the Prometheus manager.
 
     Args:
         payload (AlertmanagerWebhook): Object containing alerts
         prometheus_manager (PrometheusManager, optional): Prometheus manager. Defaults to Depends(Provide["prometheus_manager"]).
+        event_bus (EventBus, optional): Event bus. Defaults to Depends(Provide["event_bus"]).
 
     Raises:
         HTTPException: HTTP 400 Bad Request when an alert name is missing
+        HTTPException: HTTP 503 Service Unavailable when the alert event lane has no room for an event per alert, so Alertmanager retries later
 
     Returns:
         Literal[True]: Returns True after dealing with all alerts.
@@ -60,6 +65,14 @@ async def alertmanager_webhook(
     # import pprint
     # log.debug("Prometheus:\n%s", pprint.pformat(payload))
 
+    if event_bus.lane_full(
+        PrometheusAlertStatusChangedEvent, count=len(payload.alerts)
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="event lane full",
+        )
+
     for alert in payload.alerts:
         alert_labels = alert.labels | payload.commonLabels
 
@@ -3,9 +3,9 @@ A set of routes for demonstration/debugging purposes, giving insight into the in
 """
 
 import logging
+from collections.abc import Mapping
 from typing import Any, Literal
 
-import jinja2.sandbox
 from dependency_injector.wiring import Provide, inject
 from fastapi import APIRouter, Depends, WebSocket
 from fastapi.encoders import jsonable_encoder
@@ -15,6 +15,7 @@ from lymphocyte.actions.action_trigger_event import ActionTriggerEvent
 from lymphocyte.events.bus import Event, EventBus, EventHandlerService
 from lymphocyte.events.handlers.generic import GenericEventHandler
 from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.expressions.cache import ExpressionCache
 from lymphocyte.settings import Settings
 
 log = logging.getLogger(__name__)
@@ -26,19 +27,20 @@ router = APIRouter()
 @inject
 def evaluate_expression(
     expression: str,
-    context: dict[str, Any] = Depends(Provide["context"]),
+    context: Mapping[str, Any] = Depends(Provide["context"]),
+    expressions: ExpressionCache = Depends(Provide["expressions"]),
 ) -> JSONResponse:
     """Evaluates arbitrary jinja templates for debugging purposes.
 
     Args:
         expression (str): Expression to be evaluated
-        context (dict[str, Any], optional): Context variables in which the expression is evaluated. Defaults to Depends(Provide["context"]).
+        context (Mapping[str, Any], optional): Context variables in which the expression is evaluated. Defaults to Depends(Provide["context"]).
+        expressions (ExpressionCache, optional): Cache of compiled expressions. Defaults to Depends(Provide["expressions"]).
 
     Returns:
         JSONResponse: Evaluated response in JSON format
     """
-    env = jinja2.sandbox.ImmutableSandboxedEnvironment(extensions=["jinja2.ext.debug"])
-    result = env.compile_expression(expression)(context)
+    result = expressions.evaluate(expression, context)
     return JSONResponse(content=jsonable_encoder(result))
 
 
@@ -40,13 +40,19 @@ async def websocket_threat_level_provider(
     event_handler_service: EventHandlerService = Depends(
         Provide["event_handler_service"]
     ),
+    push_interval_seconds: float = Depends(
+        Provide["config.threat_level.push_interval_seconds"]
+    ),
 ) -> None:
-    """Websocket endpoint which outputs its own threat level when it changes.
+    """Websocket endpoint which outputs its own threat level when it changes. A decaying threat
+    level changes without events, so the current level is also sent every push interval while it
+    differs from the level sent last.
 
     Args:
         websocket (WebSocket): __
         threat_level_manager (ThreatLevelManager, optional): __. Defaults to Depends(Provide["threat_level_manager"]).
         event_handler_service (EventHandlerService, optional): __. Defaults to Depends( Provide["event_handler_service"] ).
+        push_interval_seconds (float, optional): __. Defaults to Depends( Provide["config.threat_level.push_interval_seconds"] ).
     """
     await websocket.accept()
 
@@ -58,10 +64,20 @@ async def websocket_threat_level_provider(
 
     event_handler_service.register(handler)
     try:
-        await websocket.send_json({"threat_level": threat_level_manager.current})
-
-        async for event in handler:
-            await websocket.send_json({"threat_level": event.current})
+        sent = threat_level_manager.current
+        await websocket.send_json({"threat_level": sent})
+
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    handler.queue.get(), push_interval_seconds
+                )
+                level = event.current
+            except asyncio.TimeoutError:
+                if (level := threat_level_manager.current) == sent:
+                    continue
+            await websocket.send_json({"threat_level": level})
+            sent = level
     except WebSocketDisconnect:
         log.debug("Websocket disconnected")
     except asyncio.exceptions.CancelledError:
@@ -1,9 +1,10 @@
 from typing import Literal
 
 from dependency_injector.wiring import Provide, inject
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 
 from lymphocyte.events.bus import EventBus
+from lymphocyte.events.queue import EventQueueFull
 from lymphocyte.events.webhook import WebhookEvent
 
 # from lymphocyte.managers.webhook_manager import WebhookTriggers
@@ -19,8 +20,16 @@ async def webhook(
 ) -> Literal["ok"]:
     """Dispatches a manual webhook event onto the eventbus
 
+    Raises:
+        HTTPException: HTTP 429 Too Many Requests when the webhook's event lane is full
+
     Returns:
         str: returns "ok" after dispatching.
     """
-    await event_bus.dispatch_async(WebhookEvent(name))
+    try:
+        await event_bus.dispatch_async(WebhookEvent(name), block=False)
+    except EventQueueFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="event lane full"
+        ) from e
     return "ok"
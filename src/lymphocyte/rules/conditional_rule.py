@@ -1,24 +1,34 @@
 import logging
-from collections.abc import Iterable
+from collections.abc import Iterable, Mapping
 from dataclasses import dataclass, field
-from typing import Any
-
-import jinja2
-import jinja2.sandbox
+from typing import Any, Literal
 
 from lymphocyte.actions.action_trigger_event import ActionTriggerEvent
-from lymphocyte.events.bus import Event, EventHandler
+from lymphocyte.events.bus import Event, Subscription, SyncEventHandler
 from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.expressions.cache import ExpressionCache
+from lymphocyte.expressions.condition import Condition
 
 log = logging.getLogger(__name__)
 
 
 @dataclass
-class ConditionalRule(EventHandler):
-    """Class for conditional rules.
+class ConditionalRule(SyncEventHandler):
+    """Class for conditional rules. The condition is compiled once, when the rule is constructed,
+    and memoised on the state versions of the managers it reads, see Condition.
+
+    In the default "level" mode the rule fires every time it is triggered while its condition
+    holds. In "edge" mode it only fires when triggered while the condition holds, after it did not
+    hold the previous time; it fires once per flip of the condition from false to true.
+
+    Either mode only evaluates the condition when one of the triggers of the rule fires. A
+    condition that starts to hold as time passes, like a TTL running out or a decaying threat
+    level, or through a change that dispatches no trigger, is only seen by a rule that is also
+    triggered by a tick trigger. Memoisation keeps such polling cheap while the managers do not
+    change, and edge mode keeps it from firing on every tick.
 
     Args:
-        EventHandler (EventHandler): Bass class EventHandler.
+        SyncEventHandler (SyncEventHandler): Base synchronous EventHandler class.
 
     Returns:
         ActionTriggerEvent: When a conditional rule holds
@@ -28,27 +38,44 @@ class ConditionalRule(EventHandler):
     triggers: list[str]
     actions: list[str]
     condition: str | None = field(default=None)
+    mode: Literal["level", "edge"] = field(default="level")
+
+    context: Mapping[str, Any] = field(default_factory=dict)
+    expressions: ExpressionCache = field(default_factory=ExpressionCache)
 
-    context: dict[str, Any] = field(default_factory=dict)
-    environment: jinja2.Environment = field(
-        default_factory=jinja2.sandbox.ImmutableSandboxedEnvironment
-    )
+    _condition: Condition | None = field(init=False, repr=False, default=None)
+    _held: bool = field(init=False, repr=False, default=False)
 
-    async def check_condition(self) -> bool:
-        if not self.condition:
+    def __post_init__(self) -> None:
+        if self.mode not in ("level", "edge"):
+            raise ValueError(f"Unknown rule mode {self.mode!r}")
+        if self.condition:
+            self._condition = Condition(self.condition, self.context, self.expressions)
+
+    def subscriptions(self) -> Iterable[Subscription]:
+        return [(TriggerEvent, trigger) for trigger in self.triggers]
+
+    def check_condition(self) -> bool:
+        if self._condition is None:
             return True
-        return bool(self.environment.compile_expression(self.condition)(self.context))
+        return bool(self._condition())
 
-    async def handle(self, event: Event) -> Iterable[Event]:
+    def handle_sync(self, event: Event) -> Iterable[Event]:
         if not isinstance(event, TriggerEvent):
             return []
 
         if event.name not in self.triggers:
             return []
 
-        if not await self.check_condition():
+        holds, held = self.check_condition(), self._held
+        self._held = holds
+        if not holds:
             log.debug("Condition '%s' does not hold", self.condition)
             return []
 
+        if self.mode == "edge" and held:
+            log.debug("Condition '%s' still holds", self.condition)
+            return []
+
         log.debug("Condition '%s' holds", self.condition)
         return [ActionTriggerEvent(action_name) for action_name in self.actions]
@@ -0,0 +1,104 @@
+import datetime
+from dataclasses import dataclass
+
+# Range of each field: minute, hour, day of month, month, day of week (0 and 7 are Sunday)
+FIELDS = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+
+MAX_DAYS = 366 * 5
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset[int]:
+    values: set[int] = set()
+    for part in field.split(","):
+        part, _, step_text = part.partition("/")
+        step = int(step_text) if step_text else 1
+        if part == "*":
+            start, stop = low, high
+        elif "-" in part:
+            start_text, stop_text = part.split("-", 1)
+            start, stop = int(start_text), int(stop_text)
+        else:
+            start = stop = int(part)
+            if step_text:
+                stop = high
+        if step < 1 or start < low or stop > high or start > stop:
+            raise ValueError(f"Invalid cron field {field!r}")
+        values.update(range(start, stop + 1, step))
+    return frozenset(values)
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """A schedule in crontab syntax: five fields for the minute, hour, day of month, month and day
+    of week, each `*`, a value, a range `a-b` or a list of those, optionally with a `/step`.
+    As in cron, a day matches when either day field matches if both are restricted.
+    """
+
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]
+    any_day: bool
+    any_weekday: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronSchedule":
+        """Parse a schedule in crontab syntax.
+
+        Args:
+            expression (str): The schedule, e.g. "*/5 * * * *".
+
+        Raises:
+            ValueError: When the schedule is not valid.
+
+        Returns:
+            CronSchedule: The schedule.
+        """
+        fields = expression.split()
+        if len(fields) != len(FIELDS):
+            raise ValueError(f"Cron schedule {expression!r} does not have 5 fields")
+        minutes, hours, days, months, weekdays = (
+            _parse_field(field, low, high) for field, (low, high) in zip(fields, FIELDS)
+        )
+        return cls(
+            minutes,
+            hours,
+            days,
+            months,
+            frozenset(weekday % 7 for weekday in weekdays),
+            fields[2].startswith("*"),
+            fields[4].startswith("*"),
+        )
+
+    def _matches_day(self, moment: datetime.datetime) -> bool:
+        day = moment.day in self.days
+        weekday = moment.isoweekday() % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, moment: datetime.datetime) -> datetime.datetime:
+        """The first time on the schedule after a moment.
+
+        Args:
+            moment (datetime.datetime): The moment.
+
+        Raises:
+            ValueError: When the schedule never comes up, e.g. on February 30th.
+
+        Returns:
+            datetime.datetime: The time on the schedule, in the timezone of the moment.
+        """
+        moment = moment.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        last = moment + datetime.timedelta(days=MAX_DAYS)
+        while moment < last:
+            if moment.month not in self.months or not self._matches_day(moment):
+                moment = moment.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + datetime.timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += datetime.timedelta(minutes=1)
+            else:
+                return moment
+        raise ValueError("Cron schedule never comes up")
@@ -0,0 +1,119 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
+
+from prometheus_client import REGISTRY, CollectorRegistry, Histogram
+
+T = TypeVar("T")
+
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+class ExecutorMetrics:
+    """Prometheus metrics of the work offloaded from the event loop, and of the event loop lag."""
+
+    offloaded: Histogram
+    loop_lag: Histogram
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY) -> None:
+        """Constructs and registers the executor metrics.
+
+        Args:
+            registry (CollectorRegistry, optional): Registry to register the metrics with. Defaults to REGISTRY.
+        """
+        self.offloaded = Histogram(
+            "lymphocyte_offloaded_work_seconds",
+            "Time spent on blocking work offloaded from the event loop, including waiting for a worker",
+            ["name"],
+            buckets=LAG_BUCKETS,
+            registry=registry,
+        )
+        self.loop_lag = Histogram(
+            "lymphocyte_event_loop_lag_seconds",
+            "Time the event loop was late waking up a sleeping task, which is time it was blocked",
+            buckets=LAG_BUCKETS,
+            registry=registry,
+        )
+
+    def work_finished(self, name: str, seconds: float) -> None:
+        self.offloaded.labels(name).observe(seconds)
+
+    def loop_lagged(self, seconds: float) -> None:
+        self.loop_lag.observe(seconds)
+
+
+class Executors:
+    """A size-limited pool to offload blocking work from the event loop to.
+
+    Blocking I/O and short blocking calls run on a pool of `threads` worker threads, in a copy of
+    the context of the caller. The managers are not thread-safe, so the work must not read the
+    rule context; render it on the event loop and pass plain values instead.
+
+    The pool is created on first use, and created again after it is shut down.
+    """
+
+    threads: int
+    metrics: ExecutorMetrics | None
+
+    _thread_pool: concurrent.futures.ThreadPoolExecutor | None
+
+    def __init__(
+        self,
+        threads: int = 8,
+        metrics: ExecutorMetrics | None = None,
+    ) -> None:
+        """Constructs an Executors object.
+
+        Args:
+            threads (int, optional): Worker threads. Defaults to 8.
+            metrics (ExecutorMetrics | None, optional): Metrics to record the offloaded work in. Defaults to None.
+        """
+        self.threads = threads
+        self.metrics = metrics
+        self._thread_pool = None
+
+    @property
+    def thread_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._thread_pool is None:
+            self._thread_pool = concurrent.futures.ThreadPoolExecutor(
+                self.threads, thread_name_prefix="lymphocyte-worker"
+            )
+        return self._thread_pool
+
+    async def run(
+        self,
+        function: Callable[..., T],
+        *args: Any,
+        name: str | None = None,
+    ) -> T:
+        """Run blocking work on a worker thread.
+
+        Args:
+            function (Callable[..., T]): The work.
+            *args: Arguments of the work.
+            name (str | None, optional): Name to record the work by. Defaults to the name of the function.
+
+        Returns:
+            T: The result of the work.
+        """
+        call = functools.partial(contextvars.copy_context().run, function, *args)
+        start = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                self.thread_pool, call
+            )
+        finally:
+            if self.metrics is not None:
+                self.metrics.work_finished(
+                    name or function.__name__, time.perf_counter() - start
+                )
+
+    async def aclose(self) -> None:
+        """Shut the pool down, cancelling the work that did not start yet."""
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        self._thread_pool = None
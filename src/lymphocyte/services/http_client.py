@@ -0,0 +1,165 @@
+import asyncio
+import importlib.util
+import logging
+import time
+from typing import Any
+
+import httpx
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram
+
+from lymphocyte.settings import HTTPClientSettings
+
+log = logging.getLogger(__name__)
+
+
+class HTTPClientMetrics:
+    """Prometheus metrics of the requests sent through an HTTPClientPool, per action name."""
+
+    request_duration: Histogram
+    request_errors: Counter
+
+    def __init__(self, registry: CollectorRegistry = REGISTRY) -> None:
+        """Registers the metrics.
+
+        Args:
+            registry (CollectorRegistry, optional): Registry to register the metrics in. Defaults to REGISTRY.
+        """
+        self.request_duration = Histogram(
+            "lymphocyte_action_request_seconds",
+            "Time until the response of a request sent by an action",
+            ["action"],
+            registry=registry,
+        )
+        self.request_errors = Counter(
+            "lymphocyte_action_request_errors",
+            "Requests sent by an action that failed or got an error response",
+            ["action", "reason"],
+            registry=registry,
+        )
+
+    def request_finished(self, action: str, seconds: float) -> None:
+        self.request_duration.labels(action).observe(seconds)
+
+    def request_failed(self, action: str, reason: str) -> None:
+        self.request_errors.labels(action, reason).inc()
+
+
+def http2_available() -> bool:
+    """Whether HTTP/2 can be used, which needs the optional h2 package."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class HTTPClientPool:
+    """Connection-pooled HTTP client shared by the actions sending requests. Connections are kept
+    alive between requests, at most `max_connections_per_host` requests run at once per host, and
+    HTTP/2 is used when it is enabled and available.
+
+    The underlying client is created on first use, and created again after the pool is closed.
+    """
+
+    settings: HTTPClientSettings
+    metrics: HTTPClientMetrics | None
+    transport: httpx.AsyncBaseTransport | None
+
+    _client: httpx.AsyncClient | None
+    _hosts: dict[tuple[str, str, int | None], asyncio.Semaphore]
+
+    def __init__(
+        self,
+        settings: HTTPClientSettings | None = None,
+        metrics: HTTPClientMetrics | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        """Constructs an HTTPClientPool object.
+
+        Args:
+            settings (HTTPClientSettings | None, optional): Connection limits and timeouts. Defaults to HTTPClientSettings().
+            metrics (HTTPClientMetrics | None, optional): Metrics to record the requests in. Defaults to None.
+            transport (httpx.AsyncBaseTransport | None, optional): Transport to send the requests with instead of pooled connections. Defaults to None.
+        """
+        self.settings = settings or HTTPClientSettings()
+        self.metrics = metrics
+        self.transport = transport
+        self._client = None
+        self._hosts = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying client."""
+        if self._client is None or self._client.is_closed:
+            http2 = self.settings.http2 and http2_available()
+            if self.settings.http2 and not http2:
+                log.info("HTTP/2 is not available, install h2 to use it")
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.settings.max_connections,
+                    max_keepalive_connections=self.settings.max_keepalive_connections,
+                    keepalive_expiry=self.settings.keepalive_expiry_seconds,
+                ),
+                timeout=self.settings.timeout_seconds,
+                http2=http2,
+                transport=self.transport,
+            )
+        return self._client
+
+    def _host_limit(self, url: httpx.URL) -> asyncio.Semaphore:
+        host = (url.scheme, url.host, url.port)
+        if (limit := self._hosts.get(host)) is None:
+            limit = self._hosts[host] = asyncio.Semaphore(
+                self.settings.max_connections_per_host
+            )
+        return limit
+
+    async def request(
+        self,
+        action: str,
+        method: str,
+        url: str,
+        timeout_seconds: float | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Send a request on behalf of an action.
+
+        Args:
+            action (str): Name of the action sending the request, to record metrics by.
+            method (str): HTTP method.
+            url (str): URL to send the request to.
+            timeout_seconds (float | None, optional): Timeout of the request. Defaults to the timeout of the pool.
+            **kwargs: Other arguments of httpx.AsyncClient.request.
+
+        Raises:
+            httpx.HTTPError: When sending the request failed.
+
+        Returns:
+            httpx.Response: The response.
+        """
+        client = self.client
+        timeout: Any = (
+            httpx.USE_CLIENT_DEFAULT if timeout_seconds is None else timeout_seconds
+        )
+        async with self._host_limit(httpx.URL(url)):
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, timeout=timeout, **kwargs)
+            except httpx.HTTPError as e:
+                if self.metrics is not None:
+                    self.metrics.request_failed(action, type(e).__name__)
+                raise
+            if self.metrics is not None:
+                self.metrics.request_finished(action, time.perf_counter() - start)
+                if response.is_error:
+                    self.metrics.request_failed(action, str(response.status_code))
+        return response
+
+    async def aclose(self) -> None:
+        """Close the underlying client and its connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self._hosts.clear()
+
+    async def __aenter__(self) -> "HTTPClientPool":
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
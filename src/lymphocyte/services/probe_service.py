@@ -1,13 +1,16 @@
+from collections.abc import Mapping
 from typing import Any
 
-import jinja2
-import jinja2.sandbox
-
+from lymphocyte.expressions.cache import ExpressionCache
+from lymphocyte.expressions.condition import Condition
 from lymphocyte.managers.ttl import TTLManager
 
 
 class ProbeService:
-    """Probe base class to probe liveness, readiness, and startup."""
+    """Probe base class to probe liveness, readiness, and startup. The probe expressions are
+    compiled once, when the service is constructed, and their verdicts are cached until the
+    managers they read change, or until the verdict flips with the passing of time, see
+    Condition."""
 
     def __init__(
         self,
@@ -15,10 +18,8 @@ class ProbeService:
         startup_expression: str,
         readiness_expression: str,
         liveness_expression: str,
-        context: dict[str, Any],
-        environment: jinja2.Environment = jinja2.sandbox.ImmutableSandboxedEnvironment(
-            extensions=["jinja2.ext.debug"]
-        ),
+        context: Mapping[str, Any],
+        expressions: ExpressionCache | None = None,
     ) -> None:
         """Constructs a ProbeService object
 
@@ -27,15 +28,23 @@ class ProbeService:
             startup_expression (str): String expressing startup
             readiness_expression (str): String expressing readiness
             liveness_expression (str): String expressing liveness
-            context (dict[str, Any]): Context variables
-            environment (jinja2.Environment, optional): Environment. Defaults to jinja2.sandbox.ImmutableSandboxedEnvironment( extensions=["jinja2.ext.debug"] ).
+            context (Mapping[str, Any]): Context variables
+            expressions (ExpressionCache | None, optional): Cache of compiled expressions. Defaults to a new ExpressionCache.
         """
         self.ttl_manager = ttl_manager
         self.startup_expression = startup_expression
         self.readiness_expression = readiness_expression
         self.liveness_expression = liveness_expression
         self.context = context
-        self.environment = environment
+        self.expressions = expressions or ExpressionCache()
+        self.conditions = {
+            expression: Condition(expression, context, self.expressions)
+            for expression in (
+                startup_expression,
+                readiness_expression,
+                liveness_expression,
+            )
+        }
 
     def check_condition(self, condition: str) -> tuple[bool, str | None]:
         """Check if a condition hold in the environment given the context variables
@@ -46,7 +55,11 @@ class ProbeService:
         Returns:
             tuple[bool, str | None]: Returns bool regarding correctness, accompanied by either None when true, or the condition when false.
         """
-        if bool(self.environment.compile_expression(condition)(self.context)):
+        if (cached := self.conditions.get(condition)) is not None:
+            holds = bool(cached())
+        else:
+            holds = bool(self.expressions.evaluate(condition, self.context))
+        if holds:
             return True, None
 
         return False, condition + " does not hold"
@@ -0,0 +1,278 @@
+import logging
+import os
+import re
+import threading
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+import psutil
+
+log = logging.getLogger(__name__)
+
+ATTRS = ["pid", "uids", "exe", "cmdline", "create_time"]
+
+ProcessField = Literal["exe", "cmdline"]
+
+
+@dataclass(frozen=True)
+class ProcessInfo:
+    pid: int
+    uid: int | None
+    exe: str
+    cmdline: str
+    create_time: float
+
+    @classmethod
+    def from_dict(cls, info: dict[str, Any]) -> "ProcessInfo":
+        """Process information as read by psutil, None for attributes that were denied."""
+        uids = info.get("uids")
+        return cls(
+            pid=info["pid"],
+            uid=uids.real if uids is not None else None,
+            exe=info.get("exe") or "",
+            cmdline=" ".join(info.get("cmdline") or ()),
+            create_time=info.get("create_time") or 0.0,
+        )
+
+
+def scan_processes() -> Iterable[ProcessInfo]:
+    """All processes, read in a single pass."""
+    for process in psutil.process_iter(ATTRS, ad_value=None):
+        yield ProcessInfo.from_dict(process.info)
+
+
+def read_process(pid: int) -> ProcessInfo | None:
+    """A single process, None when it no longer exists."""
+    try:
+        return ProcessInfo.from_dict(psutil.Process(pid).as_dict(ATTRS, ad_value=None))
+    except (psutil.NoSuchProcess, psutil.ZombieProcess):
+        return None
+
+
+def read_stamp(pid: int) -> Hashable | None:
+    """A stamp of a single process which changes when it calls exec or setuid, and when its
+    process id is reused, None when it no longer exists.
+
+    Reads the name and uids from /proc/<pid>/status, in a single read, together with the inode of
+    that file, which procfs allocates anew for every process.
+    """
+    try:
+        fd = os.open(f"/proc/{pid}/status", os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        inode = os.fstat(fd).st_ino
+        status = os.read(fd, 4096)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+    name = status.partition(b"\n")[0]
+    uids_start = status.find(b"\nUid:")
+    return inode, name, status[uids_start + 1 : status.find(b"\n", uids_start + 1)]
+
+
+class ProcessIndex:
+    """Index of the running processes by uid, and by the patterns registered with `watch` that
+    their executable or command line match.
+
+    The index is built in a single pass over all processes, which reads all attributes of a
+    process at once. After that, `refresh` only lists the process ids and reads a stamp of the
+    processes still running, see read_stamp: it reads the processes that started, that called
+    exec or setuid, or whose process id was reused, and drops the processes that ended since.
+    Both read /proc and block, so run them in a worker thread. The index is guarded by a lock, so
+    it can be refreshed and queried from any thread.
+
+    A process that called exec keeping its name, like an interpreter running another script,
+    keeps its indexed command line until a full refresh, which reads all processes again in a
+    single pass. Callers that act on processes, like KillAction, should read the processes they
+    found again before acting on them.
+    """
+
+    _pids: Callable[[], Iterable[int]]
+    _scan: Callable[[], Iterable[ProcessInfo]]
+    _read: Callable[[int], ProcessInfo | None]
+    _stamp: Callable[[int], Hashable | None]
+
+    _lock: threading.Lock
+    _built: bool
+    _processes: dict[int, ProcessInfo]
+    _stamps: dict[int, Hashable]
+    _by_uid: dict[int, set[int]]
+    _patterns: dict[tuple[ProcessField, str], re.Pattern[str]]
+    _by_pattern: dict[tuple[ProcessField, str], set[int]]
+
+    def __init__(
+        self,
+        pids: Callable[[], Iterable[int]] = psutil.pids,
+        scan: Callable[[], Iterable[ProcessInfo]] = scan_processes,
+        read: Callable[[int], ProcessInfo | None] = read_process,
+        stamp: Callable[[int], Hashable | None] = read_stamp,
+    ) -> None:
+        """Constructs a ProcessIndex object.
+
+        Args:
+            pids (Callable[[], Iterable[int]], optional): Lists the ids of the running processes. Defaults to psutil.pids.
+            scan (Callable[[], Iterable[ProcessInfo]], optional): Reads all running processes. Defaults to scan_processes.
+            read (Callable[[int], ProcessInfo | None], optional): Reads a single process. Defaults to read_process.
+            stamp (Callable[[int], Hashable | None], optional): Reads the stamp of a single process. Defaults to read_stamp.
+        """
+        self._pids = pids
+        self._scan = scan
+        self._read = read
+        self._stamp = stamp
+        self._lock = threading.Lock()
+        self._built = False
+        self._processes = {}
+        self._stamps = {}
+        self._by_uid = {}
+        self._patterns = {}
+        self._by_pattern = {}
+
+    def __len__(self) -> int:
+        return len(self._processes)
+
+    def _add(self, info: ProcessInfo, stamp: Hashable) -> None:
+        self._processes[info.pid] = info
+        self._stamps[info.pid] = stamp
+        if info.uid is not None:
+            self._by_uid.setdefault(info.uid, set()).add(info.pid)
+        for key, pattern in self._patterns.items():
+            if pattern.search(getattr(info, key[0])):
+                self._by_pattern[key].add(info.pid)
+
+    def _remove(self, pid: int) -> None:
+        info = self._processes.pop(pid)
+        del self._stamps[pid]
+        if info.uid is not None and (pids := self._by_uid.get(info.uid)) is not None:
+            pids.discard(pid)
+            if not pids:
+                del self._by_uid[info.uid]
+        for pids in self._by_pattern.values():
+            pids.discard(pid)
+
+    def watch(self, field: ProcessField, pattern: str) -> None:
+        """Index the processes whose executable or command line match a regular expression.
+
+        Args:
+            field (ProcessField): The attribute to match, exe or cmdline.
+            pattern (str): The regular expression, searched for in the attribute.
+        """
+        key = (field, pattern)
+        with self._lock:
+            if key in self._patterns:
+                return
+            compiled = self._patterns[key] = re.compile(pattern)
+            self._by_pattern[key] = {
+                pid
+                for pid, info in self._processes.items()
+                if compiled.search(getattr(info, field))
+            }
+
+    def refresh(self, full: bool = False) -> None:
+        """Build the index, or update it with the processes started and ended since.
+
+        Args:
+            full (bool, optional): Read all processes again, to update the processes that changed their command line without a new stamp. Defaults to False.
+        """
+        with self._lock:
+            if not self._built or full:
+                self._rebuild()
+                return
+
+            pids = set(self._pids())
+            for pid in self._processes.keys() - pids:
+                self._remove(pid)
+            for pid in self._processes.keys() & pids:
+                if self._stamp(pid) != self._stamps[pid]:
+                    self._remove(pid)
+            for pid in pids - self._processes.keys():
+                # Stamped first, so a change while reading shows at the next refresh
+                stamp = self._stamp(pid)
+                if stamp is not None and (process := self._read(pid)) is not None:
+                    self._add(process, stamp)
+
+    def _rebuild(self) -> None:
+        """Update the index with all processes, read in a single pass. Processes started during
+        the pass have no stamp yet and are read by the next refresh."""
+        stamps = {
+            pid: stamp
+            for pid in self._pids()
+            if (stamp := self._stamp(pid)) is not None
+        }
+        ended = set(self._processes)
+        for info in self._scan():
+            if (stamp := stamps.get(info.pid)) is None:
+                continue
+            ended.discard(info.pid)
+            if (indexed := self._processes.get(info.pid)) is not None:
+                if indexed == info and self._stamps[info.pid] == stamp:
+                    continue
+                self._remove(info.pid)
+            self._add(info, stamp)
+        for pid in ended:
+            self._remove(pid)
+        self._built = True
+
+    def find(
+        self,
+        uid: int | None = None,
+        exe: str | None = None,
+        cmdline: str | None = None,
+    ) -> list[ProcessInfo]:
+        """Find the indexed processes matching all given criteria. Patterns have to be watched
+        first.
+
+        Args:
+            uid (int | None, optional): Real uid of the processes. Defaults to None.
+            exe (str | None, optional): Pattern the executable matches. Defaults to None.
+            cmdline (str | None, optional): Pattern the command line matches. Defaults to None.
+
+        Raises:
+            KeyError: When a pattern is not watched.
+
+        Returns:
+            list[ProcessInfo]: The processes, ordered by process id.
+        """
+        with self._lock:
+            candidates: list[set[int]] = []
+            if uid is not None:
+                candidates.append(self._by_uid.get(uid, set()))
+            if exe is not None:
+                candidates.append(self._by_pattern[("exe", exe)])
+            if cmdline is not None:
+                candidates.append(self._by_pattern[("cmdline", cmdline)])
+            if not candidates:
+                return []
+            pids = set.intersection(*sorted(candidates, key=len))
+            return [self._processes[pid] for pid in sorted(pids)]
+
+    def matches(
+        self,
+        info: ProcessInfo,
+        uid: int | None = None,
+        exe: str | None = None,
+        cmdline: str | None = None,
+    ) -> bool:
+        """Whether a process matches all given criteria, see find.
+
+        Args:
+            info (ProcessInfo): The process.
+            uid (int | None, optional): Real uid of the process. Defaults to None.
+            exe (str | None, optional): Pattern the executable matches. Defaults to None.
+            cmdline (str | None, optional): Pattern the command line matches. Defaults to None.
+
+        Returns:
+            bool: Whether the process matches.
+        """
+        return (
+            (uid is None or info.uid == uid)
+            and (
+                exe is None or self._patterns[("exe", exe)].search(info.exe) is not None
+            )
+            and (
+                cmdline is None
+                or self._patterns[("cmdline", cmdline)].search(info.cmdline) is not None
+            )
+        )
@@ -0,0 +1,216 @@
+import asyncio
+import contextvars
+import heapq
+import inspect
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+from typing import Any
+
+from lymphocyte.events.journal import derived_events
+
+log = logging.getLogger(__name__)
+
+TimerCallback = Callable[["Timer"], Awaitable[None] | None]
+
+
+@dataclass(eq=False)
+class Timer:
+    """A callback scheduled on a TimerService, called with the timer itself once its deadline on
+    the time.monotonic() clock has passed."""
+
+    deadline: float
+    callback: TimerCallback = field(repr=False)
+    name: str = ""
+    data: Any = None
+    sequence: int = 0
+    cancelled: bool = False
+    fired: bool = False
+
+    def __lt__(self, other: "Timer") -> bool:
+        return (self.deadline, self.sequence) < (other.deadline, other.sequence)
+
+    @property
+    def pending(self) -> bool:
+        """Whether the timer is neither cancelled nor fired."""
+        return not (self.cancelled or self.fired)
+
+    def seconds_left(self) -> float:
+        """Seconds until the deadline, 0 when it has passed."""
+        return max(self.deadline - time.monotonic(), 0.0)
+
+
+class TimerService:
+    """Runs scheduled callbacks from a heap of timers, driven by a single task which sleeps until
+    the earliest deadline. The task is started when a timer is scheduled, or by start() for timers
+    scheduled before the event loop was running, and ends once no timers remain. It runs in a
+    context of its own, so callbacks do not see the context variables of whatever scheduled them.
+    Events the callbacks dispatch are journaled as derived, as they follow from the events which
+    scheduled the timers.
+
+    Cancelled timers stay in the heap until they come up, or until they outnumber the pending
+    timers, which rebuilds the heap without them. Callbacks run one after the other on the driving
+    task, so they should not block; exceptions are logged.
+    """
+
+    _heap: list[Timer]
+    _cancelled: int
+    _sequence: Iterator[int]
+    _task: asyncio.Task[None] | None
+    _wakeup: asyncio.Event | None
+
+    def __init__(self) -> None:
+        """Constructs a TimerService object."""
+        self._heap = []
+        self._cancelled = 0
+        self._sequence = itertools.count()
+        self._task = None
+        self._wakeup = None
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def schedule(
+        self,
+        seconds: float,
+        callback: TimerCallback,
+        name: str = "",
+        data: Any = None,
+    ) -> Timer:
+        """Call a callback after the given time.
+
+        Args:
+            seconds (float): Seconds from now.
+            callback (TimerCallback): Called with the timer, may be a coroutine function.
+            name (str, optional): Name to find the timer by. Defaults to "".
+            data (Any, optional): Data for the callback. Defaults to None.
+
+        Returns:
+            Timer: The timer.
+        """
+        return self.schedule_at(time.monotonic() + seconds, callback, name, data)
+
+    def schedule_at(
+        self,
+        deadline: float,
+        callback: TimerCallback,
+        name: str = "",
+        data: Any = None,
+    ) -> Timer:
+        """Call a callback once the time.monotonic() clock passes a deadline.
+
+        Args:
+            deadline (float): The deadline.
+            callback (TimerCallback): Called with the timer, may be a coroutine function.
+            name (str, optional): Name to find the timer by. Defaults to "".
+            data (Any, optional): Data for the callback. Defaults to None.
+
+        Returns:
+            Timer: The timer.
+        """
+        timer = Timer(deadline, callback, name, data, next(self._sequence))
+        earliest = self._heap[0] if self._heap else None
+        heapq.heappush(self._heap, timer)
+        self._start()
+        if earliest is None or timer < earliest:
+            self._wake()
+        return timer
+
+    def cancel(self, timer: Timer) -> bool:
+        """Cancel a timer.
+
+        Args:
+            timer (Timer): The timer.
+
+        Returns:
+            bool: Whether the timer was pending.
+        """
+        if not timer.pending:
+            return False
+        timer.cancelled = True
+        self._cancelled += 1
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [timer for timer in self._heap if not timer.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        return True
+
+    def timers(self, name: str | None = None) -> list[Timer]:
+        """The pending timers, earliest first.
+
+        Args:
+            name (str | None, optional): Name of the timers. Defaults to all timers.
+
+        Returns:
+            list[Timer]: The timers.
+        """
+        return sorted(
+            timer
+            for timer in self._heap
+            if not timer.cancelled and (name is None or timer.name == name)
+        )
+
+    async def start(self) -> None:
+        """Start the driving task, for timers scheduled before the event loop was running."""
+        self._start()
+
+    def _start(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Started by start(), or by scheduling a timer once the loop runs
+        self._wakeup = asyncio.Event()
+        self._task = contextvars.Context().run(
+            loop.create_task, self._run(self._wakeup), name="timers"
+        )
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _pop_due(self, now: float) -> Timer | None:
+        while self._heap and (self._heap[0].cancelled or self._heap[0].deadline <= now):
+            timer = heapq.heappop(self._heap)
+            if timer.cancelled:
+                self._cancelled -= 1
+                continue
+            timer.fired = True
+            return timer
+        return None
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        derived_events.set(True)
+        loop = asyncio.get_running_loop()
+        while True:
+            while (timer := self._pop_due(time.monotonic())) is not None:
+                try:
+                    result = timer.callback(timer)
+                    if inspect.isawaitable(result):
+                        await result
+                # Log all others # pylint: disable-next=broad-exception-caught
+                except Exception:
+                    log.exception("Error in timer %s", timer.name or timer.callback)
+
+            if not self._heap:
+                return
+            handle = loop.call_later(
+                self._heap[0].deadline - time.monotonic(), wakeup.set
+            )
+            await wakeup.wait()
+            wakeup.clear()
+            handle.cancel()
+
+    async def aclose(self) -> None:
+        """Cancel all timers and stop the driving task."""
+        for timer in self._heap:
+            timer.cancelled = True
+        self._heap.clear()
+        self._cancelled = 0
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
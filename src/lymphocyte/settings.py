@@ -1,4 +1,5 @@
 import datetime
+from typing import Literal
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -22,6 +23,11 @@ class ActionSetting(BaseSettings):
 
     kind: str
     name: str
+    max_concurrency: int | None = Field(default=None, ge=1)
+    collapse: bool = Field(default=False)
+    cooldown_seconds: float | None = Field(default=None, ge=0)
+    debounce_seconds: float | None = Field(default=None, ge=0)
+    max_per_minute: int | None = Field(default=None, ge=1)
 
 
 class RuleSetting(BaseSettings):
@@ -36,6 +42,7 @@ class NeighborSetting(BaseSettings):
 
     identifier: str
     threat_level_websocket_url: str
+    stale_after_seconds: float | None = Field(default=None, gt=0)
 
 
 class IncomingProbeSettings(BaseSettings):
@@ -57,10 +64,105 @@ class OutgoingProbeSettings(BaseSettings):
     liveness: SingleOutgoingProbeSettings | None = Field(default=None)
 
 
+class ExpressionSettings(BaseSettings):
+    backend: Literal["jinja", "python"] = Field(default="jinja")
+    cache_size: int = Field(default=256, ge=1)
+
+
+class ActionSchedulerSettings(BaseSettings):
+    max_concurrency: int = Field(default=64, ge=1)
+
+
+class ExecutorSettings(BaseSettings):
+    threads: int = Field(default=8, ge=1)
+    loop_lag_interval_seconds: float = Field(default=0.5, gt=0)
+
+
+class HTTPClientSettings(BaseSettings):
+    max_connections: int = Field(default=100, ge=1)
+    max_connections_per_host: int = Field(default=10, ge=1)
+    max_keepalive_connections: int = Field(default=20, ge=0)
+    keepalive_expiry_seconds: float = Field(default=30, ge=0)
+    timeout_seconds: float = Field(default=10, gt=0)
+    http2: bool = Field(default=True)
+
+
+class ThreatLevelSettings(BaseSettings):
+    base_level: float = Field(default=0)
+    decay: Literal["none", "half_life", "linear"] = Field(default="none")
+    half_life_seconds: float = Field(default=300, gt=0)
+    leak_per_second: float = Field(default=0.01, gt=0)
+    thresholds: list[float] = Field(default_factory=list)
+    push_interval_seconds: float = Field(default=5, gt=0)
+    history_capacity: int = Field(default=1024, ge=1)
+    neighbor_history_capacity: int = Field(default=256, ge=1)
+
+
 class TTLManagerSettings(BaseSettings):
     base_ttl_seconds: datetime.timedelta = Field(
         default=datetime.timedelta(seconds=600)
     )
+    thresholds: list[float] = Field(default_factory=lambda: [0.75, 1.0])
+
+
+class EventLaneSettings(BaseSettings):
+    name: str
+    priority: int = Field(default=0)
+    capacity: int = Field(default=0)
+    overflow: Literal["block", "drop_oldest", "drop_newest", "coalesce"] = Field(
+        default="block"
+    )
+    events: list[str] = Field(default_factory=list)
+
+
+class EventJournalSettings(BaseSettings):
+    enabled: bool = Field(default=False)
+    directory: str = Field(default="journal")
+    max_file_bytes: int = Field(default=16 * 2**20, gt=0)
+    max_files: int = Field(default=8, ge=1)
+
+
+class EventBusSettings(BaseSettings):
+    batch_size: int = Field(default=64, ge=1)
+    batch_linger_seconds: float = Field(default=0, ge=0)
+    coalesce: bool = Field(default=True)
+    workers: int = Field(default=1, ge=1)
+    shard_capacity: int = Field(default=1000, ge=0)
+    journal: EventJournalSettings = Field(default_factory=EventJournalSettings)
+
+    default_lane: str = Field(default="default")
+    lanes: list[EventLaneSettings] = Field(
+        default_factory=lambda: [
+            EventLaneSettings(
+                name="remediation",
+                priority=0,
+                events=[
+                    "ActionTriggerEvent",
+                    "TriggerEvent",
+                    "ThreatLevelChangedEvent",
+                    "ThreatLevelRemovedEvent",
+                    "TTLChangedEvent",
+                    "TTLRestartedEvent",
+                    "TTLThresholdReachedEvent",
+                ],
+            ),
+            EventLaneSettings(
+                name="ingress",
+                priority=1,
+                capacity=1000,
+                overflow="drop_newest",
+                events=["WebhookEvent", "PrometheusAlertStatusChangedEvent"],
+            ),
+            EventLaneSettings(name="default", priority=2),
+            EventLaneSettings(
+                name="background",
+                priority=3,
+                capacity=100,
+                overflow="coalesce",
+                events=["TickEvent"],
+            ),
+        ]
+    )
 
 
 class Settings(BaseSettings):
@@ -77,4 +179,18 @@ class Settings(BaseSettings):
         default_factory=OutgoingProbeSettings
     )
 
+    threat_level: ThreatLevelSettings = Field(default_factory=ThreatLevelSettings)
+
     ttl_manager: TTLManagerSettings = Field(default_factory=TTLManagerSettings)
+
+    expressions: ExpressionSettings = Field(default_factory=ExpressionSettings)
+
+    event_bus: EventBusSettings = Field(default_factory=EventBusSettings)
+
+    action_scheduler: ActionSchedulerSettings = Field(
+        default_factory=ActionSchedulerSettings
+    )
+
+    http_client: HTTPClientSettings = Field(default_factory=HTTPClientSettings)
+
+    executors: ExecutorSettings = Field(default_factory=ExecutorSettings)
@@ -23,9 +23,10 @@ def fixture_settings() -> Settings:
 
 
 @pytest.fixture(name="container")
-def fixture_container(settings: Settings) -> Generator[Container, None, None]:
+async def fixture_container(settings: Settings) -> AsyncGenerator[Container, None]:
     container = create_container(settings)
     yield container
+    await container.timers().aclose()
     container.unwire()
 
 
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from lymphocyte.actions.action import Action
+from lymphocyte.actions.action_trigger_event import ActionTriggerEvent
+from lymphocyte.actions.scheduler import ActionMetrics, ActionScheduler
+from lymphocyte.container import Container
+
+
+@dataclass
+class WaitingAction(Action):
+    release: asyncio.Event = field(default_factory=asyncio.Event)
+    performed: int = 0
+    running: int = 0
+    most_running: int = 0
+
+    async def perform(self) -> None:
+        self.performed += 1
+        self.running += 1
+        self.most_running = max(self.most_running, self.running)
+        try:
+            await self.release.wait()
+        finally:
+            self.running -= 1
+
+
+@dataclass
+class FailingAction(Action):
+    async def perform(self) -> None:
+        raise RuntimeError("failed")
+
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_actions_are_limited_globally_and_per_action() -> None:
+    scheduler = ActionScheduler(max_concurrency=3)
+    limited = WaitingAction("limited", max_concurrency=1, scheduler=scheduler)
+    unlimited = WaitingAction("unlimited", scheduler=scheduler)
+
+    for _ in range(3):
+        limited.handle_sync(ActionTriggerEvent("limited"))
+        unlimited.handle_sync(ActionTriggerEvent("unlimited"))
+    await settle()
+
+    assert (limited.running, unlimited.running) == (1, 2)
+    assert (scheduler.running, scheduler.queued) == (3, 3)
+    assert len(scheduler.tasks) == 6
+
+    limited.release.set()
+    unlimited.release.set()
+    await scheduler.join()
+
+    assert (limited.performed, unlimited.performed) == (3, 3)
+    assert (limited.most_running, unlimited.most_running) == (1, 2)
+    assert (scheduler.running, scheduler.queued) == (0, 0)
+    assert not scheduler.tasks
+
+
+async def test_in_flight_actions_collapse() -> None:
+    registry = CollectorRegistry()
+    scheduler = ActionScheduler(metrics=ActionMetrics(registry))
+    action = WaitingAction("action", collapse=True, scheduler=scheduler)
+
+    tasks = {scheduler.submit(action) for _ in range(3)}
+    await settle()
+    assert len(tasks) == 1
+    assert action.performed == 1
+
+    action.release.set()
+    await scheduler.join()
+    scheduler.submit(action)
+    await scheduler.join()
+
+    assert action.performed == 2
+    assert (
+        registry.get_sample_value(
+            "lymphocyte_actions_collapsed_total", {"action": "action"}
+        )
+        == 2
+    )
+
+
+async def test_failed_actions_are_logged(caplog: pytest.LogCaptureFixture) -> None:
+    registry = CollectorRegistry()
+    scheduler = ActionScheduler(metrics=ActionMetrics(registry))
+
+    FailingAction("failing", scheduler=scheduler).handle_sync(
+        ActionTriggerEvent("failing")
+    )
+    with caplog.at_level(logging.ERROR):
+        await scheduler.join()
+        await settle()
+
+    assert "Action failing failed" in caplog.text
+    assert (
+        registry.get_sample_value(
+            "lymphocyte_actions_failed_total", {"action": "failing"}
+        )
+        == 1
+    )
+    assert not scheduler.tasks
+
+
+async def test_close_cancels_actions() -> None:
+    scheduler = ActionScheduler(max_concurrency=1)
+    action = WaitingAction("action", scheduler=scheduler)
+    tasks = [scheduler.submit(action) for _ in range(2)]
+    await settle()
+
+    await scheduler.aclose()
+
+    assert all(task.cancelled() for task in tasks)
+    assert (scheduler.running, scheduler.queued) == (0, 0)
+
+
+def test_container_actions_share_scheduler(container: Container) -> None:
+    scheduler = container.action_scheduler()
+    assert scheduler.max_concurrency == 64
+    factories: Any = container.factories
+    assert factories.actions.kill(name="kill", uid=0).scheduler is scheduler
@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import datetime
+from dataclasses import dataclass, field
+
+from freezegun import freeze_time
+from prometheus_client import CollectorRegistry
+
+from lymphocyte.actions.action import Action
+from lymphocyte.actions.action_trigger_event import ActionTriggerEvent
+from lymphocyte.actions.scheduler import ActionMetrics, ActionScheduler
+
+cycle: contextvars.ContextVar[int] = contextvars.ContextVar("cycle", default=0)
+
+
+@dataclass
+class CountingAction(Action):
+    performed: int = 0
+    cycles: list[int] = field(default_factory=list)
+
+    async def perform(self) -> None:
+        self.performed += 1
+        self.cycles.append(cycle.get())
+
+
+def suppressed(registry: CollectorRegistry, action: str, reason: str) -> float:
+    return (
+        registry.get_sample_value(
+            "lymphocyte_actions_suppressed_total",
+            {"action": action, "reason": reason},
+        )
+        or 0.0
+    )
+
+
+async def test_cooldown_suppresses_triggers() -> None:
+    registry = CollectorRegistry()
+    scheduler = ActionScheduler(metrics=ActionMetrics(registry))
+    action = CountingAction("action", cooldown_seconds=10, scheduler=scheduler)
+
+    with freeze_time(datetime.datetime.now()) as frozen_time:
+        assert action.trigger()
+        assert not action.trigger()
+        frozen_time.tick(datetime.timedelta(seconds=9))
+        assert not action.trigger()
+        frozen_time.tick(datetime.timedelta(seconds=1))
+        assert action.trigger()
+    await scheduler.join()
+
+    assert action.performed == 2
+    assert suppressed(registry, "action", "cooldown") == 2
+
+
+async def test_rate_limit_allows_triggers_per_minute() -> None:
+    registry = CollectorRegistry()
+    scheduler = ActionScheduler(metrics=ActionMetrics(registry))
+    action = CountingAction("action", max_per_minute=3, scheduler=scheduler)
+
+    with freeze_time(datetime.datetime.now()) as frozen_time:
+        assert [action.trigger() for _ in range(5)] == [True] * 3 + [False] * 2
+        frozen_time.tick(datetime.timedelta(seconds=30))
+        assert not action.trigger()
+        frozen_time.tick(datetime.timedelta(seconds=30))
+        assert [action.trigger() for _ in range(4)] == [True] * 3 + [False]
+    await scheduler.join()
+
+    assert action.performed == 6
+    assert suppressed(registry, "action", "rate_limit") == 4
+
+
+async def test_debounce_performs_after_triggers_stop() -> None:
+    registry = CollectorRegistry()
+    scheduler = ActionScheduler(metrics=ActionMetrics(registry))
+    debounced = CountingAction("debounced", debounce_seconds=0.05, scheduler=scheduler)
+    other = CountingAction("other", debounce_seconds=0.01, scheduler=scheduler)
+
+    for _ in range(4):
+        debounced.handle_sync(ActionTriggerEvent("debounced"))
+        other.handle_sync(ActionTriggerEvent("other"))
+        await asyncio.sleep(0.02)
+    assert (debounced.performed, other.performed) == (0, 4)
+
+    await asyncio.sleep(0.1)
+    await scheduler.join()
+
+    assert debounced.performed == 1
+    assert suppressed(registry, "debounced", "debounce") == 3
+    assert suppressed(registry, "other", "debounce") == 0
+
+
+async def test_debounced_actions_run_in_context_of_latest_trigger() -> None:
+    scheduler = ActionScheduler()
+    first = CountingAction("first", debounce_seconds=0.02, scheduler=scheduler)
+    second = CountingAction("second", debounce_seconds=0.01, scheduler=scheduler)
+
+    def trigger(action: CountingAction, number: int) -> None:
+        cycle.set(number)
+        action.handle_sync(ActionTriggerEvent(action.name))
+
+    contextvars.copy_context().run(trigger, first, 1)
+    contextvars.copy_context().run(trigger, second, 2)
+    contextvars.copy_context().run(trigger, first, 3)
+    await asyncio.sleep(0.05)
+    await scheduler.join()
+
+    assert (first.cycles, second.cycles) == ([3], [2])
+
+
+async def test_debounced_trigger_respects_cooldown() -> None:
+    scheduler = ActionScheduler()
+    action = CountingAction(
+        "action", debounce_seconds=0.01, cooldown_seconds=60, scheduler=scheduler
+    )
+
+    for _ in range(2):
+        action.handle_sync(ActionTriggerEvent("action"))
+        await asyncio.sleep(0.05)
+    await scheduler.join()
+
+    assert action.performed == 1
+
+
+async def test_close_cancels_debounced_triggers() -> None:
+    scheduler = ActionScheduler()
+    action = CountingAction("action", debounce_seconds=0.01, scheduler=scheduler)
+
+    action.handle_sync(ActionTriggerEvent("action"))
+    await scheduler.aclose()
+    await asyncio.sleep(0.05)
+
+    assert action.performed == 0
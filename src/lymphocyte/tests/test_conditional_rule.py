@@ -0,0 +1,126 @@
+import datetime
+import math
+import time
+from unittest import mock
+
+import pytest
+from freezegun import freeze_time
+
+from lymphocyte.actions.action_trigger_event import ActionTriggerEvent
+from lymphocyte.container import Container
+from lymphocyte.events.bus import EventBus
+from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.expressions.cache import ExpressionCache
+from lymphocyte.expressions.condition import Condition
+from lymphocyte.expressions.python import (
+    compile_python_expression,
+    python_expression_names,
+)
+from lymphocyte.managers.ttl import TTLManager
+from lymphocyte.rules.conditional_rule import ConditionalRule
+
+
+@pytest.mark.parametrize(
+    "expressions",
+    [
+        ExpressionCache(),
+        ExpressionCache(compile_python_expression, analyzer=python_expression_names),
+    ],
+)
+async def test_condition_is_memoised_on_manager_versions(
+    container: Container, expressions: ExpressionCache
+) -> None:
+    threat_level_manager = container.threat_level_manager()
+    condition = Condition(
+        "threat_level_manager.current >= 2 or false", container.context(), expressions
+    )
+    assert condition.memoised
+
+    for _ in range(3):
+        assert not condition()
+    assert condition.evaluations == 1
+
+    await threat_level_manager.increment(2)
+    for _ in range(3):
+        assert condition()
+    assert condition.evaluations == 2
+
+
+@pytest.mark.parametrize(
+    "expressions",
+    [
+        ExpressionCache(),
+        ExpressionCache(compile_python_expression, analyzer=python_expression_names),
+    ],
+)
+async def test_volatile_conditions_are_memoised_until_they_flip(
+    expressions: ExpressionCache,
+) -> None:
+    with freeze_time("2020-01-14 12:00:00") as frozen_datetime:
+        ttl_manager = TTLManager(mock.AsyncMock(EventBus), datetime.timedelta(100))
+        condition = Condition(
+            "ttl_manager.fraction_passed() < 0.75",
+            {"ttl_manager": ttl_manager},
+            expressions,
+        )
+        assert condition.memoised
+
+        assert condition()
+        assert condition.valid_until == time.monotonic() + 75 * 86400
+        frozen_datetime.tick(datetime.timedelta(74))
+        assert condition()
+        assert condition.evaluations == 1
+
+        frozen_datetime.tick(datetime.timedelta(days=1, seconds=1))
+        assert not condition()
+        assert not condition()
+        assert condition.evaluations == 2
+        assert condition.valid_until == math.inf
+
+        await ttl_manager.restart()
+        assert condition()
+        assert condition.evaluations == 3
+
+
+def test_volatile_values_used_otherwise_are_not_memoised(container: Container) -> None:
+    condition = Condition(
+        "ttl_manager.fraction_passed() * 2 < 1",
+        container.context(),
+        container.expressions(),
+    )
+
+    for _ in range(3):
+        assert condition()
+    assert condition.evaluations == 3
+
+
+async def test_edge_triggered_rule_fires_once_per_flip(container: Container) -> None:
+    threat_level_manager = container.threat_level_manager()
+    rule = ConditionalRule(
+        triggers=["tick"],
+        actions=["action"],
+        condition="threat_level_manager.current >= 2",
+        mode="edge",
+        context=container.context(),
+    )
+
+    def fired() -> bool:
+        return rule.handle_sync(TriggerEvent("tick")) == [ActionTriggerEvent("action")]
+
+    assert not fired()
+    await threat_level_manager.increment(2)
+    assert fired()
+    assert not fired()
+    await threat_level_manager.increment(1)
+    assert not fired()
+    await threat_level_manager.reset()
+    assert not fired()
+    await threat_level_manager.increment(3)
+    assert fired()
+
+
+def test_level_triggered_rule_fires_every_time() -> None:
+    rule = ConditionalRule(triggers=["tick"], actions=["action"], condition="true")
+
+    for _ in range(3):
+        assert rule.handle_sync(TriggerEvent("tick")) == [ActionTriggerEvent("action")]
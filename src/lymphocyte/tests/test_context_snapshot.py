@@ -0,0 +1,170 @@
+import datetime
+from unittest import mock
+
+import pytest
+from freezegun import freeze_time
+
+from lymphocyte.background_tasks import EventConsumerTask
+from lymphocyte.container import Container
+from lymphocyte.expressions.cache import ExpressionCache
+from lymphocyte.expressions.condition import Condition
+from lymphocyte.managers.snapshot import ManagerSnapshot, RuleContext
+from lymphocyte.managers.threat_level import (
+    OtherThreatLevelsManager,
+    ThreatLevelManager,
+)
+from lymphocyte.rules.conditional_rule import ConditionalRule
+
+
+async def test_lookups_are_live_outside_a_cycle(container: Container) -> None:
+    context = container.context()
+    threat_level_manager = container.threat_level_manager()
+
+    assert context["threat_level_manager"] is threat_level_manager
+    await threat_level_manager.increment(2)
+    assert context["threat_level_manager"].current == 2
+
+
+async def test_queries_run_once_per_cycle(container: Container) -> None:
+    other_threat_levels_manager = container.other_threat_levels_manager()
+    await other_threat_levels_manager.set("other", "host", 3)
+    expressions = ExpressionCache()
+    rules = [
+        ConditionalRule(
+            triggers=["tick"],
+            actions=["action"],
+            condition=condition,
+            context=container.context(),
+            expressions=expressions,
+        )
+        for condition in [
+            "other_threat_levels_manager.get(value_gte=2) | count > 0",
+            "other_threat_levels_manager.get(value_gte=2) | count > 1",
+        ]
+    ]
+
+    with mock.patch.object(
+        OtherThreatLevelsManager,
+        "get",
+        autospec=True,
+        side_effect=OtherThreatLevelsManager.get,
+    ) as get:
+        with container.context().cycle():
+            assert [rule.check_condition() for rule in rules] == [True, False]
+        assert get.call_count == 1
+
+        with container.context().cycle():
+            assert [rule.check_condition() for rule in rules] == [True, False]
+        assert get.call_count == 1  # Memoised on the state version
+
+        await other_threat_levels_manager.set("another", "host", 4)
+        with container.context().cycle():
+            assert [rule.check_condition() for rule in rules] == [True, True]
+        assert get.call_count == 2
+
+
+async def test_snapshot_does_not_see_changes_during_cycle(
+    container: Container,
+) -> None:
+    context = container.context()
+    threat_level_manager = container.threat_level_manager()
+    other_threat_levels_manager = container.other_threat_levels_manager()
+    await other_threat_levels_manager.set("other", "host", 3)
+
+    with context.cycle():
+        snapshot = context["threat_level_manager"]
+        assert isinstance(snapshot, ManagerSnapshot)
+        assert snapshot.current == 0
+        records = context["other_threat_levels_manager"].get()
+        assert isinstance(records, tuple)
+
+        await threat_level_manager.increment(2)
+        await other_threat_levels_manager.set("another", "host", 4)
+        assert context["threat_level_manager"].current == 0
+        assert context["other_threat_levels_manager"].get() == records
+        assert context.live("threat_level_manager").current == 2
+
+    assert context["threat_level_manager"].current == 2
+    assert len(context["other_threat_levels_manager"].get()) == 2
+
+
+async def test_condition_is_memoised_on_snapshot_versions(
+    container: Container,
+) -> None:
+    context = container.context()
+    threat_level_manager = container.threat_level_manager()
+    condition = Condition(
+        "threat_level_manager.current >= 2", context, ExpressionCache()
+    )
+
+    with context.cycle():
+        assert context["threat_level_manager"].current == 0
+        await threat_level_manager.increment(2)
+        assert not condition(), "Evaluated against the snapshot"
+        assert condition.evaluations == 1
+
+    assert condition(), "Not memoised on the version the snapshot did not see"
+    assert condition.evaluations == 2
+    assert condition()
+    assert condition.evaluations == 2
+
+
+async def test_snapshot_is_read_only(container: Container) -> None:
+    context = container.context()
+    with context.cycle():
+        snapshot = context["threat_level_manager"]
+        with pytest.raises(AttributeError):
+            _ = snapshot.increment
+        with pytest.raises(AttributeError):
+            snapshot.base_level = 3
+
+
+async def test_snapshot_is_shared_by_contexts(container: Container) -> None:
+    threat_level_manager = container.threat_level_manager()
+    first = RuleContext({"threat_level_manager": threat_level_manager})
+    second = RuleContext({"threat_level_manager": threat_level_manager})
+
+    with first.cycle():
+        assert (
+            first["threat_level_manager"] is second["threat_level_manager"]
+        ), "Lookups during a cycle share its snapshot"
+
+
+async def test_volatile_values_are_tracked_in_snapshot(container: Container) -> None:
+    with freeze_time(datetime.datetime.now()) as frozen_time:
+        ttl_manager = container.ttl_manager()
+        await ttl_manager.restart()
+        context = container.context()
+        condition = Condition(
+            "ttl_manager.fraction_passed() >= 0.5", context, ExpressionCache()
+        )
+
+        with context.cycle():
+            assert not condition()
+            assert condition.memoised
+            assert condition.valid_until < float("inf")
+
+        frozen_time.tick(ttl_manager.current_ttl * 0.5 + datetime.timedelta(seconds=1))
+        with context.cycle():
+            assert condition()
+        assert condition.evaluations == 2
+
+
+async def test_batch_is_handled_in_cycle(container: Container) -> None:
+    consumer = next(
+        task
+        for task in container.background_tasks()
+        if isinstance(task, EventConsumerTask)
+    )
+    context = consumer.context
+    assert context is not None
+    seen: list[object] = []
+
+    async def handle_batch(*_args: object, **_kwargs: object) -> None:
+        seen.append(context["threat_level_manager"])
+
+    with mock.patch.object(consumer, "_handle_batch", handle_batch):
+        await consumer.handle_batch([])
+
+    assert isinstance(seen[0], ManagerSnapshot)
+    assert isinstance(seen[0].__wrapped__, ThreatLevelManager)
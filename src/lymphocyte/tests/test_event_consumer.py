@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from lymphocyte.background_tasks import EventConsumerTask, ShardedEventConsumerTask
+from lymphocyte.events.bus import Event, EventBus, EventHandler, EventHandlerService
+from lymphocyte.events.handlers.webhook import WebhookEventHandler
+from lymphocyte.events.queue import EventQueue
+from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.events.webhook import WebhookEvent
+
+
+@dataclass
+class RecordingHandler(EventHandler):
+    slow_name: str
+    handled: list[Event] = field(default_factory=list)
+
+    async def handle(self, event: Event) -> Iterable[Event]:
+        if event.routing_name == self.slow_name:
+            await asyncio.sleep(0.05)
+        self.handled.append(event)
+        return []
+
+
+def create_consumer(service: EventHandlerService, bus: EventBus) -> EventConsumerTask:
+    return EventConsumerTask(
+        from_queue=EventQueue(), event_handler_service=service, to_queue=bus
+    )
+
+
+async def test_consumer_dispatches_derived_events() -> None:
+    queue = EventQueue()
+    recorder = RecordingHandler("")
+    service = EventHandlerService(
+        [WebhookEventHandler("webhook_asdf", "asdf"), recorder]
+    )
+    task = EventConsumerTask(
+        from_queue=queue, event_handler_service=service, to_queue=EventBus(queue)
+    )
+
+    queue.put_nowait(WebhookEvent("asdf"))
+    consumer = asyncio.create_task(task.perform())
+    await queue.join()
+    consumer.cancel()
+
+    assert recorder.handled == [WebhookEvent("asdf"), TriggerEvent("webhook_asdf")]
+
+
+def create_sharded_consumer(
+    service: EventHandlerService, shards: int
+) -> ShardedEventConsumerTask:
+    queue = EventQueue()
+    bus = EventBus(queue)
+    return ShardedEventConsumerTask(
+        from_queue=queue,
+        shards=[create_consumer(service, bus) for _ in range(shards)],
+    )
+
+
+async def test_sharded_consumer_keeps_order_per_key() -> None:
+    recorder = RecordingHandler("slow")
+    task = create_sharded_consumer(EventHandlerService([recorder]), 8)
+    fast = next(
+        f"fast_{i}"
+        for i in itertools.count()
+        if task.shard_for(WebhookEvent(f"fast_{i}"))
+        is not task.shard_for(TriggerEvent("slow"))
+    )
+
+    for i in range(3):
+        task.from_queue.put_nowait(TriggerEvent("slow"))
+        task.from_queue.put_nowait(WebhookEvent(fast))
+    consumer = asyncio.create_task(task.perform())
+    try:
+        await asyncio.sleep(0.01)
+        # The fast key is not held up by the slow key
+        assert recorder.handled == [WebhookEvent(fast)] * 3
+
+        await asyncio.sleep(0.2)
+        assert recorder.handled[3:] == [TriggerEvent("slow")] * 3
+    finally:
+        consumer.cancel()
+
+
+async def test_sharded_consumer_skew() -> None:
+    task = create_sharded_consumer(EventHandlerService([]), 4)
+    assert task.skew() == 0
+
+    for shard in task.shards:
+        shard.from_queue.put_nowait(TriggerEvent("trigger"))
+    assert task.skew() == 1
+
+    task.shards[0].from_queue.put_nowait(TriggerEvent("trigger"))
+    assert task.skew() == 2 * 4 / 5
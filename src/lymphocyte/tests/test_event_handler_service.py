@@ -0,0 +1,112 @@
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from unittest import mock
+
+from lymphocyte.actions.action_trigger_event import ActionTriggerEvent
+from lymphocyte.events.bus import Event, EventHandler, EventHandlerService
+from lymphocyte.events.handlers.generic import GenericEventHandler
+from lymphocyte.events.handlers.tick import TickEventHandler
+from lymphocyte.events.handlers.webhook import WebhookEventHandler
+from lymphocyte.events.tick import TickEvent
+from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.events.webhook import WebhookEvent
+from lymphocyte.rules.conditional_rule import ConditionalRule
+
+
+async def test_routes_by_type() -> None:
+    tick = TickEventHandler("tick")
+    webhook = WebhookEventHandler("webhook", "asdf")
+    service = EventHandlerService([tick, webhook])
+
+    assert service.routes(TickEvent(1, name="tick")) == [tick]
+    assert service.routes(TriggerEvent("tick")) == []
+
+
+async def test_routes_by_name() -> None:
+    asdf = WebhookEventHandler("webhook_asdf", "asdf")
+    qwer = WebhookEventHandler("webhook_qwer", "qwer")
+    rule = ConditionalRule(triggers=["webhook_asdf"], actions=["some_action"])
+    service = EventHandlerService([asdf, qwer, rule])
+
+    assert service.routes(WebhookEvent("asdf")) == [asdf]
+    assert service.routes(WebhookEvent("qwer")) == [qwer]
+    assert service.routes(WebhookEvent("unknown")) == []
+    assert service.routes(TriggerEvent("webhook_asdf")) == [rule]
+
+    assert [event async for event in service.handle(TriggerEvent("webhook_asdf"))] == [
+        ActionTriggerEvent("some_action")
+    ]
+
+
+async def test_register_and_unregister_keep_index_up_to_date() -> None:
+    asdf = WebhookEventHandler("webhook_asdf", "asdf")
+    service = EventHandlerService([asdf])
+
+    assert service.routes(WebhookEvent("asdf")) == [asdf]
+    assert service.routes(WebhookEvent("qwer")) == []
+
+    catch_all = GenericEventHandler[Event](Event)
+    qwer = WebhookEventHandler("webhook_qwer", "qwer")
+    service.register(catch_all)
+    service.register(qwer)
+
+    assert service.routes(WebhookEvent("asdf")) == [asdf, catch_all]
+    assert service.routes(WebhookEvent("qwer")) == [catch_all, qwer]
+    assert service.routes(WebhookEvent("unknown")) == [catch_all]
+
+    service.unregister(catch_all)
+    service.unregister(qwer)
+
+    assert service.routes(WebhookEvent("asdf")) == [asdf]
+    assert service.routes(WebhookEvent("qwer")) == []
+
+
+@dataclass
+class AsyncTickEventHandler(EventHandler):
+    name: str
+    received: list[str] = field(default_factory=list)
+
+    async def handle(self, event: Event) -> Iterable[Event]:
+        self.received.append(self.name)
+        return [TriggerEvent(self.name)]
+
+
+@dataclass
+class SyncTickEventHandler(AsyncTickEventHandler):
+    def handle_sync(self, event: Event) -> Iterable[Event]:
+        self.received.append(self.name)
+        return [TriggerEvent(self.name)]
+
+    async def handle(self, event: Event) -> Iterable[Event]:
+        return self.handle_sync(event)
+
+
+async def test_sync_handlers_are_called_inline() -> None:
+    sync_tick = TickEventHandler("sync_tick")
+    async_tick = AsyncTickEventHandler("async_tick")
+    service = EventHandlerService([sync_tick, async_tick])
+
+    tick = TickEvent(1, name="sync_tick")
+    assert service.routes(tick) == [sync_tick, async_tick]
+    with mock.patch.object(TickEventHandler, "handle") as handle:
+        assert [event async for event in service.handle(tick)] == [
+            TriggerEvent("sync_tick"),
+            TriggerEvent("async_tick"),
+        ]
+    handle.assert_not_called()
+
+
+async def test_handlers_receive_events_in_order_of_registration() -> None:
+    received: list[str] = []
+    handlers: list[EventHandler] = [
+        SyncTickEventHandler("first", received),
+        AsyncTickEventHandler("second", received),
+        SyncTickEventHandler("third", received),
+    ]
+    service = EventHandlerService(handlers)
+
+    tick = TickEvent(1)
+    assert service.routes(tick) == handlers
+    new_events = [event async for event in service.handle(tick)]
+    assert len(new_events) == len(handlers)
+    assert received == ["first", "second", "third"]
@@ -0,0 +1,177 @@
+import asyncio
+from pathlib import Path
+from unittest import mock
+
+from lymphocyte.background_tasks import EventConsumerTask
+from lymphocyte.events.bus import EventBus, EventHandlerService
+from lymphocyte.events.handlers.webhook import WebhookEventHandler
+from lymphocyte.events.journal import EventJournal, read_journal, segments
+from lymphocyte.events.prometheus import PrometheusAlertStatusChangedEvent
+from lymphocyte.events.queue import EventQueue
+from lymphocyte.events.threat_level import (
+    OwnThreatLevelChangedEvent,
+    ThreatLevelChangedEvent,
+)
+from lymphocyte.events.tick import TickEvent
+from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.events.ttl import TTLRestartedEvent
+from lymphocyte.events.webhook import WebhookEvent
+from lymphocyte.main_utils import create_container
+from lymphocyte.replay import create_replay_container, replay
+from lymphocyte.settings import Settings
+
+
+def test_events_are_read_back(tmp_path: Path) -> None:
+    events = [
+        WebhookEvent("asdf"),
+        TickEvent(3),
+        ThreatLevelChangedEvent(1.5, "other", "example.com"),
+        OwnThreatLevelChangedEvent(2.0),
+        PrometheusAlertStatusChangedEvent("Test", True),
+        TTLRestartedEvent(),
+    ]
+    journal = EventJournal(tmp_path)
+    for event in events:
+        journal.append(event)
+
+    # Records are readable before the segment is closed.
+    assert [record.event for record in read_journal(tmp_path)] == events
+
+    journal.close()
+    records = list(read_journal(tmp_path))
+    assert [record.event for record in records] == events
+    assert all(not record.derived for record in records)
+    assert [record.timestamp_ns for record in records] == sorted(
+        record.timestamp_ns for record in records
+    )
+
+
+def test_segments_are_rotated(tmp_path: Path) -> None:
+    journal = EventJournal(tmp_path, max_file_bytes=128, max_files=3)
+    for counter in range(100):
+        journal.append(TickEvent(counter))
+    journal.close()
+
+    assert len(segments(tmp_path)) == 3
+    counters = [record.event.counter for record in read_journal(tmp_path)]  # type: ignore[attr-defined]
+    assert counters == list(range(counters[0], 100))
+
+    # A reopened journal starts a new segment after the existing ones.
+    journal = EventJournal(tmp_path, max_file_bytes=128, max_files=3)
+    journal.append(TickEvent(100))
+    journal.close()
+    assert [record.event for record in read_journal(tmp_path)][-1] == TickEvent(100)
+
+
+async def test_derived_events_are_flagged(tmp_path: Path) -> None:
+    journal = EventJournal(tmp_path)
+    queue = EventQueue()
+    event_bus = EventBus(queue, journal=journal)
+    task = EventConsumerTask(
+        from_queue=queue,
+        event_handler_service=EventHandlerService(
+            [WebhookEventHandler("webhook_asdf", "asdf")]
+        ),
+        to_queue=event_bus,
+    )
+
+    await event_bus.dispatch_async(WebhookEvent("asdf"))
+    consumer = asyncio.create_task(task.perform())
+    await queue.join()
+    consumer.cancel()
+
+    assert [(record.event, record.derived) for record in read_journal(tmp_path)] == [
+        (WebhookEvent("asdf"), False),
+        (TriggerEvent("webhook_asdf"), True),
+    ]
+
+
+async def test_replay(tmp_path: Path) -> None:
+    journal = EventJournal(tmp_path)
+    for _ in range(3):
+        journal.append(WebhookEvent("asdf"))
+    journal.append(TriggerEvent("webhook_asdf"))  # Recorded outside a consumer.
+    journal.close()
+
+    settings = Settings.model_validate(
+        {
+            "triggers": [
+                {"kind": "webhook", "name": "webhook_asdf", "exact_match": "asdf"}
+            ],
+            "rules": [{"triggers": ["webhook_asdf"], "actions": ["increment"]}],
+            "actions": [
+                {
+                    "kind": "increment_threat_level",
+                    "name": "increment",
+                    "for_seconds": 60,
+                }
+            ],
+        }
+    )
+    container = create_replay_container(settings)
+
+    report = await replay(container, read_journal(tmp_path), speed=0)
+    await asyncio.sleep(0)
+
+    assert report.replayed_events == 4
+    assert report.consumed_events == 3 + 4 + 4
+    assert len(report.latencies) == 4
+    assert report.throughput > 0
+    assert container.threat_level_manager().current == 4
+    await container.timers().aclose()
+
+
+async def test_events_of_timers_are_not_replayed_twice(tmp_path: Path) -> None:
+    settings = Settings.model_validate(
+        {
+            "event_bus": {"journal": {"enabled": True, "directory": str(tmp_path)}},
+            "triggers": [
+                {"kind": "webhook", "name": "webhook_asdf", "exact_match": "asdf"}
+            ],
+            "rules": [{"triggers": ["webhook_asdf"], "actions": ["increment"]}],
+            "actions": [
+                {
+                    "kind": "increment_threat_level",
+                    "name": "increment",
+                    "for_seconds": 0.05,
+                }
+            ],
+        }
+    )
+    recorder = create_container(settings)
+    consumer = asyncio.create_task(
+        EventConsumerTask(
+            from_queue=recorder.queue(),
+            event_handler_service=recorder.event_handler_service(),
+            to_queue=recorder.event_bus(),
+            context=recorder.context(),
+        ).perform()
+    )
+    await recorder.event_bus().dispatch_async(WebhookEvent("asdf"))
+    await asyncio.sleep(0.1)  # The increment is reverted by a timer
+    await recorder.queue().join()
+    consumer.cancel()
+    await recorder.timers().aclose()
+    recorder.event_journal().close()
+
+    records = list(read_journal(tmp_path))
+    recorded = [r for r in records if isinstance(r.event, OwnThreatLevelChangedEvent)]
+    assert len(recorded) == 2
+    assert [r.event for r in records if not r.derived] == [WebhookEvent("asdf")]
+
+    container = create_replay_container(settings)
+    metrics = container.event_metrics()
+    with mock.patch.object(
+        metrics, "event_dispatched", wraps=metrics.event_dispatched
+    ) as dispatched:
+        report = await replay(container, records, speed=0)
+        await asyncio.sleep(0.1)
+    await container.timers().aclose()
+
+    replayed = [
+        call.args[0]
+        for call in dispatched.call_args_list
+        if isinstance(call.args[0], OwnThreatLevelChangedEvent)
+    ]
+    assert report.replayed_events == 1
+    assert replayed == [r.event for r in recorded]
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from lymphocyte.background_tasks import EventConsumerTask
+from lymphocyte.events.bus import EventBus, EventHandlerService
+from lymphocyte.events.handlers.webhook import WebhookEventHandler
+from lymphocyte.events.metrics import EventMetrics
+from lymphocyte.events.queue import EventQueue, EventQueueFull, Lane
+from lymphocyte.events.tick import TickEvent
+from lymphocyte.events.ttl import TTLRestartedEvent
+from lymphocyte.events.webhook import WebhookEvent
+
+
+async def test_consumed_events_are_counted() -> None:
+    registry = CollectorRegistry()
+    metrics = EventMetrics(registry)
+    queue = EventQueue(metrics=metrics)
+    metrics.watch_queue(queue)
+    service = EventHandlerService(
+        [WebhookEventHandler("webhook_asdf", "asdf")], metrics=metrics
+    )
+    task = EventConsumerTask(
+        from_queue=queue,
+        event_handler_service=service,
+        to_queue=EventBus(queue, metrics=metrics),
+        metrics=metrics,
+    )
+
+    await EventBus(queue, metrics=metrics).dispatch_async(WebhookEvent("asdf"))
+    assert (
+        registry.get_sample_value("lymphocyte_event_queue_depth", {"lane": "default"})
+        == 1
+    )
+
+    consumer = asyncio.create_task(task.perform())
+    await queue.join()
+    consumer.cancel()
+
+    def sample(name: str, **labels: str) -> float | None:
+        return registry.get_sample_value(name, labels)
+
+    assert sample("lymphocyte_events_dispatched_total", event_type="WebhookEvent") == 1
+    assert sample("lymphocyte_events_dispatched_total", event_type="TriggerEvent") == 1
+    assert sample("lymphocyte_events_consumed_total", event_type="WebhookEvent") == 1
+    assert sample("lymphocyte_events_consumed_total", event_type="TriggerEvent") == 1
+    assert sample("lymphocyte_event_fan_out_sum", event_type="WebhookEvent") == 1
+    assert sample("lymphocyte_event_fan_out_sum", event_type="TriggerEvent") == 0
+    assert sample("lymphocyte_event_queue_wait_seconds_count", lane="default") == 2
+    assert (
+        sample(
+            "lymphocyte_event_handler_duration_seconds_count",
+            handler="WebhookEventHandler",
+        )
+        == 1
+    )
+    assert sample("lymphocyte_event_queue_depth", lane="default") == 0
+
+
+async def test_dropped_and_coalesced_events_are_counted() -> None:
+    registry = CollectorRegistry()
+    metrics = EventMetrics(registry)
+    queue = EventQueue(
+        lanes=[(Lane("ticks", capacity=1, overflow="drop_newest"), ["TickEvent"])],
+        metrics=metrics,
+    )
+
+    queue.put_nowait(TickEvent(1))
+    with pytest.raises(EventQueueFull):
+        queue.put_nowait(TickEvent(2))
+    queue.put_nowait(TTLRestartedEvent())
+    queue.put_nowait(TTLRestartedEvent())
+
+    assert (
+        registry.get_sample_value("lymphocyte_events_dropped_total", {"lane": "ticks"})
+        == 1
+    )
+    assert (
+        registry.get_sample_value(
+            "lymphocyte_events_coalesced_total", {"lane": "default"}
+        )
+        == 1
+    )
@@ -0,0 +1,186 @@
+import asyncio
+from unittest import mock
+
+import pytest
+from httpx import AsyncClient
+
+from lymphocyte.container import Container
+from lymphocyte.events.bus import EventBus
+from lymphocyte.events.prometheus import PrometheusAlertStatusChangedEvent
+from lymphocyte.events.queue import EventQueue, EventQueueFull, Lane
+from lymphocyte.events.threat_level import (
+    OwnThreatLevelChangedEvent,
+    ThreatLevelChangedEvent,
+)
+from lymphocyte.events.tick import TickEvent
+from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.events.webhook import WebhookEvent
+from lymphocyte.managers.prometheus import PrometheusManager
+
+
+def create_queue(capacity: int, overflow: str) -> EventQueue:
+    return EventQueue(
+        lanes=[
+            (Lane("high", priority=0), ["TriggerEvent"]),
+            (Lane("low", 1, capacity, overflow), ["TickEvent"]),  # type: ignore[arg-type]
+        ]
+    )
+
+
+async def test_higher_priority_lanes_are_served_first() -> None:
+    queue = create_queue(0, "block")
+
+    await queue.put(TickEvent(1))
+    await queue.put(WebhookEvent("default"))
+    await queue.put(TriggerEvent("trigger"))
+
+    assert queue.qsize() == 3
+    assert [await queue.get() for _ in range(3)] == [
+        TriggerEvent("trigger"),
+        TickEvent(1),
+        WebhookEvent("default"),
+    ]
+
+
+async def test_drop_newest() -> None:
+    queue = create_queue(2, "drop_newest")
+
+    for counter in range(3):
+        await queue.put(TickEvent(counter))
+    with pytest.raises(EventQueueFull):
+        queue.put_nowait(TickEvent(3))
+
+    assert queue.full(TickEvent)
+    assert not queue.full(TriggerEvent)
+    assert queue.lane_for(TickEvent).pending() == [TickEvent(0), TickEvent(1)]
+    assert queue.lane_for(TickEvent).dropped == 2
+
+
+async def test_drop_oldest() -> None:
+    queue = create_queue(2, "drop_oldest")
+
+    for counter in range(3):
+        queue.put_nowait(TickEvent(counter))
+
+    assert queue.lane_for(TickEvent).pending() == [TickEvent(1), TickEvent(2)]
+
+
+async def test_coalesce() -> None:
+    queue = create_queue(2, "coalesce")
+
+    for counter in [0, 1, 1, 2]:
+        queue.put_nowait(TickEvent(counter))
+
+    assert queue.lane_for(TickEvent).pending() == [TickEvent(1), TickEvent(2)]
+
+
+async def test_block_waits_for_room() -> None:
+    queue = create_queue(1, "block")
+
+    await queue.put(TickEvent(0))
+    with pytest.raises(EventQueueFull):
+        queue.put_nowait(TickEvent(1))
+
+    put = asyncio.create_task(queue.put(TickEvent(1)))
+    await asyncio.sleep(0)
+    assert not put.done()
+
+    assert await queue.get() == TickEvent(0)
+    await put
+    assert await queue.get() == TickEvent(1)
+
+
+async def test_webhook_rejected_when_lane_full(
+    client: AsyncClient, container: Container
+) -> None:
+    event_bus = mock.Mock(EventBus)
+    event_bus.dispatch_async.side_effect = EventQueueFull("ingress")
+
+    with container.event_bus.override(event_bus):
+        response = await client.get("/webhook/asdf")
+
+    assert response.status_code == 429
+
+
+async def test_alerts_rejected_without_room_for_each(
+    client: AsyncClient, container: Container
+) -> None:
+    queue = EventQueue(
+        lanes=[
+            (
+                Lane("ingress", capacity=3, overflow="drop_newest"),
+                ["PrometheusAlertStatusChangedEvent"],
+            )
+        ]
+    )
+    event_bus = EventBus(queue)
+    prometheus_manager = PrometheusManager(event_bus)
+    await queue.put(PrometheusAlertStatusChangedEvent("pending", True))
+    alerts = [
+        {"status": "firing", "labels": {"alertname": f"alert_{index}"}}
+        for index in range(3)
+    ]
+
+    with container.event_bus.override(event_bus), container.prometheus_manager.override(
+        prometheus_manager
+    ):
+        response = await client.post(
+            "/alertmanager_webhook", json={"alerts": alerts, "commonLabels": {}}
+        )
+        assert response.status_code == 503
+        assert prometheus_manager.get() == []
+
+        response = await client.post(
+            "/alertmanager_webhook", json={"alerts": alerts[:2], "commonLabels": {}}
+        )
+        assert response.status_code == 200
+        assert len(prometheus_manager.get()) == 2
+
+    assert queue.qsize() == 3
+    assert queue.lane_for(PrometheusAlertStatusChangedEvent).dropped == 0
+
+
+async def test_get_many_takes_ready_events() -> None:
+    queue = create_queue(0, "block")
+    await queue.put_many([TickEvent(0), TickEvent(1), TriggerEvent("trigger")])
+
+    assert await queue.get_many(2) == [TriggerEvent("trigger"), TickEvent(0)]
+    assert await queue.get_many(2) == [TickEvent(1)]
+
+
+async def test_get_many_lingers_for_more_events() -> None:
+    queue = create_queue(0, "block")
+    await queue.put(TickEvent(0))
+
+    asyncio.get_running_loop().call_later(0.01, queue.put_nowait, TickEvent(1))
+
+    assert await queue.get_many(2, linger_seconds=1) == [TickEvent(0), TickEvent(1)]
+
+
+async def test_coalesces_by_key() -> None:
+    queue = EventQueue()
+
+    await queue.put(ThreatLevelChangedEvent(1, "other", "host_a"))
+    await queue.put(ThreatLevelChangedEvent(1, "other", "host_b"))
+    await queue.put(ThreatLevelChangedEvent(2, "other", "host_a"))
+    await queue.put(OwnThreatLevelChangedEvent(3))
+
+    assert queue.qsize() == 3
+    assert queue.lane_for(ThreatLevelChangedEvent).coalesced == 1
+    assert await queue.get_many(3) == [
+        ThreatLevelChangedEvent(2, "other", "host_a"),
+        ThreatLevelChangedEvent(1, "other", "host_b"),
+        OwnThreatLevelChangedEvent(3),
+    ]
+
+    await queue.put(ThreatLevelChangedEvent(4, "other", "host_a"))
+    assert queue.qsize() == 1
+
+
+async def test_coalescing_can_be_disabled() -> None:
+    queue = EventQueue(coalesce=False)
+
+    await queue.put(ThreatLevelChangedEvent(1, "other", "host_a"))
+    await queue.put(ThreatLevelChangedEvent(2, "other", "host_a"))
+
+    assert queue.qsize() == 2
@@ -0,0 +1,103 @@
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from dataclasses import dataclass
+
+import pytest
+from prometheus_client import CollectorRegistry
+
+from lymphocyte.actions.action import BlockingAction
+from lymphocyte.actions.debug import DebugAction
+from lymphocyte.background_tasks import LoopLagMonitorTask
+from lymphocyte.services.executors import ExecutorMetrics, Executors
+
+variable: contextvars.ContextVar[str] = contextvars.ContextVar("variable")
+
+
+def read_variable() -> tuple[str, str]:
+    return variable.get(), threading.current_thread().name
+
+
+async def test_work_runs_on_worker_threads_in_context() -> None:
+    registry = CollectorRegistry()
+    executors = Executors(threads=2, metrics=ExecutorMetrics(registry))
+    variable.set("value")
+
+    value, thread = await executors.run(read_variable)
+    await executors.aclose()
+
+    assert value == "value"
+    assert thread.startswith("lymphocyte-worker")
+    assert (
+        registry.get_sample_value(
+            "lymphocyte_offloaded_work_seconds_count",
+            {"name": "read_variable"},
+        )
+        == 1
+    )
+
+
+@dataclass
+class SleepingAction(BlockingAction):
+    seconds: float = 0.1
+
+    def perform_blocking(self) -> None:
+        time.sleep(self.seconds)
+
+
+async def test_blocking_actions_do_not_block_the_loop() -> None:
+    registry = CollectorRegistry()
+    metrics = ExecutorMetrics(registry)
+    monitor = asyncio.create_task(
+        LoopLagMonitorTask(metrics=metrics, interval_seconds=0.01).perform()
+    )
+    action = SleepingAction("sleep", executors=Executors(metrics=metrics))
+
+    await asyncio.gather(*(action.perform() for _ in range(4)))
+    monitor.cancel()
+
+    lag = registry.get_sample_value("lymphocyte_event_loop_lag_seconds_sum") or 0.0
+    assert lag < 0.1
+    assert (
+        registry.get_sample_value(
+            "lymphocyte_offloaded_work_seconds_count",
+            {"name": "sleep"},
+        )
+        == 4
+    )
+
+
+async def test_loop_lag_is_measured() -> None:
+    registry = CollectorRegistry()
+    monitor = asyncio.create_task(
+        LoopLagMonitorTask(
+            metrics=ExecutorMetrics(registry), interval_seconds=0.01
+        ).perform()
+    )
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)
+    await asyncio.sleep(0.02)
+    monitor.cancel()
+
+    lag = registry.get_sample_value("lymphocyte_event_loop_lag_seconds_sum")
+    assert lag is not None and lag >= 0.05
+
+
+async def test_debug_action_renders_on_the_loop(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    action = DebugAction(
+        "debug",
+        context={"thread": lambda: threading.current_thread().name},
+        message="{{ thread() }}",
+    )
+
+    with caplog.at_level(logging.INFO):
+        await action.perform()
+    assert not caplog.records, "Nothing is rendered without debug logging"
+
+    with caplog.at_level(logging.DEBUG):
+        await action.perform()
+    assert caplog.records[0].getMessage() == threading.current_thread().name
@@ -0,0 +1,71 @@
+from unittest import mock
+
+import jinja2
+import pytest
+from httpx import AsyncClient
+
+from lymphocyte.container import Container
+from lymphocyte.expressions.cache import ExpressionCache, create_environment
+from lymphocyte.rules.conditional_rule import ConditionalRule
+
+
+def test_expressions_are_compiled_once() -> None:
+    compiler = mock.Mock(wraps=create_environment().compile_expression)
+    expressions = ExpressionCache(compiler, maxsize=2)
+
+    assert expressions.evaluate("a + 1", {"a": 1}) == 2
+    assert expressions.evaluate("a + 1", {"a": 2}) == 3
+    assert compiler.call_count == 1
+
+    expressions.compile("a + 2")
+    expressions.compile("a + 3")
+    expressions.compile("a + 1")
+    assert compiler.call_count == 4
+    assert expressions.cache_info().currsize == 2
+
+
+def test_rule_conditions_are_compiled_on_construction() -> None:
+    expressions = ExpressionCache()
+    rule = ConditionalRule(
+        triggers=["trigger"],
+        actions=["action"],
+        condition="value > 1",
+        context={"value": 2},
+        expressions=expressions,
+    )
+
+    assert expressions.cache_info().misses == 1
+    assert rule.check_condition()
+    assert rule.check_condition()
+    assert expressions.cache_info().misses == 1
+
+    with pytest.raises(jinja2.TemplateSyntaxError):
+        ConditionalRule(
+            triggers=[], actions=[], condition="value >", expressions=expressions
+        )
+
+
+def test_container_shares_a_single_cache(container: Container) -> None:
+    first, second = (
+        container.factories.rules(
+            "conditional", triggers=["t"], actions=["a"], condition="true"
+        )
+        for _ in range(2)
+    )
+
+    assert first.expressions is second.expressions is container.expressions()
+    assert container.probe_service().expressions is container.expressions()
+
+
+async def test_evaluate_expression_uses_the_cache(
+    client: AsyncClient, container: Container
+) -> None:
+    expression = "ttl_manager.fraction_passed() < 2"
+    for _ in range(3):
+        response = await client.post(
+            "/evaluate_expression", params={"expression": expression}
+        )
+        assert response.json() is True
+
+    info = container.expressions().cache_info()
+    assert info.hits >= 2
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any
+
+import httpx
+import pytest
+from prometheus_client import CollectorRegistry
+
+from lymphocyte.actions.request import SendRestRequestAction
+from lymphocyte.container import Container
+from lymphocyte.services.http_client import HTTPClientMetrics, HTTPClientPool
+from lymphocyte.settings import HTTPClientSettings
+
+
+def sample(registry: CollectorRegistry, name: str, **labels: str) -> float:
+    return registry.get_sample_value(name, labels) or 0.0
+
+
+async def test_requests_are_recorded_per_action() -> None:
+    def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/fail":
+            return httpx.Response(503)
+        if request.url.path == "/unreachable":
+            raise httpx.ConnectError("unreachable", request=request)
+        return httpx.Response(200)
+
+    registry = CollectorRegistry()
+    async with HTTPClientPool(
+        metrics=HTTPClientMetrics(registry), transport=httpx.MockTransport(handle)
+    ) as http_client:
+        await http_client.request("enable", "GET", "http://test/ok")
+        await http_client.request("enable", "GET", "http://test/ok")
+        await http_client.request("disable", "GET", "http://test/fail")
+        with pytest.raises(httpx.ConnectError):
+            await http_client.request("disable", "GET", "http://test/unreachable")
+
+    count = "lymphocyte_action_request_seconds_count"
+    errors = "lymphocyte_action_request_errors_total"
+    assert sample(registry, count, action="enable") == 2
+    assert sample(registry, count, action="disable") == 1
+    assert sample(registry, errors, action="enable", reason="503") == 0
+    assert sample(registry, errors, action="disable", reason="503") == 1
+    assert sample(registry, errors, action="disable", reason="ConnectError") == 1
+
+
+async def test_requests_are_limited_per_host() -> None:
+    running: dict[str, int] = {"a": 0, "b": 0}
+    most: dict[str, int] = {"a": 0, "b": 0}
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        running[host] += 1
+        most[host] = max(most[host], running[host])
+        await asyncio.sleep(0.01)
+        running[host] -= 1
+        return httpx.Response(200)
+
+    async with HTTPClientPool(
+        HTTPClientSettings(max_connections_per_host=2),
+        transport=httpx.MockTransport(handle),
+    ) as http_client:
+        await asyncio.gather(
+            *[
+                http_client.request("action", "GET", f"http://{host}/")
+                for host in ["a", "b"] * 5
+            ]
+        )
+
+    assert most == {"a": 2, "b": 2}
+
+
+async def test_action_sends_on_shared_pool() -> None:
+    requests: list[httpx.Request] = []
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200)
+
+    http_client = HTTPClientPool(
+        HTTPClientSettings(timeout_seconds=10), transport=httpx.MockTransport(handle)
+    )
+    actions = [
+        SendRestRequestAction(
+            name="enable_rate_limiter",
+            url="http://test/enable_rate_limiter",
+            method="POST",
+            json={"enabled": True},
+            timeout_seconds=2,
+            http_client=http_client,
+        ),
+        SendRestRequestAction(
+            name="disable_rate_limiter",
+            url="http://test/disable_rate_limiter",
+            http_client=http_client,
+        ),
+    ]
+    for action in actions:
+        await action.perform()
+    client = http_client.client
+
+    assert [(r.method, r.url.path) for r in requests] == [
+        ("POST", "/enable_rate_limiter"),
+        ("GET", "/disable_rate_limiter"),
+    ]
+    assert requests[0].extensions["timeout"]["read"] == 2
+    assert requests[1].extensions["timeout"]["read"] == 10
+    assert http_client.client is client, "The client is reused between requests"
+
+    await http_client.aclose()
+    assert client.is_closed
+
+
+def test_container_shares_pool(container: Container) -> None:
+    factories: Any = container.factories
+    first = factories.actions.send_rest_request(name="first", url="http://a")
+    second = factories.actions.send_rest_request(name="second", url="http://b")
+
+    assert first.http_client is not None
+    assert first.http_client is second.http_client is container.http_client()
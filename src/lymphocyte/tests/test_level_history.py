@@ -0,0 +1,186 @@
+import math
+import random
+from unittest import mock
+
+import pytest
+
+from lymphocyte.container import Container
+from lymphocyte.events.bus import EventBus
+from lymphocyte.expressions.condition import Condition
+from lymphocyte.managers.decay import Decay, HalfLifeDecay, LinearDecay
+from lymphocyte.managers.history import LevelHistory
+from lymphocyte.managers.threat_level import (
+    DecayingThreatLevelManager,
+    OtherThreatLevelsManager,
+)
+from lymphocyte.services.timers import TimerService
+
+
+def test_windowed_aggregates() -> None:
+    history = LevelHistory()
+    for moment, level in [(0, 0), (10, 4), (20, 2), (30, 6)]:
+        history.record(level, now=moment)
+
+    assert history.max(5, now=35) == 6
+    assert history.max(10, now=35) == 6
+    assert history.max(15, now=25) == 4, "Covers the level before the window"
+    assert history.max(1000, now=35) == 6
+
+    assert history.mean(10, now=40) == 6
+    assert history.mean(20, now=40) == 4
+    assert history.mean(1000, now=40) == 3, "Over the whole history"
+
+    assert history.rate(20, now=40) == pytest.approx(0.2)
+    assert history.rate(1000, now=40) == pytest.approx(0.15)
+
+    assert history.percentile(1000, 50, now=40) == 3
+    assert history.percentile(1000, 100, now=40) == 6
+    assert history.percentile(15, 0, now=35) == 2
+
+    empty = LevelHistory()
+    assert empty.max(10) is None
+    assert empty.mean(10) is None
+    assert empty.rate(10) is None
+    assert empty.percentile(10, 50) is None
+
+
+def test_history_keeps_the_latest_samples() -> None:
+    history = LevelHistory(capacity=4)
+    for moment in range(10):
+        history.record(moment % 7, now=moment)
+
+    assert list(history) == [(6, 6), (7, 0), (8, 1), (9, 2)]
+    assert history.max(1000, now=9) == 6
+    assert history.max(2, now=9) == 2
+    assert history.max(2, now=8) == 6
+    assert history.mean(1000, now=10) == pytest.approx(9 / 4)
+
+
+def test_aggregates_match_brute_force() -> None:
+    randomness = random.Random(1)
+    history = LevelHistory(capacity=50)
+    samples: list[tuple[float, float]] = []
+    moment = 0.0
+    for _ in range(120):
+        moment += randomness.uniform(0.1, 2)
+        level = randomness.uniform(-10, 10)
+        history.record(level, now=moment)
+        samples = (samples + [(moment, level)])[-50:]
+
+        seconds = randomness.uniform(0, 40)
+        now = moment + randomness.uniform(0, 2)
+        start = now - seconds
+        first = max(
+            [
+                i
+                for i, (sample_moment, _) in enumerate(samples)
+                if sample_moment <= start
+            ],
+            default=0,
+        )
+        window = samples[first:]
+        assert history.max(seconds, now=now) == max(level for _, level in window)
+
+        begin = max(start, window[0][0])
+        edges = [begin] + [sample_moment for sample_moment, _ in window[1:]] + [now]
+        area = sum(
+            level * (end - edge)
+            for (_, level), edge, end in zip(window, edges, edges[1:])
+        )
+        if now > begin:
+            assert history.mean(seconds, now=now) == pytest.approx(area / (now - begin))
+
+
+def test_history_follows_the_decay() -> None:
+    history = LevelHistory(decay=HalfLifeDecay(0.1))
+    history.record(0, now=0)
+    history.record(10, now=0)
+
+    assert history.max(0.2, now=0.5) == pytest.approx(10 * 0.5**3)
+    assert history.mean(0.2, now=0.5) == pytest.approx(
+        10 * (0.5**3 - 0.5**5) * 0.1 / math.log(2) / 0.2
+    )
+    assert history.rate(0.2, now=0.5) == pytest.approx(10 * (0.5**5 - 0.5**3) / 0.2)
+    assert history.percentile(0.2, 100, now=0.5) == pytest.approx(10 * 0.5**3)
+    assert history.max(1, now=0.5) == 10
+
+
+@pytest.mark.parametrize("decay", [HalfLifeDecay(3), LinearDecay(2)])
+def test_decaying_aggregates_match_brute_force(decay: Decay) -> None:
+    randomness = random.Random(2)
+    history = LevelHistory(capacity=20, decay=decay, base_level=1)
+    samples: list[tuple[float, float]] = []
+    moment = 0.0
+
+    def level_at(at: float) -> float:
+        sample_moment, level = [sample for sample in samples if sample[0] <= at][-1]
+        return 1 + decay.decayed(level - 1, at - sample_moment)
+
+    for _ in range(60):
+        moment += randomness.uniform(0.1, 4)
+        history.record(randomness.uniform(-10, 10), now=moment)
+        samples = (samples + [list(history)[-1]])[-20:]
+
+        now = moment + randomness.uniform(0, 4)
+        begin = max(now - randomness.uniform(0.5, 30), samples[0][0])
+        steps = 2000
+        levels = [
+            level_at(begin + (now - begin) * step / steps) for step in range(steps + 1)
+        ]
+        assert history.max(now - begin, now=now) == pytest.approx(max(levels), abs=0.05)
+        assert history.mean(now - begin, now=now) == pytest.approx(
+            sum(levels) / len(levels), abs=0.05
+        )
+
+
+async def test_decaying_threat_level_history() -> None:
+    timers = TimerService()
+    with mock.patch("lymphocyte.managers.threat_level.time") as clock:
+        clock.monotonic.return_value = 100
+        manager = DecayingThreatLevelManager(
+            mock.Mock(EventBus), base_level=1, decay=HalfLifeDecay(10), timers=timers
+        )
+        clock.monotonic.return_value = 110
+        await manager.increment(8)
+    await timers.aclose()
+
+    assert list(manager.history) == [(100, 1), (110, 9)]
+    assert manager.history.max(10, now=130) == 5
+    assert manager.history.mean(1000, now=110) == 1
+
+
+async def test_history_queries_are_tracked(container: Container) -> None:
+    threat_level_manager = container.threat_level_manager()
+    await threat_level_manager.increment(3)
+    assert [level for _, level in threat_level_manager.history] == [0, 3]
+
+    maximum = Condition(
+        "threat_level_manager.history.max(60) >= 3",
+        container.context(),
+        container.expressions(),
+    )
+    assert maximum()
+    assert maximum()
+    assert maximum.evaluations == 1
+    assert maximum.valid_until == pytest.approx(
+        list(threat_level_manager.history)[1][0] + 60
+    )
+
+    mean = Condition(
+        "threat_level_manager.history.mean(60) < 3",
+        container.context(),
+        container.expressions(),
+    )
+    assert mean()
+    assert mean()
+    assert mean.evaluations == 2
+
+
+async def test_other_threat_levels_are_recorded() -> None:
+    manager = OtherThreatLevelsManager(mock.Mock(EventBus), history_capacity=2)
+    for level in (1, 5, 3):
+        await manager.set("other", "host", level)
+
+    assert [level for _, level in manager.history("other", "host")] == [5, 3]
+    assert manager.history("other", "host").max(60) == 5
+    assert manager.history("other", "unknown").max(60) is None
@@ -1,8 +1,21 @@
+import asyncio
+import datetime
+import random
+import socket
+from typing import Any
 from unittest import mock
 
+import pytest
+
+from lymphocyte.background_tasks import ThreatLevelMonitorTask
 from lymphocyte.events.bus import EventBus
-from lymphocyte.events.threat_level import ThreatLevelChangedEvent
+from lymphocyte.events.threat_level import (
+    ThreatLevelChangedEvent,
+    ThreatLevelRemovedEvent,
+)
 from lymphocyte.managers.threat_level import OtherThreatLevelsManager
+from lymphocyte.services.executors import Executors
+from lymphocyte.services.timers import TimerService
 
 
 async def test_other_threat_levels_manager_initializes() -> None:
@@ -25,3 +38,131 @@ async def test_other_threat_levels_manager_dispatches_event() -> None:
     assert arg.identifier == "some_identifier"
     assert arg.host == "some_host"
     assert arg.current == 123
+
+
+async def test_other_threat_levels_are_looked_up_by_index() -> None:
+    manager = OtherThreatLevelsManager(mock.Mock(EventBus))
+    randomness = random.Random(1)
+    for _ in range(200):
+        await manager.set(
+            randomness.choice(["a", "b", "c"]),
+            f"10.0.0.{randomness.randrange(20)}",
+            randomness.randrange(10),
+        )
+    records = manager.get()
+    assert len(records) == len({(r.identifier, r.host) for r in records})
+
+    queries: list[dict[str, Any]] = [
+        {"identifier_match": "a"},
+        {"host_match": "10.0.0.3"},
+        {"identifier_match": "b", "host_match": "10.0.0.3"},
+        {"identifier_match": "c", "value_gte": 4},
+        {"value_gte": 3, "value_lte": 6},
+        {"value_lte": 2, "after": datetime.datetime.now() - datetime.timedelta(1)},
+        {"value_gte": 10},
+    ]
+    for query in queries:
+        expected = [
+            record
+            for record in records
+            if record.identifier == query.get("identifier_match", record.identifier)
+            and record.host == query.get("host_match", record.host)
+            and query.get("value_gte", 0) <= record.level <= query.get("value_lte", 9)
+        ]
+        assert sorted(manager.get(**query)) == sorted(expected), query
+
+    for identifier in ["a", None]:
+        levels = [
+            record.level
+            for record in records
+            if identifier is None or record.identifier == identifier
+        ]
+        assert manager.aggregate(identifier) == (
+            len(levels),
+            min(levels),
+            max(levels),
+            pytest.approx(sum(levels) / len(levels)),
+        )
+    assert manager.aggregate("unknown") == (0, None, None, None)
+
+
+async def test_other_threat_levels_keep_their_order_and_exact_mean() -> None:
+    manager = OtherThreatLevelsManager(mock.Mock(EventBus))
+    for host in ["c", "a", "b"]:
+        await manager.set("other", host, 0.1)
+    for _ in range(1000):
+        await manager.set("other", "a", 1e16)
+        await manager.set("other", "a", 0.1)
+
+    assert [record.host for record in manager.get()] == ["c", "a", "b"]
+    assert [record.host for record in manager.get(value_lte=1)] == ["c", "a", "b"]
+    assert manager.aggregate("other").mean == pytest.approx(0.1, abs=1e-12)
+
+
+def removed(event_bus: mock.Mock) -> list[tuple[str, str]]:
+    return [
+        (call.args[0].identifier, call.args[0].host)
+        for call in event_bus.dispatch_async.await_args_list
+        if isinstance(call.args[0], ThreatLevelRemovedEvent)
+    ]
+
+
+async def test_stale_threat_levels_are_removed() -> None:
+    event_bus = mock.Mock(EventBus)
+    timers = TimerService()
+    manager = OtherThreatLevelsManager(event_bus, timers=timers)
+
+    await manager.set("other", "stale", 3, stale_after_seconds=0.05)
+    await manager.set("other", "fresh", 1, stale_after_seconds=0.05)
+    await manager.set("other", "kept", 2)
+    for _ in range(4):
+        await asyncio.sleep(0.02)
+        await manager.set("other", "fresh", 1, stale_after_seconds=0.05)
+
+    assert sorted(record.host for record in manager.get()) == ["fresh", "kept"]
+    assert manager.aggregate("other") == (2, 1, 2, 1.5)
+    assert len(manager.history("other", "stale")) == 0
+    assert removed(event_bus) == [("other", "stale")]
+    assert len(timers.timers("threat_level_stale")) == 1
+
+    assert await manager.remove("other", "fresh")
+    assert not await manager.remove("other", "fresh")
+    assert removed(event_bus) == [("other", "stale"), ("other", "fresh")]
+    assert len(timers) == 0
+    await timers.aclose()
+
+
+async def test_threat_levels_of_hosts_gone_from_dns_are_removed() -> None:
+    manager = OtherThreatLevelsManager(mock.Mock(EventBus))
+    executors = mock.Mock(Executors)
+    executors.run = mock.AsyncMock(
+        side_effect=[
+            ("other", [], ["10.0.0.1", "10.0.0.2"]),
+            socket.gaierror(),
+            ("other", [], ["10.0.0.1"]),
+        ]
+        + [("other", [], ["10.0.0.1"])] * 100
+    )
+    task = ThreatLevelMonitorTask(
+        "other",
+        "ws://other/threat_level",
+        manager,
+        executors=executors,
+        resolve_interval_seconds=0.01,
+    )
+
+    async def connect(*_args: Any, host: str, **_kwargs: Any) -> None:
+        await manager.set("other", host, 1)
+        await asyncio.sleep(3600)
+
+    with mock.patch.object(task, "websocket_connection", connect):
+        monitor = asyncio.create_task(task.perform())
+        await asyncio.sleep(0.005)
+        assert len(manager.get()) == 2
+        await asyncio.sleep(0.01)
+        assert len(manager.get()) == 2, "Not removed when the lookup fails"
+        await asyncio.sleep(0.02)
+        monitor.cancel()
+        await monitor
+
+    assert [record.host for record in manager.get()] == ["10.0.0.1"]
@@ -80,6 +80,7 @@ async def test_probe_expressions(client: AsyncClient, container: Container) -> N
                         liveness_expression=liveness_expression,
                     ).model_dump()
                 ):
+                    container.probe_service.reset()
                     assert (await client.get("/startupProbe")).status_code == (
                         200 if startup_expression == "true" else 500
                     )
@@ -89,3 +90,19 @@ async def test_probe_expressions(client: AsyncClient, container: Container) -> N
                     assert (await client.get("/livenessProbe")).status_code == (
                         200 if liveness_expression == "true" else 500
                     )
+
+
+async def test_probe_verdicts_are_cached(
+    client: AsyncClient, container: Container
+) -> None:
+    probe_service = container.probe_service()
+    liveness = probe_service.conditions[probe_service.liveness_expression]
+
+    for _ in range(5):
+        assert (await client.get("/livenessProbe")).status_code == 200
+    assert liveness.evaluations == 1
+    assert probe_service is container.probe_service()
+
+    await container.ttl_manager().scale(0.5)
+    assert (await client.get("/livenessProbe")).status_code == 200
+    assert liveness.evaluations == 2
@@ -0,0 +1,158 @@
+import asyncio
+import os
+import subprocess
+import sys
+import uuid
+
+import pytest
+
+from lymphocyte.actions.kill import KillAction
+from lymphocyte.services.process_index import ProcessIndex, ProcessInfo
+
+
+class FakeProcesses:
+    processes: dict[int, ProcessInfo]
+    reads: list[int]
+
+    def __init__(self, *processes: ProcessInfo) -> None:
+        self.processes = {process.pid: process for process in processes}
+        self.reads = []
+
+    def pids(self) -> list[int]:
+        return list(self.processes)
+
+    def scan(self) -> list[ProcessInfo]:
+        return list(self.processes.values())
+
+    def read(self, pid: int) -> ProcessInfo | None:
+        self.reads.append(pid)
+        return self.processes.get(pid)
+
+    def stamp(self, pid: int) -> tuple[float, int | None, str] | None:
+        info = self.processes.get(pid)
+        return (info.create_time, info.uid, info.exe) if info is not None else None
+
+    def index(self) -> ProcessIndex:
+        return ProcessIndex(
+            pids=self.pids, scan=self.scan, read=self.read, stamp=self.stamp
+        )
+
+
+def process(pid: int, uid: int, exe: str = "", cmdline: str = "") -> ProcessInfo:
+    return ProcessInfo(pid, uid, exe, cmdline, create_time=float(pid))
+
+
+def test_index_is_refreshed_incrementally() -> None:
+    fake = FakeProcesses(process(1, 0), process(2, 1000), process(3, 1000))
+    index = fake.index()
+    index.refresh()
+    assert [p.pid for p in index.find(uid=1000)] == [2, 3]
+    assert not fake.reads
+
+    del fake.processes[2]
+    fake.processes[4] = process(4, 1000)
+    fake.processes[5] = process(5, 33)
+    index.refresh()
+
+    assert fake.reads == [4, 5], "Only started processes are read"
+    assert [p.pid for p in index.find(uid=1000)] == [3, 4]
+    assert [p.pid for p in index.find(uid=33)] == [5]
+    assert index.find(uid=1) == []
+    assert len(index) == 4
+
+
+def test_reused_process_ids_are_read_again() -> None:
+    fake = FakeProcesses(process(1, 0, cmdline="sshd"), process(2, 1000))
+    index = fake.index()
+    index.watch("cmdline", "miner")
+    index.refresh()
+
+    fake.processes[1] = ProcessInfo(1, 1000, "", "miner", create_time=10.0)
+    index.refresh()
+
+    assert fake.reads == [1]
+    assert [p.pid for p in index.find(uid=1000)] == [1, 2]
+    assert [p.pid for p in index.find(cmdline="miner")] == [1]
+    assert index.find(uid=0) == []
+
+
+def test_changed_processes_are_read_again() -> None:
+    fake = FakeProcesses(
+        process(1, 0, "/bin/bash", "bash"), process(2, 1000, "/bin/python3", "app.py")
+    )
+    index = fake.index()
+    index.watch("cmdline", "miner")
+    index.refresh()
+
+    # Same processes, after setuid and exec, and after exec keeping the executable
+    fake.processes[1] = ProcessInfo(1, 1000, "/bin/miner", "miner", create_time=1.0)
+    fake.processes[2] = ProcessInfo(
+        2, 1000, "/bin/python3", "miner.py", create_time=2.0
+    )
+    index.refresh()
+    assert fake.reads == [1]
+    assert index.find(uid=1000) == [
+        fake.processes[1],
+        process(2, 1000, "/bin/python3", "app.py"),
+    ]
+    assert [p.pid for p in index.find(cmdline="miner")] == [1], "Same stamp"
+    assert index.find(uid=0) == []
+
+    index.refresh(full=True)
+    assert [p.pid for p in index.find(cmdline="miner")] == [1, 2]
+    assert len(index) == 2
+
+
+def test_index_finds_by_patterns() -> None:
+    fake = FakeProcesses(
+        process(1, 0, "/usr/sbin/sshd", "sshd: root"),
+        process(2, 1000, "/usr/bin/python3", "python3 miner.py --pool x"),
+        process(3, 1000, "/usr/bin/python3", "python3 app.py"),
+    )
+    index = fake.index()
+    index.watch("exe", "python")
+    index.refresh()
+    index.watch("cmdline", r"miner\.py")
+
+    assert [p.pid for p in index.find(exe="python")] == [2, 3]
+    assert [p.pid for p in index.find(uid=1000, cmdline=r"miner\.py")] == [2]
+    assert index.find(uid=0, cmdline=r"miner\.py") == []
+
+    fake.processes[4] = process(4, 1001, "/tmp/x", "python3 miner.py")
+    index.refresh()
+    assert [p.pid for p in index.find(cmdline=r"miner\.py")] == [2, 4]
+
+    with pytest.raises(KeyError):
+        index.find(cmdline="unwatched")
+
+
+def test_kill_action_needs_a_matcher() -> None:
+    with pytest.raises(ValueError):
+        KillAction("kill")
+
+
+async def test_kill_action_kills_matching_processes() -> None:
+    marker = uuid.uuid4().hex
+    code = f"import time; time.sleep(60)  # {marker}"
+    victims = [subprocess.Popen([sys.executable, "-c", code])]
+    index = ProcessIndex()
+    index.refresh()
+    victims += [subprocess.Popen([sys.executable, "-c", code])]
+    bystander = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        action = KillAction("kill", uid=os.getuid(), cmdline=marker, processes=index)
+        # A process indexed before it exec'd the command line to match
+        victims += [
+            subprocess.Popen(["bash", "-c", f"sleep 0.5; exec -a {marker} sleep 60"])
+        ]
+        index.refresh()
+        await asyncio.sleep(1)
+
+        await action.perform()
+
+        assert [victim.wait(timeout=5) for victim in victims] == [-9, -9, -9]
+        assert bystander.poll() is None
+    finally:
+        for proc in [*victims, bystander]:
+            proc.kill()
+            proc.wait()
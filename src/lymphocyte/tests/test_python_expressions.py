@@ -0,0 +1,83 @@
+from collections import namedtuple
+
+import pytest
+
+from lymphocyte.expressions.cache import create_environment
+from lymphocyte.expressions.python import (
+    UnsafeExpressionError,
+    compile_python_expression,
+)
+from lymphocyte.main_utils import create_container
+from lymphocyte.settings import ExpressionSettings, Settings
+
+Level = namedtuple("Level", ["identifier", "host", "level"])
+LEVELS = [Level("other", "a", 1.0), Level("other", "b", 3.0), Level("self", "c", 2.0)]
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "true or false",
+        "not none",
+        "1 + 2 * 3 >= 7 and 2 ** 3 == 8",
+        "(levels | count) > 2",
+        "(levels | map(attribute=2) | max) >= 3",
+        "(levels | max(attribute='level')).host",
+        "levels | sum(attribute='level')",
+        "(levels | first).identifier",
+        "'yes' if levels else 'no'",
+    ],
+)
+def test_evaluates_like_jinja(expression: str) -> None:
+    context = {"levels": LEVELS, "threshold": 1.5}
+    jinja = create_environment().compile_expression(expression)(context)
+    python = compile_python_expression(expression)(context)
+
+    assert python == jinja
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "levels.__class__",
+        "levels[0]._asdict()",
+        "__import__('os')",
+        "'{0.__class__}'.format(levels)",
+        "levels.append(1)",
+        "(lambda: 1)()",
+        "(x := 1)",
+        "f'{levels}'",
+        "(x for x in levels).gi_frame",
+        "levels | map(attribute='__class__') | list",
+    ],
+)
+def test_rejects_unsafe_expressions(expression: str) -> None:
+    with pytest.raises(UnsafeExpressionError):
+        compile_python_expression(expression)({"levels": LEVELS})
+
+
+def test_comprehensions_see_the_context() -> None:
+    expression = "[level.host for level in levels if level.level > threshold]"
+
+    assert compile_python_expression(expression)(
+        {"levels": LEVELS, "threshold": 1.5}
+    ) == ["b", "c"]
+
+
+def test_only_safe_builtins_are_available() -> None:
+    with pytest.raises(NameError):
+        compile_python_expression("open('/etc/passwd')")({})
+    with pytest.raises(OverflowError):
+        compile_python_expression("range(10 ** 9)")({})
+    assert compile_python_expression("len(range(3))")({}) == 3
+
+
+def test_container_uses_the_configured_backend() -> None:
+    container = create_container(
+        Settings(expressions=ExpressionSettings(backend="python"))
+    )
+
+    assert container.expressions().compiler is compile_python_expression
+    assert container.probe_service().check_condition(
+        "ttl_manager.fraction_passed() < 1 and not outgoing_liveness_probe_manager.status()"
+    ) == (True, None)
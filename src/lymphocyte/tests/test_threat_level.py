@@ -1,13 +1,23 @@
+import asyncio
 from unittest import mock
 
 import pytest
+from fastapi import WebSocket
 from fastapi.testclient import TestClient
 from httpx import AsyncClient
+from prometheus_client import CollectorRegistry, Gauge
 
 from lymphocyte.container import Container
-from lymphocyte.events.bus import EventHandlerService
+from lymphocyte.container_utils import create_threat_level_metric
+from lymphocyte.events.bus import EventBus, EventHandlerService
 from lymphocyte.events.threat_level import OwnThreatLevelChangedEvent
-from lymphocyte.managers.threat_level import ThreatLevelManager
+from lymphocyte.managers.decay import LinearDecay
+from lymphocyte.managers.threat_level import (
+    DecayingThreatLevelManager,
+    ThreatLevelManager,
+)
+from lymphocyte.routers.threat_level import websocket_threat_level_provider
+from lymphocyte.services.timers import TimerService
 
 
 async def test_threat_level_exposed(client: AsyncClient, container: Container) -> None:
@@ -42,3 +52,37 @@ async def test_threat_level_exposed_by_websocket(
 
             data = ws.receive_json()
             assert data == {"threat_level": 123}
+
+
+async def test_decaying_threat_level_is_exposed_as_it_decays() -> None:
+    timers = TimerService()
+    manager = DecayingThreatLevelManager(
+        mock.Mock(EventBus), base_level=0, decay=LinearDecay(5), timers=timers
+    )
+    registry = CollectorRegistry()
+    create_threat_level_metric(
+        Gauge("lymphocyte_threat_level", "Threat level", registry=registry), manager
+    )
+    await manager.increment(1)
+
+    websocket = mock.Mock(WebSocket)
+    provider = asyncio.create_task(
+        websocket_threat_level_provider(
+            websocket,
+            threat_level_manager=manager,
+            event_handler_service=EventHandlerService([]),
+            push_interval_seconds=0.02,
+        )
+    )
+    await asyncio.sleep(0.1)
+    provider.cancel()
+    await provider
+    await timers.aclose()
+
+    assert 0 < (registry.get_sample_value("lymphocyte_threat_level") or 0) < 0.6
+    sent = [
+        call.args[0]["threat_level"] for call in websocket.send_json.await_args_list
+    ]
+    assert sent[0] == pytest.approx(1, abs=0.05)
+    assert len(sent) >= 3
+    assert all(earlier > later for earlier, later in zip(sent, sent[1:]))
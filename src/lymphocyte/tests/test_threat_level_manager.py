@@ -1,10 +1,19 @@
 import asyncio
+import time
 from unittest import mock
 
 import pytest
 
 from lymphocyte.events.bus import EventBus
-from lymphocyte.managers.threat_level import ThreatLevelManager
+from lymphocyte.expressions.condition import Condition
+from lymphocyte.main_utils import create_container
+from lymphocyte.managers.decay import HalfLifeDecay, LinearDecay
+from lymphocyte.managers.threat_level import (
+    DecayingThreatLevelManager,
+    ThreatLevelManager,
+)
+from lymphocyte.services.timers import TimerService
+from lymphocyte.settings import Settings, ThreatLevelSettings
 
 levels = [
     (0, 1),
@@ -52,3 +61,88 @@ async def test_threat_level_manager_increments_for_duration(
 
     await asyncio.sleep(increment_for_duration + 0.1)
     assert manager.current == base_level
+
+
+def test_decay() -> None:
+    half_life = HalfLifeDecay(10)
+    assert half_life.decayed(8, 10) == 4
+    assert half_life.decayed(-8, 20) == -2
+    assert half_life.seconds_until(8, 2) == 20
+    assert half_life.seconds_until(8, 0) is None
+    assert half_life.seconds_until(8, 9) is None
+
+    linear = LinearDecay(2)
+    assert linear.decayed(8, 1) == 6
+    assert linear.decayed(-8, 1) == -6
+    assert linear.decayed(8, 10) == 0
+    assert linear.seconds_until(8, 0) == 4
+    assert linear.seconds_until(8, -1) is None
+
+
+async def test_decaying_threat_level_is_computed_on_read() -> None:
+    event_bus = mock.Mock(EventBus)
+    timers = TimerService()
+
+    with mock.patch("lymphocyte.managers.threat_level.time") as clock:
+        clock.monotonic.return_value = 100
+        manager = DecayingThreatLevelManager(
+            event_bus, base_level=1, decay=HalfLifeDecay(10), timers=timers
+        )
+        await manager.increment(8)
+        assert manager.current == 9
+
+        clock.monotonic.return_value = 110
+        assert manager.current == 5
+        assert manager.seconds_until(3) == 10
+
+        await manager.increment(1)
+        assert manager.current == 6
+        clock.monotonic.return_value = 120
+        assert manager.current == 3.5
+
+        await manager.reset()
+        assert manager.current == 1
+
+    assert event_bus.dispatch_async.await_count == 3, "Without thresholds every change"
+    await timers.aclose()
+
+
+async def test_decaying_threat_level_notifies_threshold_crossings() -> None:
+    event_bus = mock.Mock(EventBus)
+    timers = TimerService()
+    manager = DecayingThreatLevelManager(
+        event_bus,
+        base_level=0,
+        decay=HalfLifeDecay(0.05),
+        thresholds=[1, 10],
+        timers=timers,
+    )
+
+    for _ in range(4):
+        await manager.increment(1)
+    assert event_bus.dispatch_async.await_count == 1, "Crossed 1"
+    assert len(timers.timers("threat_level_crossing")) == 1
+
+    await asyncio.sleep(0.2)
+    assert manager.current < 1
+    assert event_bus.dispatch_async.await_count == 2, "Decayed below 1"
+    assert len(timers) == 0
+    await timers.aclose()
+
+
+async def test_decaying_threat_level_manager_from_settings() -> None:
+    container = create_container(
+        Settings(threat_level=ThreatLevelSettings(decay="linear", thresholds=[2]))
+    )
+    manager = container.threat_level_manager()
+    assert isinstance(manager, DecayingThreatLevelManager)
+
+    condition = Condition(
+        "threat_level_manager.current >= 2",
+        container.context(),
+        container.expressions(),
+    )
+    await manager.increment(3)
+    assert condition()
+    assert condition.valid_until - time.monotonic() == pytest.approx(100, abs=1)
+    await container.timers().aclose()
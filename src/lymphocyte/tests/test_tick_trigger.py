@@ -0,0 +1,112 @@
+import asyncio
+import datetime
+import time
+from unittest import mock
+
+import pytest
+
+from lymphocyte.background_tasks import TickTriggerTask
+from lymphocyte.events.bus import EventBus, EventHandlerService
+from lymphocyte.events.handlers.tick import TickEventHandler
+from lymphocyte.events.tick import TickEvent
+from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.services.cron import CronSchedule
+from lymphocyte.services.timers import TimerService
+
+
+def test_cron_schedule() -> None:
+    moment = datetime.datetime(2024, 2, 28, 23, 58, 30)
+
+    assert CronSchedule.parse("* * * * *").next_after(moment) == datetime.datetime(
+        2024, 2, 28, 23, 59
+    )
+    assert CronSchedule.parse("*/15 * * * *").next_after(moment) == datetime.datetime(
+        2024, 2, 29, 0, 0
+    )
+    assert CronSchedule.parse("30 9-17/4 * * 1-5").next_after(
+        moment
+    ) == datetime.datetime(2024, 2, 29, 9, 30)
+    assert CronSchedule.parse("0 0 1 * 7").next_after(moment) == datetime.datetime(
+        2024, 3, 1, 0, 0
+    ), "The first of the month or a Sunday"
+    assert CronSchedule.parse("0 12 29 2 *").next_after(moment) == datetime.datetime(
+        2024, 2, 29, 12, 0
+    )
+
+
+@pytest.mark.parametrize(
+    "expression", ["* * * *", "60 * * * *", "5-1 * * * *", "*/0 * * * *"]
+)
+def test_invalid_cron_schedules(expression: str) -> None:
+    with pytest.raises(ValueError):
+        CronSchedule.parse(expression)
+
+    with pytest.raises(ValueError):
+        CronSchedule.parse("0 0 30 2 *").next_after(datetime.datetime(2024, 1, 1))
+
+
+def test_tick_handler_triggers_on_named_ticks() -> None:
+    handler = TickEventHandler("fast", every_n_seconds=0.5)
+    service = EventHandlerService([handler, TickEventHandler("slow")])
+
+    assert service.routes(TickEvent(7, name="fast")) == [handler]
+    assert list(handler.handle_sync(TickEvent(7, name="fast"))) == [
+        TriggerEvent("fast")
+    ]
+    assert service.routes(TickEvent(3)) == []
+
+    with pytest.raises(ValueError):
+        TickEventHandler("never", every_n_seconds=0)
+
+
+async def test_ticks_are_dispatched_only_when_due() -> None:
+    event_bus = mock.Mock(EventBus)
+    timers = TimerService()
+    task = TickTriggerTask(
+        event_bus,
+        triggers=[
+            TickEventHandler("fast", every_n_seconds=0.02),
+            TickEventHandler("slow", every_n_seconds=60),
+            TickEventHandler("cron", cron="0 0 1 1 *"),
+        ],
+        timers=timers,
+    )
+    running = asyncio.create_task(task.perform())
+
+    await asyncio.sleep(0.11)
+    names = [call.args[0].name for call in event_bus.dispatch_async.await_args_list]
+    assert set(names) == {"fast"}
+    assert 4 <= len(names) <= 6
+    assert [timer.data.trigger.name for timer in timers.timers()] == [
+        "fast",
+        "slow",
+        "cron",
+    ]
+
+    running.cancel()
+    await asyncio.gather(running, return_exceptions=True)
+    assert len(timers) == 0
+    await timers.aclose()
+
+
+async def test_ticks_do_not_drift() -> None:
+    event_bus = mock.Mock(EventBus)
+    timers = TimerService()
+    task = TickTriggerTask(
+        event_bus,
+        triggers=[TickEventHandler("tick", every_n_seconds=0.1)],
+        timers=timers,
+    )
+    start = time.monotonic()
+    running = asyncio.create_task(task.perform())
+
+    await asyncio.sleep(0.05)
+    time.sleep(0.25)  # Block the loop past three deadlines
+    await asyncio.sleep(0.02)
+    (timer,) = timers.timers()
+    assert timer.data.counter == 4, "Missed ticks are skipped"
+    assert timer.deadline == pytest.approx(start + 0.4, abs=0.01)
+
+    running.cancel()
+    await asyncio.gather(running, return_exceptions=True)
+    await timers.aclose()
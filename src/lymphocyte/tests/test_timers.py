@@ -0,0 +1,125 @@
+import asyncio
+import contextvars
+import logging
+from unittest import mock
+
+import pytest
+
+from lymphocyte.events.bus import EventBus
+from lymphocyte.managers.threat_level import ThreatLevelManager
+from lymphocyte.services.timers import Timer, TimerService
+
+
+async def test_timers_fire_in_deadline_order() -> None:
+    timers = TimerService()
+    fired: list[str] = []
+
+    async def record(timer: Timer) -> None:
+        fired.append(timer.name)
+
+    timers.schedule(0.03, record, name="third")
+    timers.schedule(0.01, record, name="first")
+    timers.schedule(0.02, lambda timer: fired.append(timer.name), name="second")
+    assert [timer.name for timer in timers.timers()] == ["first", "second", "third"]
+
+    await asyncio.sleep(0.1)
+    await timers.aclose()
+
+    assert fired == ["first", "second", "third"]
+    assert len(timers) == 0
+
+
+async def test_cancelled_timers_do_not_fire() -> None:
+    timers = TimerService()
+    fired: list[Timer] = []
+    scheduled = [timers.schedule(0.01, fired.append, name=str(i)) for i in range(10)]
+
+    for timer in scheduled[:8]:
+        assert timers.cancel(timer)
+    assert not timers.cancel(scheduled[0])
+    assert len(timers) == 2
+    # Compaction is not observable otherwise # pylint: disable-next=protected-access
+    assert len(timers._heap) < 10, "Cancelled timers are compacted"
+
+    await asyncio.sleep(0.05)
+    await timers.aclose()
+
+    assert fired == scheduled[8:]
+    assert not timers.cancel(fired[0])
+
+
+async def test_failing_callbacks_are_logged(caplog: pytest.LogCaptureFixture) -> None:
+    timers = TimerService()
+    fired: list[Timer] = []
+
+    def fail(timer: Timer) -> None:
+        raise RuntimeError("failed")
+
+    timers.schedule(0, fail, name="failing")
+    timers.schedule(0.01, fired.append)
+    with caplog.at_level(logging.ERROR):
+        await asyncio.sleep(0.05)
+    await timers.aclose()
+
+    assert "Error in timer failing" in caplog.text
+    assert len(fired) == 1
+
+
+async def test_callbacks_do_not_see_the_context_of_the_scheduler() -> None:
+    timers = TimerService()
+    variable: contextvars.ContextVar[str] = contextvars.ContextVar(
+        "variable", default=""
+    )
+    seen: list[str] = []
+
+    async def schedule() -> None:
+        variable.set("scheduler")
+        timers.schedule(0, lambda _: seen.append(variable.get()))
+
+    await asyncio.create_task(schedule())
+    await asyncio.sleep(0.01)
+    await asyncio.create_task(schedule())
+    await asyncio.sleep(0.01)
+    await timers.aclose()
+
+    assert seen == ["", ""]
+
+
+async def test_temporary_increments_share_one_task() -> None:
+    timers = TimerService()
+    manager = ThreatLevelManager(mock.Mock(EventBus), base_level=0, timers=timers)
+    tasks = len(asyncio.all_tasks())
+
+    for _ in range(1000):
+        await manager.increment(1, 0.05)
+
+    assert len(asyncio.all_tasks()) == tasks + 1
+    assert manager.current == 1000
+    assert len(manager.temporary_increments) == 1000
+    assert manager.temporary_increments[0].amount == 1
+
+    await asyncio.sleep(0.1)
+    assert manager.current == 0
+    assert manager.temporary_increments == []
+    assert len(asyncio.all_tasks()) == tasks, "The task ends once no timers remain"
+
+    await manager.increment(1, 0.01)
+    await asyncio.sleep(0.05)
+    assert manager.current == 0, "The task restarts for new timers"
+    await timers.aclose()
+
+
+async def test_reset_cancels_temporary_increments() -> None:
+    timers = TimerService()
+    manager = ThreatLevelManager(mock.Mock(EventBus), base_level=0, timers=timers)
+
+    await manager.increment(2, 0.05)
+    await manager.increment(1, 60)
+    await manager.reset()
+    await manager.increment(1)
+    await asyncio.sleep(0.1)
+
+    assert manager.current == 1
+    assert manager.temporary_increments == []
+    assert len(timers) == 0
+    await timers.aclose()
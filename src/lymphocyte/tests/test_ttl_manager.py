@@ -0,0 +1,94 @@
+import asyncio
+import datetime
+import time
+from unittest import mock
+
+from lymphocyte.events.bus import EventBus
+from lymphocyte.events.handlers.ttl import TTLThresholdReachedEventHandler
+from lymphocyte.events.trigger import TriggerEvent
+from lymphocyte.events.ttl import TTLThresholdReachedEvent
+from lymphocyte.managers.ttl import TTLManager
+from lymphocyte.services.timers import TimerService
+
+
+def reached(event_bus: mock.Mock) -> list[float]:
+    return [
+        call.args[0].fraction
+        for call in event_bus.dispatch_async.await_args_list
+        if isinstance(call.args[0], TTLThresholdReachedEvent)
+    ]
+
+
+async def test_thresholds_are_reached_on_time() -> None:
+    event_bus = mock.Mock(EventBus)
+    timers = TimerService()
+    ttl_manager = TTLManager(
+        event_bus,
+        datetime.timedelta(seconds=0.1),
+        thresholds=[1.0, 0.5],
+        timers=timers,
+    )
+    assert ttl_manager.deadline == ttl_manager.start_time + 0.1
+
+    await asyncio.sleep(0.07)
+    assert reached(event_bus) == [0.5]
+    await asyncio.sleep(0.05)
+    assert reached(event_bus) == [0.5, 1.0]
+
+    await ttl_manager.restart()
+    await asyncio.sleep(0.12)
+    assert reached(event_bus) == [0.5, 1.0, 0.5, 1.0]
+    await timers.aclose()
+
+
+async def test_thresholds_are_rescheduled_on_changes() -> None:
+    event_bus = mock.Mock(EventBus)
+    timers = TimerService()
+    ttl_manager = TTLManager(
+        event_bus, datetime.timedelta(seconds=10), thresholds=[0.5], timers=timers
+    )
+
+    await ttl_manager.scale(0.01)
+    await ttl_manager.decrement(datetime.timedelta(seconds=0.02))
+    await asyncio.sleep(0.05)
+    assert reached(event_bus) == [0.5]
+
+    await ttl_manager.set(datetime.timedelta(seconds=0.1))
+    await ttl_manager.set(datetime.timedelta(seconds=0.08))
+    assert reached(event_bus) == [0.5], "Still passed"
+    assert not timers.timers("ttl_threshold")
+
+    await ttl_manager.set(datetime.timedelta(seconds=10))
+    (timer,) = timers.timers("ttl_threshold")
+    assert timer.deadline == ttl_manager.start_time + 5
+    assert timer.seconds_left() > 4.9
+    await timers.aclose()
+
+
+def test_thresholds_are_scheduled_before_the_loop_runs() -> None:
+    event_bus = mock.Mock(EventBus)
+    timers = TimerService()
+    TTLManager(event_bus, datetime.timedelta(seconds=0.01), [1], timers)
+
+    async def run() -> None:
+        await timers.start()
+        await asyncio.sleep(0.05)
+        await timers.aclose()
+
+    start = time.monotonic()
+    asyncio.run(run())
+    assert time.monotonic() - start < 1
+    assert reached(event_bus) == [1]
+
+
+def test_threshold_handler_triggers() -> None:
+    any_threshold = TTLThresholdReachedEventHandler("any")
+    expired = TTLThresholdReachedEventHandler("expired", fraction=1)
+
+    assert list(any_threshold.handle_sync(TTLThresholdReachedEvent(0.75))) == [
+        TriggerEvent("any")
+    ]
+    assert not list(expired.handle_sync(TTLThresholdReachedEvent(0.75)))
+    assert list(expired.handle_sync(TTLThresholdReachedEvent(1.0))) == [
+        TriggerEvent("expired")
+    ]